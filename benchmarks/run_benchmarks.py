@@ -0,0 +1,206 @@
+"""
+Benchmark the analyze pipeline stage by stage on synthetic datasets.
+
+    python -m benchmarks.run_benchmarks --scale quick
+    python -m benchmarks.run_benchmarks --save-baseline          # record benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json   # exit 1 on regressions
+
+The LLM is replaced by a fake client so only local work (loading, profiling,
+inference, formatting, report writing) is measured.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import FORMATS, generate
+
+SCALES = {
+    "quick": {"rows": [1_000], "cols": [10]},
+    "default": {"rows": [1_000, 50_000], "cols": [10, 100]},
+    "full": {"rows": [1_000, 100_000, 1_000_000], "cols": [10, 100, 1_000]},
+}
+# Image archives are generated pixel by pixel in pure Python; keep them bounded
+MAX_IMAGES = 2_000
+DEFAULT_RESULTS = os.path.join(os.path.dirname(__file__), "results", "latest.json")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+class FakeLLM:
+    """Stands in for the Gemini client: constant answer, no network."""
+
+    class _Response:
+        text = "## Insight\n- Synthetic benchmark response."
+
+    def generate_content(self, prompt, generation_config=None):
+        return self._Response()
+
+
+def percentile(values, q):
+    """Nearest-rank percentile."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+def _size_bytes(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(r, f)) for r, _, files in os.walk(path) for f in files)
+    return os.path.getsize(path)
+
+
+def summarize(samples, n_rows, n_bytes):
+    """samples: list of span dicts for one stage across repetitions."""
+    walls = [s["wall_sec"] for s in samples]
+    mean = sum(walls) / len(walls)
+    mem = [s.get("tracemalloc_peak_kb") for s in samples if s.get("tracemalloc_peak_kb") is not None]
+    return {
+        "runs": len(walls),
+        "mean_sec": round(mean, 6),
+        "p50_sec": percentile(walls, 50),
+        "p95_sec": percentile(walls, 95),
+        "p99_sec": percentile(walls, 99),
+        "cpu_mean_sec": round(sum(s["cpu_sec"] for s in samples) / len(samples), 6),
+        "peak_mem_kb": max(mem) if mem else None,
+        "peak_rss_kb": max((s.get("peak_rss_kb") or 0) for s in samples),
+        "rows_per_sec": round(n_rows / mean, 1) if mean > 0 else None,
+        "mb_per_sec": round(n_bytes / 1e6 / mean, 2) if mean > 0 else None,
+    }
+
+
+def run_case(engine, path, n_rows, repeat, warmup):
+    stage_names = [s.name for s in engine.graph.stages]
+    per_stage = {}
+    # Summed per run: a stage may have no span in some runs (skipped or served from the cache)
+    totals = []
+    for i in range(warmup + repeat):
+        report, _, _ = engine.analyze(path, force=stage_names)
+        if i < warmup:
+            continue
+        spans = report.get("spans", [])
+        for span in spans:
+            per_stage.setdefault(span["name"], []).append(span)
+        totals.append(round(sum(span["wall_sec"] for span in spans), 6))
+    n_bytes = _size_bytes(path)
+    stages = {name: summarize(samples, n_rows, n_bytes) for name, samples in per_stage.items()}
+    stages["total"] = {
+        "runs": repeat,
+        "p50_sec": percentile(totals, 50),
+        "p95_sec": percentile(totals, 95),
+        "p99_sec": percentile(totals, 99),
+        "rows_per_sec": round(n_rows / (sum(totals) / repeat), 1),
+    }
+    return {"bytes": n_bytes, "stages": stages}
+
+
+def run(formats, scale, repeat, warmup, data_dir, trace_memory):
+    # Imported here so `--help` works without the heavy dependencies installed
+    from zero_shot_theory_generator.core.engine import AnalysisEngine
+
+    out_dir = tempfile.mkdtemp(prefix="zstg_bench_")
+    # Schema reuse is off so every repetition exercises the full pipeline
+    engine = AnalysisEngine(output_dir=out_dir, tracing=True, trace_memory=trace_memory, llm=FakeLLM(),
+                            reuse_threshold=None)
+    cases = []
+    try:
+        for fmt in formats:
+            for n_rows in SCALES[scale]["rows"]:
+                for n_cols in SCALES[scale]["cols"]:
+                    rows = min(n_rows, MAX_IMAGES) if fmt in ("zip", "image_folder") else n_rows
+                    case = {"format": fmt, "rows": rows, "cols": n_cols}
+                    try:
+                        path = generate(fmt, data_dir, rows, n_cols)
+                        case.update(run_case(engine, path, rows, repeat, warmup))
+                        case["status"] = "ok"
+                    except Exception as e:
+                        case["status"] = "error"
+                        case["error"] = f"{type(e).__name__}: {e}"
+                    cases.append(case)
+                    total = case.get("stages", {}).get("total", {})
+                    print(f"[BENCH] {fmt:<13} {rows:>9}x{n_cols:<5} "
+                          f"{case['status']:<6} p50={total.get('p50_sec')}s {case.get('error', '')}")
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+    return {
+        "created_at": time.time(),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count()
+        },
+        "scale": scale,
+        "repeat": repeat,
+        "cases": cases
+    }
+
+
+def _index(results):
+    index = {}
+    for case in results.get("cases", []):
+        for stage, stats in case.get("stages", {}).items():
+            index[f"{case['format']}:{case['rows']}x{case['cols']}:{stage}"] = stats
+    return index
+
+
+def compare(results, baseline, tolerance=0.25, min_delta=0.001):
+    """List (key, baseline_p50, current_p50) for stages slower than baseline by > tolerance."""
+    base = _index(baseline)
+    regressions = []
+    for key, stats in _index(results).items():
+        old = base.get(key, {}).get("p50_sec")
+        new = stats.get("p50_sec")
+        if old is None or new is None:
+            continue
+        if new > old * (1 + tolerance) and new - old > min_delta:
+            regressions.append((key, old, new))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Zero-Shot Theory Generator pipeline")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=FORMATS)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="default")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "zstg_bench_data"),
+                        help="Where synthetic datasets are generated (reused across runs)")
+    parser.add_argument("--output", default=DEFAULT_RESULTS)
+    parser.add_argument("--memory", action="store_true", help="Record tracemalloc peaks (slower)")
+    parser.add_argument("--baseline", help="Compare against this results file and exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p50 slowdown (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Also write results to {DEFAULT_BASELINE}")
+    args = parser.parse_args()
+
+    results = run(args.formats, args.scale, args.repeat, args.warmup, args.data_dir, args.memory)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved: {args.output}")
+    if args.save_baseline:
+        with open(DEFAULT_BASELINE, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved: {DEFAULT_BASELINE}")
+
+    if args.baseline:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+            sys.exit(2)
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, tolerance=args.tolerance)
+        for key, old, new in regressions:
+            print(f"[REGRESSION] {key}: p50 {old:.4f}s -> {new:.4f}s ({(new / old - 1) * 100:+.0f}%)")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Deterministic synthetic datasets for the benchmark harness (stdlib only, except Excel)."""
+import csv
+import json
+import os
+import random
+import shutil
+import struct
+import zipfile
+import zlib
+from datetime import datetime, timedelta
+
+FORMATS = ["csv", "tsv", "xlsx", "json", "jsonl", "txt", "zip", "image_folder"]
+
+WORDS = ("data model theory signal noise feature label sample train test error value "
+         "pattern season trend forecast cluster graph vector token image user item").split()
+
+
+def _columns(n_cols):
+    """Column names: a sorted date column, a target and a numeric/categorical mix."""
+    cols = ["date", "target"]
+    for i in range(max(0, n_cols - 2)):
+        cols.append(f"num_{i}" if i % 3 else f"cat_{i}")
+    return cols[:max(n_cols, 1)]
+
+
+def _row(rng, cols, i, start):
+    row = []
+    for c in cols:
+        if c == "date":
+            row.append((start + timedelta(days=i)).strftime("%Y-%m-%d"))
+        elif c == "target":
+            row.append(rng.randint(0, 4))
+        elif c.startswith("cat_"):
+            row.append(f"level_{rng.randint(0, 20)}")
+        else:
+            row.append(round(rng.gauss(0, 1), 5))
+    return row
+
+
+def _rows(n_rows, cols, seed):
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    for i in range(n_rows):
+        yield _row(rng, cols, i, start)
+
+
+def write_delimited(path, n_rows, n_cols, delimiter=",", seed=0):
+    cols = _columns(n_cols)
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f, delimiter=delimiter)
+        w.writerow(cols)
+        w.writerows(_rows(n_rows, cols, seed))
+    return path
+
+
+def write_excel(path, n_rows, n_cols, seed=0):
+    import pandas as pd
+    cols = _columns(n_cols)
+    pd.DataFrame(list(_rows(n_rows, cols, seed)), columns=cols).to_excel(path, index=False)
+    return path
+
+
+def write_json(path, n_rows, n_cols, seed=0):
+    cols = _columns(n_cols)
+    with open(path, "w") as f:
+        json.dump([dict(zip(cols, r)) for r in _rows(n_rows, cols, seed)], f)
+    return path
+
+
+def write_jsonl(path, n_rows, n_cols, seed=0):
+    cols = _columns(n_cols)
+    with open(path, "w") as f:
+        for r in _rows(n_rows, cols, seed):
+            f.write(json.dumps(dict(zip(cols, r))) + "\n")
+    return path
+
+
+def write_text(path, n_rows, n_cols, seed=0):
+    """Natural-language-ish lines; n_cols controls words per line."""
+    rng = random.Random(seed)
+    with open(path, "w") as f:
+        for _ in range(n_rows):
+            f.write(" ".join(rng.choice(WORDS) for _ in range(max(n_cols, 6))) + "\n")
+    return path
+
+
+def _png(rng, size=8):
+    """Minimal valid RGB PNG without PIL."""
+    raw = b"".join(b"\x00" + bytes(rng.randrange(256) for _ in range(size * 3)) for _ in range(size))
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff)
+
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b"")
+
+
+def write_image_folder(path, n_rows, n_cols, seed=0):
+    """n_rows images spread over n_cols class sub-folders."""
+    rng = random.Random(seed)
+    n_classes = max(n_cols, 2)
+    for i in range(n_rows):
+        class_dir = os.path.join(path, f"class_{i % n_classes}")
+        os.makedirs(class_dir, exist_ok=True)
+        with open(os.path.join(class_dir, f"img_{i}.png"), "wb") as f:
+            f.write(_png(rng))
+    return path
+
+
+def write_zip(path, n_rows, n_cols, seed=0):
+    """Zipped image folder (the archive layout detect_dataset recognises)."""
+    rng = random.Random(seed)
+    n_classes = max(n_cols, 2)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as z:
+        for i in range(n_rows):
+            z.writestr(f"class_{i % n_classes}/img_{i}.png", _png(rng))
+    return path
+
+
+WRITERS = {
+    "csv": (".csv", lambda p, r, c, s: write_delimited(p, r, c, ",", s)),
+    "tsv": (".tsv", lambda p, r, c, s: write_delimited(p, r, c, "\t", s)),
+    "xlsx": (".xlsx", write_excel),
+    "json": (".json", write_json),
+    "jsonl": (".jsonl", write_jsonl),
+    "txt": (".txt", write_text),
+    "zip": (".zip", write_zip),
+    "image_folder": ("", write_image_folder),
+}
+
+
+def generate(fmt, out_dir, n_rows, n_cols, seed=0):
+    """Write (or reuse) one synthetic dataset and return its path."""
+    ext, writer = WRITERS[fmt]
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{fmt}_{n_rows}x{n_cols}_s{seed}{ext}")
+    if not os.path.exists(path):
+        try:
+            writer(path, n_rows, n_cols, seed)
+        except Exception:
+            # Never leave a half-written dataset behind to be "reused" next run
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            elif os.path.exists(path):
+                os.remove(path)
+            raise
+    return path
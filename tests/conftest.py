@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The package is run from a checkout (no install step), so make it importable from the tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,18 @@
+import pytest
+from zero_shot_theory_generator.core.dataset_loader import detect_dataset
+
+
+def test_image_folder_is_detected(tmp_path):
+    for cls, n in (("cats", 3), ("dogs", 2)):
+        (tmp_path / cls).mkdir()
+        for i in range(n):
+            (tmp_path / cls / f"img_{i}.PNG").write_bytes(b"\x89PNG")
+    (tmp_path / "README.txt").write_text("not an image")
+    meta = detect_dataset(str(tmp_path))
+    assert meta == {"type": "image_folder", "classes": ["cats", "dogs"], "n_classes": 2, "n_images": 5}
+
+
+def test_folder_without_images_is_unsupported(tmp_path):
+    (tmp_path / "notes.txt").write_text("hello")
+    with pytest.raises(ValueError, match="Unsupported dataset format"):
+        detect_dataset(str(tmp_path))
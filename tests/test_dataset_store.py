@@ -0,0 +1,73 @@
+import os
+from zero_shot_theory_generator.utils.dataset_store import DatasetStore
+
+
+def producer(name, data, calls):
+    def produce(tmp_dir):
+        calls.append(name)
+        path = os.path.join(tmp_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+    return produce
+
+
+def test_fetch_downloads_once_and_keeps_the_name(tmp_path):
+    store = DatasetStore(str(tmp_path / "store"), max_bytes=1 << 20)
+    calls = []
+    first = store.fetch("http://x/data.csv", producer("data.csv", b"a,b\n1,2\n", calls))
+    second = store.fetch("http://x/data.csv", producer("data.csv", b"other", calls))
+    assert first == second and os.path.basename(first) == "data.csv"
+    assert calls == ["data.csv"]
+    with open(first, "rb") as f:
+        assert f.read() == b"a,b\n1,2\n"
+    assert os.listdir(tmp_path / "store" / "tmp") == []
+
+
+def test_identical_files_share_one_object(tmp_path):
+    store = DatasetStore(str(tmp_path / "store"), max_bytes=1 << 20)
+    a = store.fetch("http://a/x.csv", producer("x.csv", b"same", []))
+    b = store.fetch("http://b/y.csv", producer("y.csv", b"same", []))
+    assert a != b
+    assert store.stats()["objects"] == 1 and store.stats()["sources"] == 2
+
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    store = DatasetStore(str(tmp_path / "store"), max_bytes=250)
+    paths = {}
+    for name in ("a", "b"):
+        paths[name] = store.fetch(f"http://x/{name}", producer(f"{name}.bin", name.encode() * 100, []))
+    # Touch a, so b is the least recently used when c pushes the store over its cap
+    assert store.lookup("http://x/a") == paths["a"]
+    store.fetch("http://x/c", producer("c.bin", b"c" * 100, []))
+    assert store.lookup("http://x/b") is None and not os.path.exists(paths["b"])
+    assert store.lookup("http://x/a") == paths["a"]
+    assert store.stats()["bytes"] == 200
+
+
+def test_evict_after_lowering_the_cap(tmp_path):
+    root = str(tmp_path / "store")
+    store = DatasetStore(root, max_bytes=1 << 20)
+    for name in ("a", "b", "c"):
+        store.fetch(f"http://x/{name}", producer(f"{name}.bin", name.encode() * 100, []))
+    assert DatasetStore(root, max_bytes=150).evict() == 2
+    assert store.stats()["objects"] == 1
+
+
+def test_folders_are_stored_and_evicted(tmp_path):
+    store = DatasetStore(str(tmp_path / "store"), max_bytes=250)
+
+    def produce_folder(tmp_dir):
+        folder = os.path.join(tmp_dir, "images")
+        os.makedirs(os.path.join(folder, "cats"))
+        with open(os.path.join(folder, "cats", "1.png"), "wb") as f:
+            f.write(b"p" * 200)
+        return folder
+
+    folder = store.fetch("kaggle:owner/images", produce_folder)
+    assert os.path.isfile(os.path.join(folder, "cats", "1.png"))
+    assert store.fetch("kaggle:owner/images", lambda _: 1 / 0) == folder
+    assert store.stats()["bytes"] == 200
+    store.fetch("http://x/big", producer("big.bin", b"b" * 100, []))
+    assert not os.path.exists(folder)
+    assert store.lookup("kaggle:owner/images") is None
@@ -0,0 +1,41 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+from zero_shot_theory_generator.utils.eval_utils import evaluate_model, evaluate_pipeline
+
+
+def make_frame(n=600):
+    rows = range(n)
+    return pd.DataFrame({
+        "x1": [(i * 37) % 101 / 10 for i in rows],
+        "x2": [(i * 11) % 17 for i in rows],
+        "city": [f"c{i % 4}" for i in rows],
+        "label": [int((i * 37) % 101 > 50) for i in rows],
+    })
+
+
+def test_evaluate_model_infers_the_target(tmp_path):
+    path = tmp_path / "data.csv"
+    make_frame().to_csv(path, index=False)
+    for data in (str(path), make_frame()):
+        scores = evaluate_model("RandomForestClassifier", data, ["accuracy", "f1"], time_budget_sec=20)
+        assert isinstance(scores["accuracy"], float), scores
+        assert scores["accuracy"] > 0.8
+        assert isinstance(scores["f1"], float)
+
+
+def test_evaluate_model_with_explicit_task():
+    frame = make_frame()
+    frame["amount"] = frame["x1"] * 3 + frame["x2"]
+    scores = evaluate_model("RandomForestRegressor", frame.drop(columns=["label"]), ["r2"],
+                            task={"task": "regression", "target": "amount"}, time_budget_sec=20)
+    assert scores["r2"] > 0.5
+
+
+def test_missing_target_is_reported():
+    task = {"task": "classification", "target": "churn"}
+    result = evaluate_pipeline({"model": "RandomForestClassifier"}, make_frame(), task, metrics=["accuracy"],
+                               time_budget_sec=5)
+    assert not isinstance(result["metrics"]["accuracy"], float)
+    assert "churn" in result["note"]
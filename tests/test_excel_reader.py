@@ -0,0 +1,43 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from zero_shot_theory_generator.core.excel_reader import list_sheets, read_sheet_sample
+
+openpyxl = pytest.importorskip("openpyxl")
+
+
+def _write_workbook(path):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "data"
+    ws.append(["id", "name", "empty", "when", "score", "flag", None, "mixed"])
+    for i in range(6):
+        ws.append([i, f"n{i}" if i != 2 else None, None, datetime.datetime(2024, 1, i + 1) if i != 3 else None,
+                   i * 1.5 if i != 1 else None, i % 2 == 0, None, "x" if i == 0 else i])
+    other = wb.create_sheet("other")
+    other.append(["step", "value"])
+    for i in range(30):
+        other.append([i, i * 2])
+    wb.save(path)
+    return str(path)
+
+
+def test_sample_matches_read_excel(tmp_path):
+    path = _write_workbook(tmp_path / "book.xlsx")
+    pd.testing.assert_frame_equal(read_sheet_sample(path), pd.read_excel(path))
+    pd.testing.assert_frame_equal(read_sheet_sample(path, "other", nrows=10),
+                                  pd.read_excel(path, sheet_name="other", nrows=10))
+
+
+def test_empty_columns_are_float_nan(tmp_path):
+    df = read_sheet_sample(_write_workbook(tmp_path / "book.xlsx"))
+    assert df["empty"].dtype == "float64" and df["empty"].isna().all()
+    assert df["Unnamed: 6"].dtype == "float64"
+    assert df["id"].dtype == "int64"
+
+
+def test_list_sheets_reads_dimensions(tmp_path):
+    sheets = list_sheets(_write_workbook(tmp_path / "book.xlsx"))
+    assert [(s["name"], s["n_rows"], s["n_cols"]) for s in sheets] == [("data", 7, 8), ("other", 31, 2)]
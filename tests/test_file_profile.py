@@ -0,0 +1,95 @@
+from zero_shot_theory_generator.core.file_profile import StreamingFileProfile, update_file_profile
+
+
+def write(path, text, mode="w"):
+    with open(path, mode, newline="") as f:
+        f.write(text)
+
+
+def test_csv_append_is_read_incrementally(tmp_path):
+    data, state = tmp_path / "data.csv", str(tmp_path / "state")
+    write(data, "id,value\n1,10\n2,20\n")
+    profile = update_file_profile(str(data), state)
+    assert profile["mode"] == "full"
+    assert profile["n_rows"] == 2
+
+    assert update_file_profile(str(data), state)["mode"] == "unchanged"
+
+    write(data, "3,30\n4,\n", mode="a")
+    profile = update_file_profile(str(data), state)
+    assert profile["mode"] == "incremental"
+    assert profile["scanned_bytes"] == len("3,30\n4,\n")
+    assert profile["n_rows"] == 4
+    assert profile["columns"]["value"]["missing_rate"] == 0.25
+    assert profile["columns"]["value"]["max"] == 30
+    assert profile["columns"]["id"]["distinct"] == 4
+
+
+def test_incomplete_last_line_waits_for_the_rest(tmp_path):
+    data, state = tmp_path / "data.csv", str(tmp_path / "state")
+    write(data, "id,value\n1,10\n2,2")
+    assert update_file_profile(str(data), state)["n_rows"] == 1
+    write(data, "0\n", mode="a")
+    profile = update_file_profile(str(data), state)
+    assert profile["mode"] == "incremental"
+    assert profile["n_rows"] == 2
+    assert profile["columns"]["value"]["max"] == 20
+
+
+def test_rewritten_prefix_triggers_rescan(tmp_path):
+    data, state = tmp_path / "data.csv", str(tmp_path / "state")
+    write(data, "id,value\n1,10\n2,20\n")
+    update_file_profile(str(data), state)
+    write(data, "id,value\n9,90\n2,20\n3,30\n")
+    profile = update_file_profile(str(data), state)
+    assert profile["mode"] == "full"
+    assert profile["n_rows"] == 3
+    assert profile["columns"]["value"]["max"] == 90
+
+    write(data, "id,value\n9,90\n")
+    profile = update_file_profile(str(data), state)
+    assert profile["mode"] == "full"
+    assert profile["n_rows"] == 1
+
+
+def test_jsonl_append_counts_invalid_lines(tmp_path):
+    data, state = tmp_path / "data.jsonl", str(tmp_path / "state")
+    write(data, '{"a": 1}\n{"a": 2}\n')
+    assert update_file_profile(str(data), state)["n_rows"] == 2
+    write(data, 'not json\n{"a": 3, "b": "x"}\n', mode="a")
+    profile = update_file_profile(str(data), state)
+    assert profile["mode"] == "incremental"
+    assert profile["n_rows"] == 3
+    assert profile["invalid_lines"] == 1
+    assert profile["columns"]["b"]["missing_rate"] == round(2 / 3, 4)
+
+
+def test_other_formats_are_not_profiled(tmp_path):
+    data = tmp_path / "data.parquet"
+    write(data, "")
+    assert update_file_profile(str(data), str(tmp_path / "state")) is None
+
+
+def test_streaming_profile_matches_file_profile(tmp_path):
+    # The provisional parse lands inside the quoted multi-line field
+    text = 'id,note\n1,"multi\nline"\n2,plain\n3,"a,b"\n'
+    data, state = tmp_path / "data.csv", str(tmp_path / "state")
+    write(data, text)
+    provisional = []
+    stream = StreamingFileProfile("data.csv", on_provisional=lambda p: provisional.append(p.summary()),
+                                  provisional_bytes=len("id,note\n1,\"multi\nl"))
+    raw = text.encode("utf-8")
+    for i in range(0, len(raw), 5):
+        stream.feed(raw[i:i + 5])
+    stream.finish()
+    assert provisional and provisional[0]["mode"] == "streaming"
+    assert stream.done and not stream.failed
+    streamed = stream.summary()
+    assert streamed["mode"] == "streamed"
+
+    stream.save(str(data), state)
+    profile = update_file_profile(str(data), state)
+    assert profile["mode"] == "unchanged"
+    assert streamed["n_rows"] == profile["n_rows"] == 3
+    assert streamed["columns"] == profile["columns"]
+    assert update_file_profile(str(data), str(tmp_path / "fresh"))["columns"] == streamed["columns"]
@@ -0,0 +1,115 @@
+import http.client
+import json
+import os
+import socket
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+from http.server import ThreadingHTTPServer
+import pytest
+from zero_shot_theory_generator.service import http_server
+from zero_shot_theory_generator.service.http_server import (
+    AnalysisRequestHandler, JobManager, PoolRestartedError, QueueFullError
+)
+
+
+def fake_job(source):
+    """Stands in for the analysis in the worker processes."""
+    if source == "crash":
+        os._exit(1)
+    if source.startswith("sleep:"):
+        time.sleep(float(source[len("sleep:"):]))
+    return {"report": {}, "markdown": f"# {source}", "status_msg": "ok", "elapsed_sec": 0.0}
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(http_server, "_run_job", fake_job)
+    manager = JobManager(workers=1, queue_size=0)
+    yield manager
+    manager.shutdown()
+
+
+@pytest.fixture
+def server(manager):
+    handler = type("Handler", (AnalysisRequestHandler,), {"manager": manager, "sync_timeout": 30,
+                                                           "log_message": lambda *args: None})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def post(server, route, body, headers=None):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=30)
+    conn.request("POST", route, body=json.dumps(body), headers=headers or {})
+    response = conn.getresponse()
+    payload = json.loads(response.read())
+    conn.close()
+    return response.status, dict(response.getheaders()), payload
+
+
+def test_full_queue_is_rejected_until_a_slot_frees(manager):
+    job = manager.submit("sleep:0.5")
+    with pytest.raises(QueueFullError):
+        manager.submit("second")
+    assert manager.wait(job, 30)["status"] == "done"
+    assert manager.wait(manager.submit("third"), 30)["result"]["markdown"] == "# third"
+    assert manager.stats()["in_flight"] == 0
+
+
+def test_crashed_worker_pool_is_restarted_and_the_job_resubmitted(manager):
+    crashed = manager.wait(manager.submit("crash"), 30)
+    assert crashed["status"] == "error"
+    # The next submit finds the broken pool and lands on a fresh one instead of failing
+    assert manager.wait(manager.submit("after"), 30)["status"] == "done"
+    assert manager.stats()["in_flight"] == 0
+
+
+def test_pool_that_keeps_breaking_gives_up(manager, monkeypatch):
+    class BrokenExecutor:
+        def submit(self, *args):
+            raise BrokenProcessPool("worker died")
+
+        def shutdown(self, **kwargs):
+            pass
+
+    restarts = []
+    monkeypatch.setattr(manager, "_new_executor", lambda: restarts.append(1) or BrokenExecutor())
+    manager._executor.shutdown()
+    manager._executor = BrokenExecutor()
+    with pytest.raises(PoolRestartedError):
+        manager.submit("x")
+    assert len(restarts) == 2
+    assert manager.stats()["in_flight"] == 0
+
+
+def test_http_backpressure_and_errors(server, manager):
+    status, _, payload = post(server, "/analyze", {"path": "data.csv"})
+    assert status == 200 and payload["markdown"] == "# data.csv"
+
+    status, headers, payload = post(server, "/jobs", {"path": "sleep:0.5"})
+    assert status == 202 and headers["Location"] == f"/jobs/{payload['job_id']}"
+    status, headers, _ = post(server, "/jobs", {"path": "other"})
+    assert status == 429 and headers["Retry-After"]
+    manager.wait(manager.get(payload["job_id"]), 30)
+
+    assert post(server, "/jobs", {"nothing": 1})[0] == 400
+    assert post(server, "/nowhere", {})[0] == 404
+
+
+def test_http_pool_failure_is_503(server, manager, monkeypatch):
+    def fail(source):
+        raise PoolRestartedError("worker pool restarted")
+    monkeypatch.setattr(manager, "_submit_job", fail)
+    status, headers, payload = post(server, "/jobs", {"path": "x"})
+    assert status == 503 and headers["Retry-After"]
+    assert "restarted" in payload["error"]
+
+
+def test_bad_content_length_is_400(server):
+    with socket.create_connection(server.server_address, timeout=30) as sock:
+        sock.sendall(b"POST /jobs HTTP/1.1\r\nHost: x\r\nContent-Length: abc\r\nConnection: close\r\n\r\n{}")
+        response = sock.makefile("rb").readline()
+    assert response.split()[1] == b"400"
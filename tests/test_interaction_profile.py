@@ -0,0 +1,51 @@
+import json
+
+from zero_shot_theory_generator.core.interaction_profile import profile_interactions
+
+
+def test_csv_counts_degrees_and_explicit_ratings(tmp_path):
+    path = tmp_path / "ratings.csv"
+    # u1 rates i1 twice; u3 has a missing item, so it is not an interaction
+    path.write_text("user_id,item_id,rating\n"
+                    "u1,i1,5\nu1,i2,3\nu1,i1,4\nu2,i1,2\nu2,i3,1\nu3,,4\n")
+    profile = profile_interactions(str(path), "user_id", "item_id", "rating")
+    assert profile["n_rows"] == 6
+    assert profile["n_interactions"] == 5
+    assert (profile["n_users"], profile["n_items"]) == (3, 3)
+    assert profile["distinct_pairs"] == 4
+    assert profile["repeat_share"] == 0.2
+    assert profile["density"] == round(4 / 9, 3)
+    assert profile["users"]["degree"]["max"] == 3
+    assert profile["items"]["degree"]["max"] == 3
+    assert profile["users"]["exact"] and profile["users"]["cold_start_share"] == 1.0
+    assert profile["rating"] == {"min": 1.0, "max": 5.0, "mean": 3.1667, "std": 1.3437, "n_values": 5,
+                                 "implicit": False}
+
+
+def test_jsonl_ids_are_compared_as_strings(tmp_path):
+    path = tmp_path / "clicks.jsonl"
+    rows = [{"user": 7, "item": "a", "clicked": 1}, {"user": "7", "item": "b", "clicked": 1},
+            {"user": "x", "item": "a", "clicked": 0}, {"user": None, "item": "c", "clicked": 1}]
+    path.write_text("".join(json.dumps(r) + "\n" for r in rows))
+    profile = profile_interactions(str(path), "user", "item", "clicked")
+    assert profile["n_interactions"] == 3
+    assert profile["n_users"] == 2
+    # Each side counts every id it sees, also on rows missing the other id
+    assert profile["n_items"] == 3
+    assert profile["rating"]["implicit"]
+
+
+def test_keys_beyond_the_limit_are_estimated(tmp_path):
+    path = tmp_path / "big.csv"
+    path.write_text("user,item\n" + "".join(f"u{i},i{i % 3}\n" for i in range(50)))
+    profile = profile_interactions(str(path), "user", "item", max_keys=10)
+    assert not profile["users"]["exact"]
+    assert 45 <= profile["n_users"] <= 55
+    assert profile["items"]["exact"] and profile["n_items"] == 3
+
+
+def test_unsupported_or_empty_input_returns_none(tmp_path):
+    assert profile_interactions(str(tmp_path / "data.parquet"), "user", "item") is None
+    path = tmp_path / "empty.csv"
+    path.write_text("user,item\nu1,\n,i1\n")
+    assert profile_interactions(str(path), "user", "item") is None
@@ -0,0 +1,30 @@
+from zero_shot_theory_generator.core.cost_model import make_budget
+from zero_shot_theory_generator.core.pipeline_suggester import heuristic_pipeline, suggest_pipeline
+
+
+def make_meta(n_cols, n_rows=100, n_rows_estimate=None, high_cardinality=()):
+    meta = {"type": "tabular", "n_rows": n_rows,
+            "columns": [{"name": f"c{i}", "dtype": "float64", "n_unique": 50, "missing": 0.0}
+                        for i in range(n_cols)],
+            "high_cardinality_columns": list(high_cardinality)}
+    if n_rows_estimate is not None:
+        meta["n_rows_estimate"] = n_rows_estimate
+    return meta
+
+
+def test_models_follow_the_whole_file_row_estimate():
+    task = {"task": "classification", "target": "c0"}
+    assert heuristic_pipeline(task, make_meta(30))["model"] == "RandomForestClassifier"
+    assert heuristic_pipeline(task, make_meta(30, n_rows_estimate=50_000))["model"] == "XGBoostClassifier"
+    assert heuristic_pipeline(task, make_meta(5, n_rows_estimate=50_000, high_cardinality=["c1"]))["model"] \
+        == "CatBoostClassifier"
+    assert heuristic_pipeline(task, make_meta(5, n_rows=40, n_rows_estimate=40))["model"] == "LogisticRegression"
+    regression = {"task": "regression", "target": "c0"}
+    assert heuristic_pipeline(regression, make_meta(30, n_rows_estimate=50_000))["model"] == "XGBoostRegressor"
+
+
+def test_suggestion_reports_its_cost_estimate():
+    task = {"task": "classification", "target": "c0"}
+    pipeline = suggest_pipeline(task, make_meta(30, n_rows_estimate=50_000), budget=make_budget(4, 16, 60))
+    assert "cost_estimate" in pipeline
+    assert pipeline["model"]
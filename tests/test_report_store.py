@@ -0,0 +1,65 @@
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from zero_shot_theory_generator.utils.report_store import ReportStore
+from zero_shot_theory_generator.core.tabular_meta import TabularMetadata
+
+
+def committed_rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _append_and_exit(path, durable):
+    # Pool workers leave through os._exit, which skips the atexit flush
+    store = ReportStore(path, flush_interval=3600)
+    store.append({"task": {"task": "classification"}}, durable=durable)
+    os._exit(0)
+
+
+def test_reports_are_batched_until_batch_size(tmp_path):
+    path = str(tmp_path / "reports.db")
+    store = ReportStore(path, batch_size=3, flush_interval=3600)
+    store.append({"task": "a"})
+    store.append({"task": "b"})
+    assert committed_rows(path) == 0
+    store.append({"task": "c"})
+    assert committed_rows(path) == 3
+    store.close()
+
+
+def test_durable_append_is_committed_on_return(tmp_path):
+    path = str(tmp_path / "reports.db")
+    store = ReportStore(path, batch_size=32, flush_interval=3600)
+    report_id = store.append({"task": {"task": "regression"}}, durable=True)
+    assert committed_rows(path) == 1
+    assert ReportStore(path).get(report_id)["task"] == {"task": "regression"}
+    store.close()
+
+
+def test_durable_append_survives_worker_exit(tmp_path):
+    path = str(tmp_path / "reports.db")
+    ReportStore(path).close()
+    for durable in (False, True):
+        try:
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                pool.submit(_append_and_exit, path, durable).result()
+        except Exception:
+            # The pool reports the exited worker as broken; only the store contents matter here
+            pass
+    assert committed_rows(path) == 1
+
+
+def test_columnar_metadata_round_trip(tmp_path):
+    meta = TabularMetadata(n_rows=10)
+    meta.add_column("x", "float64", 10, 0.0, stats=(0.0, 9.0, 4.5, 2.9))
+    store = ReportStore(str(tmp_path / "reports.db"))
+    report_id = store.append({"metadata": meta, "task": {"task": "clustering"}})
+    restored = store.get(report_id)
+    assert isinstance(restored["metadata"], TabularMetadata)
+    assert restored["metadata"].to_dict() == meta.to_dict()
+    assert store.find(task="clustering")[0]["id"] == report_id
+    store.close()
@@ -0,0 +1,92 @@
+import sqlite3
+import pytest
+from zero_shot_theory_generator.core.schema_index import SchemaIndex, task_applies
+
+
+def make_meta(*names):
+    return {"type": "tabular", "n_rows": 100,
+            "columns": [{"name": n, "dtype": "float64", "n_unique": 50} for n in names]}
+
+
+def test_exact_match_is_preferred_then_similarity(tmp_path):
+    index = SchemaIndex(str(tmp_path / "index.db"))
+    names = [f"col_{i}" for i in range(20)]
+    index.add("near", make_meta(*names[:19], "other"))
+    index.add("exact", make_meta(*names))
+    index.add("far", make_meta("x", "y"))
+    matches = index.matches(make_meta(*names), threshold=0.8)
+    assert [report_id for report_id, _ in matches] == ["exact", "near"]
+    assert matches[0][1] == 1.0
+    assert index.lookup(make_meta(*names), threshold=0.8) == ("exact", 1.0)
+    assert index.lookup(make_meta("a", "b"), threshold=0.8) is None
+
+
+def test_own_dataset_is_excluded(tmp_path):
+    index = SchemaIndex(str(tmp_path / "index.db"))
+    meta = make_meta("age", "income", "label")
+    index.add("first_run", meta, dataset_fp="fp-a")
+    index.add("sibling", meta, dataset_fp="fp-b")
+    assert index.matches(meta, exclude_fp="fp-a") == [("sibling", 1.0)]
+    assert index.matches(meta, exclude_fp="fp-c")[0] == ("sibling", 1.0)
+    assert index.matches(make_meta("age", "income", "label"), exclude_fp="fp-b") == [("first_run", 1.0)]
+
+
+def test_index_without_dataset_fingerprints_is_upgraded(tmp_path):
+    path = str(tmp_path / "index.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE schemas (report_id TEXT PRIMARY KEY, schema_fp TEXT NOT NULL, "
+                 "tokens TEXT NOT NULL, created_at REAL NOT NULL)")
+    conn.commit()
+    conn.close()
+    index = SchemaIndex(path)
+    index.add("r1", make_meta("a"), dataset_fp="fp")
+    assert index.matches(make_meta("a")) == [("r1", 1.0)]
+
+
+def test_task_applies_only_with_existing_columns():
+    meta = make_meta("age", "label")
+    assert task_applies({"task": "classification", "target": "label"}, meta)
+    assert not task_applies({"task": "classification", "target": "churn"}, meta)
+
+
+def _engine(output_dir):
+    pytest.importorskip("datasets")
+    pytest.importorskip("google.generativeai")
+    from benchmarks.run_benchmarks import FakeLLM
+    from zero_shot_theory_generator.core.engine import AnalysisEngine
+    return AnalysisEngine(output_dir=str(output_dir), llm=FakeLLM(), reuse_threshold=0.9)
+
+
+def _write_csv(path, seed):
+    rows = ["age,income,label"] + [f"{(seed * 7 + i) % 70 + 18},{(seed * 31 + i * 13) % 997},{i % 2}"
+                                   for i in range(300)]
+    path.write_text("\n".join(rows) + "\n")
+    return str(path)
+
+
+def test_engine_reuses_other_datasets_but_not_itself(tmp_path):
+    engine = _engine(tmp_path / "out")
+    first, second = _write_csv(tmp_path / "a.csv", 1), _write_csv(tmp_path / "b.csv", 2)
+    report, _, _, _ = engine._run(first)
+    assert "reused_from" not in report
+    # Nothing changed: everything but the cheap uncached stages comes from the memo cache
+    report, _, status, recomputed = engine._run(first)
+    assert "reused_from" not in report and "Reused" not in status
+    assert set(recomputed) <= {"dataset_path", "dataset_signature", "prior"}
+    report, _, status, _ = engine._run(second)
+    assert report["reused_from"]["similarity"] == 1.0
+
+
+def test_engine_falls_back_when_the_best_prior_is_deleted(tmp_path):
+    engine = _engine(tmp_path / "out")
+    first, second, third = (_write_csv(tmp_path / f"{n}.csv", seed) for n, seed in (("a", 1), ("b", 2), ("c", 3)))
+    engine._run(first)
+    first_id = engine.report_store.find(limit=1)[0]["id"]
+    engine.reuse_threshold = None
+    engine._run(second)
+    engine.reuse_threshold = 0.9
+    second_id = engine.report_store.find(limit=1)[0]["id"]
+    with engine.report_store._lock, engine.report_store._conn:
+        engine.report_store._conn.execute("DELETE FROM reports WHERE id = ?", (second_id,))
+    report, _, _, _ = engine._run(third)
+    assert report["reused_from"]["report_id"] == first_id
@@ -0,0 +1,87 @@
+from zero_shot_theory_generator.core.stage_graph import Stage, StageGraph
+
+
+def make_graph(calls, keep=None):
+    def record(name, fn):
+        def run(*args, **kwargs):
+            calls.append(name)
+            return fn(*args, **kwargs)
+        return run
+
+    return StageGraph([
+        Stage("double", record("double", lambda x: x * 2), ["x"]),
+        Stage("offset", record("offset", lambda y: y + 1), ["y"]),
+        Stage("total", record("total", lambda d, o, seed=None: [d + o, seed]), ["double", "offset"],
+              params=["seed"], keep=keep),
+    ])
+
+
+def test_rerun_with_same_inputs_is_memoized():
+    calls = []
+    graph = make_graph(calls)
+    values, recomputed = graph.run({"x": 1, "y": 1})
+    assert values["total"] == [4, None]
+    assert recomputed == ["double", "offset", "total"]
+    values, recomputed = graph.run({"x": 1, "y": 1})
+    assert values["total"] == [4, None]
+    assert recomputed == []
+    assert calls == ["double", "offset", "total"]
+
+
+def test_changed_input_recomputes_only_downstream():
+    graph = make_graph([])
+    graph.run({"x": 1, "y": 1})
+    values, recomputed = graph.run({"x": 1, "y": 5})
+    assert recomputed == ["offset", "total"]
+    assert values["total"] == [8, None]
+
+
+def test_unchanged_output_stops_invalidation():
+    graph = StageGraph([
+        Stage("parity", lambda x: x % 2, ["x"]),
+        Stage("label", lambda p: "odd" if p else "even", ["parity"]),
+    ])
+    graph.run({"x": 1})
+    _, recomputed = graph.run({"x": 3})
+    assert recomputed == ["parity"]
+
+
+def test_param_change_recomputes_its_stage():
+    graph = make_graph([])
+    graph.run({"x": 1, "y": 1}, params={"seed": 1})
+    values, recomputed = graph.run({"x": 1, "y": 1}, params={"seed": 2})
+    assert recomputed == ["total"]
+    assert values["total"] == [4, 2]
+
+
+def test_force_and_uncached_stages_run_again():
+    calls = []
+    graph = StageGraph([
+        Stage("stat", lambda x: calls.append("stat") or x, ["x"], cache=False),
+        Stage("double", lambda s: calls.append("double") or s * 2, ["stat"]),
+    ])
+    graph.run({"x": 2})
+    _, recomputed = graph.run({"x": 2})
+    assert recomputed == ["stat"]
+    _, recomputed = graph.run({"x": 2}, force=["double"])
+    assert recomputed == ["stat", "double"]
+
+
+def test_rejected_output_is_not_memoized():
+    graph = make_graph([], keep=lambda total: total[0] > 100)
+    graph.run({"x": 1, "y": 1})
+    _, recomputed = graph.run({"x": 1, "y": 1})
+    assert recomputed == ["total"]
+    graph.run({"x": 50, "y": 1})
+    _, recomputed = graph.run({"x": 50, "y": 1})
+    assert recomputed == []
+
+
+def test_cache_is_bounded():
+    graph = StageGraph([Stage("double", lambda x: x * 2, ["x"])], max_entries=2)
+    for x in range(3):
+        graph.run({"x": x})
+    _, recomputed = graph.run({"x": 0})
+    assert recomputed == ["double"]
+    _, recomputed = graph.run({"x": 2})
+    assert recomputed == []
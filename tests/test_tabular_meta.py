@@ -0,0 +1,70 @@
+import pickle
+import numpy as np
+from zero_shot_theory_generator.core.tabular_meta import TabularMetadata
+
+
+def make_meta(names=("age", "city", "label")):
+    meta = TabularMetadata(n_rows=100, has_datetime=False, potential_timeseries=False)
+    meta.add_column(names[0], "int64", 40, 0.0, stats=(18, 90, 42.5, 12.1))
+    meta.add_column(names[1], "object", 7, 0.1, categorical=True)
+    meta.add_column(names[2], "int64", 2, 0.0, stats=(0, 1, None, 0.5), potential_target=True)
+    return meta
+
+
+def test_dict_view_matches_columns():
+    meta = make_meta()
+    assert meta["numeric_columns"] == ["age", "label"]
+    assert meta["categorical_columns"] == ["city"]
+    assert meta["potential_targets"] == ["label"]
+    assert meta["columns"][0] == {"name": "age", "dtype": "int64", "n_unique": 40, "missing": 0.0,
+                                  "min": 18.0, "max": 90.0, "mean": 42.5, "std": 12.1}
+    assert meta["columns"][2]["mean"] is None
+
+
+def test_bytes_round_trip():
+    meta = make_meta()
+    meta["notes"] = {"source": "test"}
+    for compress in (True, False):
+        restored = TabularMetadata.from_bytes(meta.to_bytes(compress=compress))
+        assert restored.to_dict() == meta.to_dict()
+        assert restored.digest() == meta.digest()
+
+
+def test_bytes_round_trip_keeps_non_string_names():
+    meta = make_meta(names=(0, 1, "label"))
+    restored = TabularMetadata.from_bytes(meta.to_bytes())
+    assert restored["numeric_columns"] == [0, "label"]
+    assert [c["name"] for c in restored["columns"]] == [0, 1, "label"]
+
+
+def test_bytes_encode_numpy_extras():
+    meta = make_meta()
+    meta["correlations"] = np.array([[1.0, 0.5], [0.5, 1.0]])
+    meta["n_duplicates"] = np.int64(3)
+    restored = TabularMetadata.from_bytes(meta.to_bytes())
+    assert restored["correlations"] == [[1.0, 0.5], [0.5, 1.0]]
+    assert restored["n_duplicates"] == 3
+
+
+def test_empty_round_trip():
+    meta = TabularMetadata()
+    restored = TabularMetadata.from_bytes(meta.to_bytes())
+    assert restored.to_dict() == meta.to_dict()
+
+
+def test_pickle_keeps_extras_as_is():
+    meta = make_meta(names=(0, "city", "label"))
+    meta["correlations"] = np.array([1.0, 0.5])
+    restored = pickle.loads(pickle.dumps(meta))
+    assert isinstance(restored["correlations"], np.ndarray)
+    np.testing.assert_array_equal(restored["correlations"], meta["correlations"])
+    assert restored["columns"][0]["name"] == 0
+    assert restored.digest() == meta.digest()
+
+
+def test_copy_has_own_extras():
+    meta = make_meta()
+    clone = meta.copy()
+    clone["added"] = 1
+    assert "added" not in meta
+    assert clone["columns"][1] == meta["columns"][1]
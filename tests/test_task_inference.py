@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from zero_shot_theory_generator.core.tabular_meta import TabularMetadata
+from zero_shot_theory_generator.core.task_inference import (
+    _column_flags, _name_flags, column_index, infer_task
+)
+
+# (name, dtype, n_unique, is_datetime, potential_target)
+SCHEMAS = {
+    "classification": ([("age", "int64", 40, False, False), ("city", "object", 7, False, False),
+                        ("label", "int64", 5, False, True)],
+                       {"task": "classification", "target": "label", "confidence": 0.9}),
+    "binary": ([("x", "float64", 90, False, False), ("Result", "object", 2, False, False)],
+               {"task": "binary_classification", "target": "Result", "confidence": 0.9}),
+    "first_named_column": ([("type", "object", 3, False, False), ("price", "float64", 80, False, False)],
+                           {"task": "classification", "target": "type", "confidence": 0.9}),
+    "regression_before_classification": ([("x", "float64", 90, False, False), ("target", "int64", 2, False, False)],
+                                         {"task": "regression", "target": "target", "confidence": 0.9}),
+    "regression_suffix": ([("x", "float64", 90, False, False), ("house_target", "float64", 90, False, False)],
+                          {"task": "regression", "target": "house_target", "confidence": 0.9}),
+    "regression_substring": ([("id", "int64", 100, False, False), ("unit_Amount_usd", "float64", 90, False, False)],
+                             {"task": "regression", "target": "unit_Amount_usd", "confidence": 0.85}),
+    "timeseries": ([("Date", "datetime64[ns]", 100, True, False), ("sales", "float64", 90, False, False)],
+                   {"task": "time_series_forecasting", "time_col": "Date", "target": "sales", "confidence": 0.9}),
+    "timeseries_fallback": ([("when", "datetime64[ns]", 100, True, False), ("load", "float64", 90, False, False)],
+                            {"task": "time_series_forecasting", "time_col": "when", "target": "load",
+                             "confidence": 0.85}),
+    "anomaly": ([("amount", "float64", 90, False, False), ("is_fraud", "int64", 2, False, False)],
+                {"task": "anomaly_detection", "target": "is_fraud", "confidence": 0.9}),
+    "recommendation": ([("user_id", "int64", 50, False, False), ("item_id", "int64", 80, False, False),
+                        ("rating", "int64", 5, False, False)],
+                       {"task": "recommendation", "user_col": "user_id", "item_col": "item_id",
+                        "confidence": 0.85, "rating_col": "rating"}),
+    "image_column": ([("image_path", "object", 100, False, False), ("label", "int64", 3, False, False)],
+                     {"task": "image_classification", "input": "image_path", "confidence": 0.9}),
+    "labels_and_cases": ([("labels", "object", 1, False, False), ("cases", "object", 40, False, False)],
+                         {"task": "regression", "target": "cases", "confidence": 0.9}),
+    "clustering": ([(f"f{i}", "float64", 90, False, False) for i in range(5)],
+                   {"task": "clustering", "confidence": 0.7}),
+    "unsupervised": ([("name", "object", 90, False, False)], {"task": "unsupervised", "confidence": 0.5}),
+}
+
+
+def build_meta(columns):
+    meta = TabularMetadata(n_rows=100, has_datetime=any(c[3] for c in columns))
+    for name, dtype, n_unique, is_datetime, potential_target in columns:
+        numeric = dtype.startswith(("int", "float"))
+        meta.add_column(name, dtype, n_unique, 0.0, is_datetime=is_datetime,
+                        stats=(0, 1, 0.5, 0.1) if numeric else None, categorical=dtype == "object",
+                        potential_target=potential_target)
+    return meta
+
+
+@pytest.mark.parametrize("schema", sorted(SCHEMAS))
+def test_expected_task(schema):
+    columns, expected = SCHEMAS[schema]
+    assert infer_task(build_meta(columns)) == expected
+
+
+@pytest.mark.parametrize("schema", sorted(SCHEMAS))
+def test_columnar_and_dict_metadata_agree(schema):
+    meta = build_meta(SCHEMAS[schema][0])
+    assert infer_task(meta) == infer_task(meta.to_dict())
+
+
+def test_name_scan_matches_per_name_rules():
+    rng = random.Random(0)
+    words = ["user", "item", "price", "value", "date", "fraud", "label", "class", "_target", "_label",
+             "rate", "count", "Cases", "y", "type", "x", "İd", "col\nname", "_", "ß"]
+    for _ in range(300):
+        names = ["".join(rng.choice(words) for _ in range(rng.randint(1, 3))) for _ in range(rng.randint(1, 12))]
+        expected = {i: f for i, f in ((i, _name_flags(n.lower())) for i, n in enumerate(names)) if f}
+        assert _column_flags(names) == expected, names
+
+
+def test_index_is_rebuilt_when_the_column_list_grows():
+    meta = build_meta(SCHEMAS["unsupervised"][0]).to_dict()
+    assert infer_task(meta)["task"] == "unsupervised"
+    meta["columns"].append({"name": "label", "dtype": "int64", "n_unique": 3})
+    assert column_index(meta["columns"]).explicit_target[1]["name"] == "label"
+    assert infer_task(meta)["task"] == "classification"
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from zero_shot_theory_generator.core.timeseries_profile import profile_timeseries
+
+
+def _write_series(path, n=24 * 60, shuffle=False, empty_head=0):
+    t = pd.date_range("2024-01-01", periods=n, freq="h")
+    df = pd.DataFrame({"date": t.strftime("%Y-%m-%d %H:%M"),
+                       "load": 10 + 3 * np.sin(np.arange(n) * 2 * np.pi / 24),
+                       "price": (np.arange(n) * 0.37) % 11})
+    df.loc[:empty_head - 1, "date"] = None
+    if shuffle:
+        df = df.sample(frac=1, random_state=0)
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def test_daily_season_in_hourly_data(tmp_path):
+    profile = profile_timeseries(_write_series(tmp_path / "s.csv"), "date", ["load"], target="load")
+    assert profile["frequency"] == "h"
+    assert profile["is_sorted"]
+    assert profile["n_gaps"] == 0
+    assert profile["seasonal_period"] == 24
+
+
+def test_unsorted_file_is_profiled_on_the_whole_series(tmp_path):
+    profile = profile_timeseries(_write_series(tmp_path / "s.csv", shuffle=True), "date", ["load"], target="load")
+    assert not profile["is_sorted"]
+    assert profile["frequency"] == "h"
+    assert profile["seasonal_period"] == 24
+
+
+def test_not_streamable_format_returns_none(tmp_path):
+    assert profile_timeseries(str(tmp_path / "s.parquet"), "date", ["load"]) is None
+
+
+def test_engine_profiles_date_column_missing_from_the_head(tmp_path):
+    pytest.importorskip("datasets")
+    pytest.importorskip("google.generativeai")
+    from benchmarks.run_benchmarks import FakeLLM
+    from zero_shot_theory_generator.core.engine import AnalysisEngine
+    # The sampled head has no dates, so the task is not chosen as forecasting
+    path = _write_series(tmp_path / "s.csv", empty_head=150)
+    engine = AnalysisEngine(output_dir=str(tmp_path / "out"), llm=FakeLLM(), reuse_threshold=None)
+    report, _, _, _ = engine._run(path)
+    profile = report["metadata"]["timeseries_profile"]
+    assert profile["time_col"] == "date"
+    assert profile["frequency"] == "h"
@@ -0,0 +1,59 @@
+import pytest
+from zero_shot_theory_generator.core.stage_graph import Stage, StageGraph
+from zero_shot_theory_generator.utils.tracing import DISABLED_TRACER, NULL_SPAN, StageMetrics, Tracer
+
+
+def fail(_):
+    raise ValueError("bad input")
+
+
+def run_failing(tracer):
+    graph = StageGraph([Stage("parse", lambda x: x + 1, ["x"]), Stage("boom", fail, ["parse"])])
+    with pytest.raises(ValueError):
+        graph.run({"x": 1}, tracer=tracer)
+
+
+def test_spans_record_timings_and_errors():
+    tracer = Tracer()
+    run_failing(tracer)
+    assert [s["name"] for s in tracer.spans] == ["parse", "boom"]
+    assert "error" not in tracer.spans[0]
+    assert tracer.spans[1]["error"] == "ValueError"
+    assert tracer.spans[0]["wall_sec"] >= 0 and tracer.spans[0]["cpu_sec"] >= 0
+
+
+def test_disabled_tracer_records_nothing():
+    assert DISABLED_TRACER.span("x") is NULL_SPAN
+    run_failing(DISABLED_TRACER)
+    assert DISABLED_TRACER.spans == []
+
+
+def test_metrics_count_runs_and_errors():
+    metrics = StageMetrics()
+    for _ in range(2):
+        tracer = Tracer()
+        run_failing(tracer)
+        metrics.observe(tracer.spans)
+    text = metrics.to_prometheus()
+    assert 'zstg_stage_runs_total{stage="boom"} 2' in text
+    assert 'zstg_stage_errors_total{stage="boom"} 2' in text
+    assert 'zstg_stage_errors_total{stage="parse"} 0' in text
+
+
+def _engine(output_dir):
+    pytest.importorskip("datasets")
+    pytest.importorskip("google.generativeai")
+    from benchmarks.run_benchmarks import FakeLLM
+    from zero_shot_theory_generator.core.engine import AnalysisEngine
+    return AnalysisEngine(output_dir=str(output_dir), llm=FakeLLM(), reuse_threshold=None, tracing=True)
+
+
+def test_failing_engine_stage_increments_the_error_counter(tmp_path):
+    engine = _engine(tmp_path / "out")
+    data = tmp_path / "data.json"
+    data.write_text("{not json")
+    with pytest.raises(Exception) as info:
+        engine.analyze(str(data))
+    assert info.value.spans[-1]["error"]
+    text = engine.metrics.to_prometheus()
+    assert 'zstg_stage_errors_total{stage="detect_dataset"} 1' in text
@@ -18,3 +18,43 @@ if not GEMINI_API_KEY:
     GEMINI_API_KEY = ""
 OUTPUT_DIR = os.path.join(project_root, "ui", "outputs")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+# Per-stage timing/memory spans (see utils/tracing.py); tracemalloc is a separate opt-in
+TRACE_ENABLED = os.getenv("ZSTG_TRACE", "").lower() in ("1", "true", "yes")
+TRACE_MEMORY = os.getenv("ZSTG_TRACE_MEMORY", "").lower() in ("1", "true", "yes")
+
+# Reuse task/pipeline/theory of a prior report whose schema is at least this similar (Jaccard);
+# set ZSTG_REUSE_THRESHOLD=off to always run the full pipeline
+_reuse = os.getenv("ZSTG_REUSE_THRESHOLD", "0.9").lower()
+SCHEMA_REUSE_THRESHOLD = None if _reuse in ("off", "none", "") else float(_reuse)
+
+# Training budget used by the cost model when choosing models (core/cost_model.py);
+# cores and RAM default to this machine, the time limit applies to one model fit
+BUDGET_CORES = int(os.getenv("ZSTG_BUDGET_CORES", "0")) or None
+BUDGET_RAM_GB = float(os.getenv("ZSTG_BUDGET_RAM_GB", "0")) or None
+BUDGET_MINUTES = float(os.getenv("ZSTG_BUDGET_MINUTES", "30"))
+
+# CPU time the explainability cost plan sizes techniques for (core/explainability.py)
+EXPLAIN_MINUTES = float(os.getenv("ZSTG_EXPLAIN_MINUTES", "10"))
+
+# Seconds for the quick baseline evaluation of the suggested pipeline (utils/eval_utils.py); 0 disables it
+EVAL_SECONDS = float(os.getenv("ZSTG_EVAL_SECONDS", "0"))
+
+# Keep a whole-file column profile of CSV/TSV/JSONL datasets with a byte-offset checkpoint
+# (core/file_profile.py), so re-runs on append-only files only read the new bytes
+INCREMENTAL_PROFILE = os.getenv("ZSTG_INCREMENTAL_PROFILE", "").lower() in ("1", "true", "yes")
+
+# Profile CSV/TSV/JSONL URL downloads while they stream in: a provisional report is built from
+# the first megabytes, and the finished profile is checkpointed so detect does not read the file again
+STREAM_PROFILE = os.getenv("ZSTG_STREAM_PROFILE", "1").lower() in ("1", "true", "yes")
+
+# Content-addressed store for downloaded datasets (utils/dataset_store.py); least recently
+# used files are evicted once it grows past ZSTG_STORE_MAX_GB
+DATASET_STORE_DIR = os.getenv("ZSTG_STORE_DIR") or os.path.join(OUTPUT_DIR, "datasets")
+DATASET_STORE_MAX_GB = float(os.getenv("ZSTG_STORE_MAX_GB", "20"))
+
+# Profile every sheet of multi-sheet .xlsx workbooks (in parallel), not only the first one
+EXCEL_ALL_SHEETS = os.getenv("ZSTG_EXCEL_ALL_SHEETS", "").lower() in ("1", "true", "yes")
+
+# Unix socket of the analysis daemon (service/daemon.py), which keeps the pipeline loaded between CLI calls
+DAEMON_SOCKET = os.getenv("ZSTG_DAEMON_SOCKET") or os.path.join(OUTPUT_DIR, "daemon.sock")
@@ -0,0 +1,441 @@
+"""
+Training-cost estimates for the models suggest_pipeline can pick.
+
+Each model has a rough operation count and peak memory as a function of the
+workload (rows, encoded features, classes, images, tokens, interactions).
+Operations are turned into seconds with throughputs measured on this machine
+(a BLAS matmul for dense/neural models, a sort for tree/scan style models),
+and every measured fit reported through CostModel.observe() corrects that
+model's estimates from then on. Calibration is persisted as JSON.
+
+    python -m zero_shot_theory_generator.core.cost_model --calibrate
+"""
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from zero_shot_theory_generator.config.settings import OUTPUT_DIR, BUDGET_CORES, BUDGET_RAM_GB, BUDGET_MINUTES
+
+DEFAULT_CALIBRATION = os.path.join(OUTPUT_DIR, "cost_model.json")
+# Used until the machine has been measured (and if numpy is unavailable)
+_DEFAULT_MACHINE = {"dense_ops_per_core": 1e10, "scan_ops_per_core": 2e8}
+# Share of the RAM budget a single fit may use; the rest is left for the process and OS
+_MEMORY_HEADROOM = 0.8
+# Weight of a new measurement in the per-model correction (log-space moving average)
+_ALPHA = 0.3
+# One-hot width cap per categorical column
+_MAX_ONE_HOT = 100
+
+GB = 1024 ** 3
+
+
+def _log2(n):
+    return math.log2(max(n, 2))
+
+
+def _cnn(gflops, params_m, act_mb, native_px=224):
+    """Image model trained for 10 epochs: forward+backward ~3x forward FLOPs, Adam keeps 4 copies of the weights."""
+    def ops(w):
+        return 3 * 10 * w["images"] * gflops * 1e9 * w["pixels"] / native_px ** 2
+
+    def mem(w):
+        return params_m * 1e6 * 4 * 4 + 32 * act_mb * 1e6 * w["pixels"] / native_px ** 2
+
+    def predict(w):
+        return gflops * 1e9 * w["pixels"] / native_px ** 2
+
+    return {"ops": ops, "mem": mem, "predict": predict, "rate": "dense", "parallel": True}
+
+
+def _transformer(params_m, epochs=3):
+    """Fine-tuning: ~6 FLOPs per parameter per token; batch of 16 with ~1 MB of activations per token."""
+    def ops(w):
+        return 6 * params_m * 1e6 * w["rows"] * w["tokens"] * epochs
+
+    def mem(w):
+        return params_m * 1e6 * 4 * 4 + 16 * w["tokens"] * 1e6
+
+    def predict(w):
+        return 2 * params_m * 1e6 * w["tokens"]
+
+    return {"ops": ops, "mem": mem, "predict": predict, "rate": "dense", "parallel": True}
+
+
+def _matrix(w, copies=2):
+    return copies * w["rows"] * w["features"] * 8
+
+
+MODELS = {
+    # Tabular
+    "LinearRegression": {
+        "ops": lambda w: w["rows"] * w["features"] ** 2 + w["features"] ** 3,
+        "mem": lambda w: _matrix(w, 3), "rate": "dense", "parallel": True},
+    "LogisticRegression": {
+        "ops": lambda w: 100 * w["rows"] * w["features"] * (w["classes"] if w["classes"] > 2 else 1),
+        "mem": lambda w: _matrix(w, 3), "rate": "dense", "parallel": False},
+    "RandomForestClassifier": {
+        "ops": lambda w: 100 * w["rows"] * math.sqrt(w["features"]) * _log2(w["rows"]) ** 2 / 2,
+        "mem": lambda w: _matrix(w, 1) + 100 * w["rows"] * 100, "rate": "scan", "parallel": True},
+    "XGBoostClassifier": {
+        "ops": lambda w: 2 * 100 * w["rows"] * w["features"] * (w["classes"] if w["classes"] > 2 else 1),
+        "mem": lambda w: _matrix(w, 1) * 1.5, "rate": "scan", "parallel": True},
+    "CatBoostClassifier": {
+        "ops": lambda w: 1000 * w["rows"] * (w["raw_features"] + math.sqrt(w["cat_cardinality"])) / 2,
+        "mem": lambda w: _matrix(w, 2), "rate": "scan", "parallel": True},
+    # Time series
+    "ARIMA": {
+        "ops": lambda w: 50 * 1250 * w["rows"], "mem": lambda w: 400 * w["rows"], "rate": "scan", "parallel": False},
+    "Prophet": {
+        "ops": lambda w: 2.5e5 * w["rows"], "mem": lambda w: 1600 * w["rows"] + 200e6, "rate": "scan",
+        "parallel": False},
+    "LSTM": {
+        "ops": lambda w: 6 * 50 * w["rows"] * 30 * 4 * 64 * (64 + w["raw_features"]),
+        "mem": lambda w: 30 * w["rows"] * w["raw_features"] * 8 + 100e6, "rate": "dense", "parallel": True},
+    # Clustering / anomaly detection
+    "KMeans": {
+        "ops": lambda w: 10 * 30 * 8 * w["rows"] * w["features"],
+        "mem": lambda w: _matrix(w, 2), "rate": "dense", "parallel": True},
+    "MiniBatchKMeans": {
+        "ops": lambda w: 3 * 100 * 1024 * 8 * w["features"] + 8 * w["rows"] * w["features"],
+        "mem": lambda w: _matrix(w, 1), "rate": "dense", "parallel": False},
+    "DBSCAN": {
+        "ops": lambda w: 10 * w["rows"] * _log2(w["rows"]) * w["features"],
+        "mem": lambda w: _matrix(w, 1) + w["rows"] * min(w["rows"], 100) * 8, "rate": "scan", "parallel": True},
+    "IsolationForest": {
+        "ops": lambda w: 100 * 256 * 8 * w["features"] + 100 * 8 * w["rows"],
+        "mem": lambda w: _matrix(w, 1), "rate": "scan", "parallel": True},
+    "OneClassSVM": {
+        "ops": lambda w: w["rows"] ** 2 * w["features"],
+        "mem": lambda w: _matrix(w, 1) + min(w["rows"] ** 2 * 8, 200e6), "rate": "scan", "parallel": False},
+    "LocalOutlierFactor": {
+        "ops": lambda w: 20 * w["rows"] * _log2(w["rows"]) * w["features"],
+        "mem": lambda w: _matrix(w, 1) + 20 * 16 * w["rows"], "rate": "scan", "parallel": True},
+    # Recommendation
+    "CollaborativeFiltering": {
+        "ops": lambda w: w["interactions"] ** 2 / max(w["users"], 1),
+        "mem": lambda w: 12 * w["interactions"] + 12 * w["items"] * min(w["items"], 200), "rate": "scan",
+        "parallel": True},
+    "MatrixFactorization": {
+        "ops": lambda w: 15 * (w["interactions"] * 64 ** 2 + (w["users"] + w["items"]) * 64 ** 3),
+        "mem": lambda w: 12 * w["interactions"] + 8 * 64 * (w["users"] + w["items"]), "rate": "dense",
+        "parallel": True},
+    "Popularity": {
+        "ops": lambda w: w["interactions"], "mem": lambda w: 8 * (w["items"] + w["interactions"]), "rate": "scan",
+        "parallel": False},
+    # Images
+    "ResNet18": _cnn(1.8, 11.7, 25),
+    "ResNet50": _cnn(4.1, 25.6, 100),
+    "EfficientNetB7": _cnn(5.3, 66, 400),
+    "MobileNetV3Small": _cnn(0.06, 2.5, 10),
+    "YOLO": _cnn(8.7, 3.2, 200, native_px=640),
+    "FasterRCNN": _cnn(180, 41, 800, native_px=640),
+    "SSD": _cnn(35, 26, 300, native_px=640),
+    # Text
+    "DistilBERT": _transformer(66),
+    "BERT": _transformer(110),
+    "BERT-NER": _transformer(110),
+    "RoBERTa": _transformer(125),
+    "T5": _transformer(220),
+    "MarianMT": _transformer(74),
+    "TfidfLogisticRegression": {
+        "ops": lambda w: 100 * w["rows"] * w["tokens"] * (w["classes"] if w["classes"] > 2 else 1),
+        "mem": lambda w: 12 * w["rows"] * w["tokens"] + 50_000 * 8 * max(w["classes"], 1), "rate": "scan",
+        "parallel": False},
+}
+# Operations for one prediction (explainers call the model thousands of times)
+_PREDICT = {
+    "LinearRegression": lambda w: w["features"],
+    "LogisticRegression": lambda w: w["features"] * (w["classes"] if w["classes"] > 2 else 1),
+    "RandomForestClassifier": lambda w: 100 * _log2(w["rows"]),
+    "XGBoostClassifier": lambda w: 100 * 6 * (w["classes"] if w["classes"] > 2 else 1),
+    "CatBoostClassifier": lambda w: 1000 * 6,
+    "ARIMA": lambda w: 50,
+    "Prophet": lambda w: 1e4,
+    "LSTM": lambda w: 2 * 30 * 4 * 64 * (64 + w["raw_features"]),
+    "KMeans": lambda w: 8 * w["features"],
+    "MiniBatchKMeans": lambda w: 8 * w["features"],
+    "DBSCAN": lambda w: _log2(w["rows"]) * w["features"],
+    "IsolationForest": lambda w: 100 * 8,
+    "OneClassSVM": lambda w: w["rows"] / 2 * w["features"],
+    "LocalOutlierFactor": lambda w: 20 * _log2(w["rows"]) * w["features"],
+    "CollaborativeFiltering": lambda w: min(w["items"], 200),
+    "MatrixFactorization": lambda w: 64,
+    "Popularity": lambda w: 1,
+    "TfidfLogisticRegression": lambda w: w["tokens"] * 2,
+}
+for _name, _predict in _PREDICT.items():
+    MODELS[_name]["predict"] = _predict
+MODELS["RandomForestRegressor"] = MODELS["RandomForestClassifier"]
+MODELS["XGBoostRegressor"] = {**MODELS["XGBoostClassifier"],
+                              "ops": lambda w: 2 * 100 * w["rows"] * w["features"],
+                              "predict": lambda w: 100 * 6}
+
+# Cheaper substitutes, best first, tried when a model does not fit the budget
+FALLBACKS = {
+    "CatBoostClassifier": ["XGBoostClassifier", "RandomForestClassifier", "LogisticRegression"],
+    "XGBoostClassifier": ["RandomForestClassifier", "LogisticRegression"],
+    "RandomForestClassifier": ["XGBoostClassifier", "LogisticRegression"],
+    "XGBoostRegressor": ["RandomForestRegressor", "LinearRegression"],
+    "RandomForestRegressor": ["XGBoostRegressor", "LinearRegression"],
+    "LSTM": ["Prophet", "ARIMA"],
+    "Prophet": ["ARIMA"],
+    "KMeans": ["MiniBatchKMeans"],
+    "DBSCAN": ["KMeans", "MiniBatchKMeans"],
+    "OneClassSVM": ["IsolationForest"],
+    "LocalOutlierFactor": ["IsolationForest"],
+    "CollaborativeFiltering": ["MatrixFactorization", "Popularity"],
+    "MatrixFactorization": ["Popularity"],
+    "EfficientNetB7": ["ResNet50", "ResNet18", "MobileNetV3Small"],
+    "ResNet50": ["ResNet18", "MobileNetV3Small"],
+    "ResNet18": ["MobileNetV3Small"],
+    "FasterRCNN": ["SSD", "YOLO"],
+    "SSD": ["YOLO"],
+    "T5": ["BERT", "DistilBERT"],
+    "RoBERTa": ["BERT", "DistilBERT"],
+    "BERT": ["DistilBERT"],
+    "DistilBERT": ["TfidfLogisticRegression"],
+}
+
+
+def physical_ram_gb():
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / GB
+    except (ValueError, OSError, AttributeError):
+        return 8.0
+
+
+def make_budget(cores=None, ram_gb=None, max_minutes=None):
+    """Training budget: explicit values, else ZSTG_BUDGET_* settings, else this machine."""
+    return {
+        "cores": int(cores or BUDGET_CORES or os.cpu_count() or 1),
+        "ram_gb": round(float(ram_gb or BUDGET_RAM_GB or physical_ram_gb()), 2),
+        "max_minutes": float(max_minutes or BUDGET_MINUTES)
+    }
+
+
+def tabular_workload(n_rows, n_features, n_classes=2):
+    """Workload of a plain feature matrix (e.g. a measured baseline fit)."""
+    n_rows, n_features = max(int(n_rows), 1), max(int(n_features), 1)
+    return {
+        "rows": n_rows, "features": n_features, "raw_features": n_features, "cat_cardinality": 0,
+        "classes": n_classes, "images": n_rows, "pixels": 224 * 224, "tokens": 128,
+        "interactions": n_rows, "users": max(n_rows // 10, 1), "items": max(n_rows // 20, 1)
+    }
+
+
+def workload(task, meta):
+    """Size figures the cost formulas use, from dataset metadata (estimates where only a sample was read)."""
+    rows = ((meta.get("timeseries_profile") or {}).get("n_rows") or (meta.get("text_profile") or {}).get("n_docs")
+            or meta.get("n_rows_estimate") or meta.get("n_rows") or meta.get("n_items") or meta.get("n_lines") or 0)
+    target = task.get("target")
+    features = raw_features = cat_cardinality = 0
+    classes = 2
+    if meta.get("type") == "tabular":
+        categorical = set(meta.get("categorical_columns", []))
+        for c in meta.get("columns", []):
+            if c["name"] == target:
+                classes = max(c.get("n_unique", 2), 2)
+                continue
+            raw_features += 1
+            if c["name"] in categorical:
+                cat_cardinality += c.get("n_unique", 0)
+                features += min(c.get("n_unique", 1), _MAX_ONE_HOT)
+            else:
+                features += 1
+    elif meta.get("type") == "image_folder":
+        classes = max(meta.get("n_classes", 2), 2)
+        rows = meta.get("n_images") or rows or 1000
+    text = meta.get("text_profile") or {}
+    interactions = meta.get("interaction_profile") or {}
+    return {
+        "rows": max(int(rows), 1),
+        "features": max(features, 1),
+        "raw_features": max(raw_features, 1),
+        "cat_cardinality": cat_cardinality,
+        "classes": classes,
+        "images": max(int(rows), 1),
+        "pixels": 224 * 224,
+        "tokens": text.get("truncate_tokens", 128),
+        "interactions": interactions.get("n_interactions", max(int(rows), 1)),
+        "users": interactions.get("n_users", max(int(rows) // 10, 1)),
+        "items": interactions.get("n_items", max(int(rows) // 20, 1)),
+    }
+
+
+def measure_machine(dense_n=512, scan_n=1_000_000):
+    """Per-core throughputs of this machine: dense FLOP/s (BLAS matmul) and scan ops/s (sort)."""
+    import numpy as np
+    cores = os.cpu_count() or 1
+    a = np.random.rand(dense_n, dense_n)
+    a @ a  # warm up BLAS threads
+    start = time.perf_counter()
+    for _ in range(3):
+        a @ a
+    dense = 3 * 2 * dense_n ** 3 / (time.perf_counter() - start) / cores
+    x = np.random.rand(scan_n)
+    start = time.perf_counter()
+    np.sort(x)
+    scan = scan_n * math.log2(scan_n) / (time.perf_counter() - start)
+    return {"dense_ops_per_core": dense, "scan_ops_per_core": scan, "cpu_count": cores,
+            "measured_at": time.time()}
+
+
+class CostModel:
+    """
+    Fit-time and peak-memory estimates with calibration persisted to `path`:
+      machine:     measured throughputs (see measure_machine), taken on first use
+      corrections: per model, moving average of measured/predicted ratios from observe()
+    """
+
+    def __init__(self, path=DEFAULT_CALIBRATION):
+        self.path = path
+        self._lock = threading.Lock()
+        self.state = {"machine": None, "corrections": {}}
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.state.update(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"[WARN] Ignoring unreadable cost calibration {path}: {e}")
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def machine(self):
+        machine = self.state.get("machine")
+        if machine is None or machine.get("cpu_count") != os.cpu_count():
+            return self.calibrate()
+        return machine
+
+    def calibrate(self):
+        """(Re)measure this machine and persist the result."""
+        try:
+            machine = measure_machine()
+        except Exception as e:
+            print(f"[WARN] Machine calibration failed, using defaults: {e}")
+            # Kept in memory only, so the next process tries again
+            machine = self.state["machine"] = dict(_DEFAULT_MACHINE, cpu_count=os.cpu_count())
+            return machine
+        with self._lock:
+            self.state["machine"] = machine
+            self._save()
+        return machine
+
+    def _raw(self, model, w, cores):
+        spec = MODELS[model]
+        # Parallel fits scale sub-linearly with cores
+        return spec["ops"](w) / self.throughput(spec["rate"], cores, spec["parallel"]), spec["mem"](w)
+
+    def throughput(self, rate, cores=1, parallel=True):
+        """Operations per second for "dense" or "scan" work on `cores` cores."""
+        return self.machine()[f"{rate}_ops_per_core"] * (cores ** 0.8 if parallel else 1.0)
+
+    def estimate(self, model, w, cores=1):
+        """{"fit_sec", "peak_mem_gb", "calibrated"} for one model, or None if the model is unknown."""
+        if model not in MODELS:
+            return None
+        fit_sec, mem = self._raw(model, w, cores)
+        correction = self.state["corrections"].get(model, {})
+        return {
+            "fit_sec": fit_sec * correction.get("time", 1.0),
+            "peak_mem_gb": mem * correction.get("mem", 1.0) / GB,
+            "calibrated": correction.get("runs", 0) > 0
+        }
+
+    def observe(self, model, w, fit_sec, peak_mem_gb=None, cores=1):
+        """Fold one measured fit into the model's corrections."""
+        if model not in MODELS or fit_sec <= 0:
+            return
+        raw_sec, raw_mem = self._raw(model, w, cores)
+        with self._lock:
+            c = self.state["corrections"].setdefault(model, {"time": 1.0, "mem": 1.0, "runs": 0})
+            alpha = 1.0 if c["runs"] == 0 else _ALPHA
+            c["time"] = math.exp((1 - alpha) * math.log(c["time"]) + alpha * math.log(fit_sec / raw_sec))
+            if peak_mem_gb:
+                c["mem"] = math.exp((1 - alpha) * math.log(c["mem"]) + alpha * math.log(peak_mem_gb * GB / raw_mem))
+            c["runs"] += 1
+            self._save()
+
+
+def fits(estimate, budget):
+    return (estimate["fit_sec"] <= budget["max_minutes"] * 60
+            and estimate["peak_mem_gb"] <= budget["ram_gb"] * _MEMORY_HEADROOM)
+
+
+def choose_model(preferred, task, meta, budget, cost_model):
+    """
+    Keep the preferred model if its estimate fits the budget, else the first fallback that does,
+    else the cheapest candidate. Returns (model, estimate, fits_budget) or None for unknown models.
+    """
+    w = workload(task, meta)
+    candidates = [preferred] + FALLBACKS.get(preferred, [])
+    estimates = [(m, cost_model.estimate(m, w, budget["cores"])) for m in candidates]
+    estimates = [(m, e) for m, e in estimates if e is not None]
+    if not estimates:
+        return None
+    for model, estimate in estimates:
+        if fits(estimate, budget):
+            return model, estimate, True
+    model, estimate = min(estimates, key=lambda me: me[1]["fit_sec"])
+    return model, estimate, False
+
+
+def fit_to_budget(pipeline, task, meta, budget=None, cost_model=None):
+    """Replace the pipeline's model with one that fits the budget and attach its cost estimate."""
+    key = "model" if "model" in pipeline else "clustering" if "clustering" in pipeline else None
+    if key is None:
+        return pipeline
+    budget = budget or make_budget()
+    cost_model = cost_model or get_cost_model()
+    choice = choose_model(pipeline[key], task, meta, budget, cost_model)
+    if choice is None:
+        return pipeline
+    model, estimate, fits_budget = choice
+    cost = {
+        "fit_minutes": round(estimate["fit_sec"] / 60, 2),
+        "peak_memory_gb": round(estimate["peak_mem_gb"], 2),
+        "fits_budget": fits_budget,
+        "budget": budget,
+        "calibrated": estimate["calibrated"]
+    }
+    if model != pipeline[key]:
+        cost["replaced"] = pipeline[key]
+    pipeline = dict(pipeline)
+    pipeline[key] = model
+    pipeline["cost_estimate"] = cost
+    return pipeline
+
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def get_cost_model(path=DEFAULT_CALIBRATION):
+    """One shared cost model per calibration file in this process."""
+    path = os.path.abspath(path)
+    with _models_lock:
+        model = _models.get(path)
+        if model is None:
+            model = _models[path] = CostModel(path)
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate and inspect the training cost model")
+    parser.add_argument("--path", default=DEFAULT_CALIBRATION)
+    parser.add_argument("--calibrate", action="store_true", help="Re-measure this machine")
+    args = parser.parse_args()
+    cost_model = CostModel(args.path)
+    if args.calibrate:
+        cost_model.calibrate()
+    print(json.dumps({"machine": cost_model.machine(), "corrections": cost_model.state["corrections"]}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
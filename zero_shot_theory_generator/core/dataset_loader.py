@@ -1,14 +1,20 @@
 import os, pandas as pd, zipfile, json
+from itertools import islice
 import numpy as np
 from datetime import datetime
+import xml.etree.ElementTree as ET
+from zero_shot_theory_generator.core.tabular_meta import TabularMetadata
+from zero_shot_theory_generator.core.excel_reader import list_sheets, profile_sheets, read_sheet_sample
+
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp')
 
 def is_datetime(series):
     """Check if a pandas series contains datetime data."""
     if series.dtype.kind == 'M':  # numpy datetime64
         return True
     
-    # Try to convert to datetime
-    if series.dtype == object:
+    # Try to convert to datetime (text columns are "str" rather than object in pandas 3)
+    if series.dtype == object or pd.api.types.is_string_dtype(series.dtype):
         try:
             # Try sample of values for performance
             sample = series.dropna().head(10)
@@ -18,23 +24,71 @@ def is_datetime(series):
             pass
     return False
 
-def detect_dataset(path, sample_size=100):
-    """Enhanced dataset detection with better feature characterization."""
+def estimate_rows(path, sample_size=100):
+    """
+    Data rows in a delimited file: exact if it has at most sample_size rows, otherwise
+    extrapolated from the file size and the average length of the first sample_size rows.
+    """
+    with open(path, "rb") as f:
+        f.readline()  # header
+        start = f.tell()
+        n = 0
+        for _ in range(sample_size):
+            if not f.readline():
+                return n
+            n += 1
+        sampled = f.tell() - start
+        if not f.read(1):
+            return n
+    return int((os.path.getsize(path) - start) / max(sampled / n, 1))
+
+
+def _with_row_estimate(metadata, path, sample_size):
+    try:
+        metadata["n_rows_estimate"] = estimate_rows(path, sample_size)
+    except (OSError, ZeroDivisionError):
+        pass
+    return metadata
+
+
+def detect_dataset(path, sample_size=100, all_sheets=False, sheet_workers=None):
+    """
+    Enhanced dataset detection with better feature characterization.
+    For workbooks with several sheets, all_sheets also profiles every sheet (in up to sheet_workers processes).
+    """
     if path.endswith(".csv"):
         try:
             df = pd.read_csv(path, nrows=sample_size)
             metadata = analyze_tabular_data(df)
-            return metadata
+            return _with_row_estimate(metadata, path, sample_size)
         except pd.errors.ParserError:
             # Try with different delimiters
             try:
                 df = pd.read_csv(path, sep='\t', nrows=sample_size)
                 metadata = analyze_tabular_data(df)
-                return metadata
+                return _with_row_estimate(metadata, path, sample_size)
             except:
                 pass
 
-    elif path.endswith((".xlsx", ".xls")):
+    elif path.endswith(".xlsx"):
+        try:
+            # Streams the first sheet and stops after sample_size rows (see core/excel_reader.py)
+            df = read_sheet_sample(path, 0, sample_size)
+            metadata = analyze_tabular_data(df)
+            sheets = profile_sheets(path, sample_size, workers=sheet_workers) if all_sheets else list_sheets(path)
+            if sheets[0]["n_rows"]:
+                metadata["n_rows_estimate"] = sheets[0]["n_rows"] - 1
+            if len(sheets) > 1 or all_sheets:
+                metadata["sheets"] = sheets
+            return metadata
+        except (zipfile.BadZipFile, KeyError, ValueError, ET.ParseError) as e:
+            print(f"[WARN] Streaming Excel read failed ({e}), falling back to pandas")
+        try:
+            return analyze_tabular_data(pd.read_excel(path, nrows=sample_size))
+        except:
+            pass
+
+    elif path.endswith(".xls"):
         try:
             df = pd.read_excel(path, nrows=sample_size)
             metadata = analyze_tabular_data(df)
@@ -45,14 +99,14 @@ def detect_dataset(path, sample_size=100):
     elif path.endswith(".zip") and zipfile.is_zipfile(path):
         with zipfile.ZipFile(path) as z:
             file_list = z.namelist()
-            image_exts = ['.jpg', '.jpeg', '.png', '.gif', '.bmp']
-            
+
             # Check if it's an image dataset
-            image_files = [f for f in file_list if any(f.lower().endswith(ext) for ext in image_exts)]
+            image_files = [f for f in file_list if f.lower().endswith(IMAGE_EXTS)]
             if image_files:
                 dirs = [f.split("/")[0] for f in file_list if "/" in f]
                 classes = list(set(dirs))
-                return {"type": "image_folder", "classes": classes, "n_classes": len(classes)}
+                return {"type": "image_folder", "classes": classes, "n_classes": len(classes),
+                        "n_images": len(image_files)}
             
             # Try to find a CSV in the zip
             csv_files = [f for f in file_list if f.endswith('.csv')]
@@ -62,9 +116,10 @@ def detect_dataset(path, sample_size=100):
                     metadata = analyze_tabular_data(df)
                     return metadata
 
-    elif path.endswith(".txt"):
+    elif path.endswith((".txt", ".jsonl")):
         with open(path, "r", encoding="utf-8", errors='ignore') as f:
-            lines = f.readlines()[:sample_size]
+            # Only the sample is read; corpora are profiled in full by text_profile
+            lines = list(islice(f, sample_size))
         
         # Try to parse as JSONL
         try:
@@ -101,19 +156,34 @@ def detect_dataset(path, sample_size=100):
         else:
             return {"type": "json_unknown", "sample": str(type(data))}
 
+    elif os.path.isdir(path):
+        # Image folder laid out like the zipped one: class sub-folders of images
+        n_images, classes = 0, set()
+        for root, _, files in os.walk(path):
+            n = sum(1 for f in files if f.lower().endswith(IMAGE_EXTS))
+            if n:
+                n_images += n
+                rel = os.path.relpath(root, path)
+                if rel != ".":
+                    classes.add(rel.split(os.sep)[0])
+        if n_images:
+            classes = sorted(classes)
+            return {"type": "image_folder", "classes": classes, "n_classes": len(classes), "n_images": n_images}
+        raise ValueError(f"Unsupported dataset format: {path} (folder without images)")
+
     else:
         # Try to infer tabular from extensionless or unknown files
         try:
             df = pd.read_csv(path, nrows=sample_size)
             metadata = analyze_tabular_data(df)
-            return metadata
+            return _with_row_estimate(metadata, path, sample_size)
         except Exception:
             pass
         
         # Try to read as text
         try:
             with open(path, "r", encoding="utf-8", errors='ignore') as f:
-                lines = f.readlines()[:sample_size]
+                lines = list(islice(f, sample_size))
             return {"type": "text", "sample": lines[:5], "n_lines": len(lines)}
         except:
             pass
@@ -121,70 +191,47 @@ def detect_dataset(path, sample_size=100):
         raise ValueError(f"Unsupported dataset format: {path}")
 
 def analyze_tabular_data(df):
-    """Perform detailed analysis of tabular data."""
-    # Get basic column info
-    column_info = []
-    
-    # Track dataset characteristics
-    has_datetime = False
-    potential_timeseries = False
-    potential_targets = []
-    categorical_columns = []
-    numeric_columns = []
-    high_cardinality_columns = []
-    
+    """Perform detailed analysis of tabular data (returns columnar TabularMetadata)."""
+    n_rows = len(df)
+    metadata = TabularMetadata(n_rows=n_rows)
+    target_indicators = ["target", "class", "label", "y", "price", "sales", "revenue", "cases"]
+
     for c in df.columns:
-        column_data = {
-            "name": c,
-            "dtype": str(df[c].dtype),
-            "n_unique": int(df[c].nunique()),
-            "missing": float(df[c].isna().mean())
-        }
-        
+        col = df[c]
+        n_unique = int(col.nunique())
+        column_is_datetime = is_sorted = False
+        stats = None
+        categorical = potential_target = high_cardinality = False
+
         # Check for datetime columns
-        if is_datetime(df[c]):
-            has_datetime = True
-            column_data["is_datetime"] = True
-            
+        if is_datetime(col):
+            column_is_datetime = True
+            metadata.has_datetime = True
+
             # Check if sorted - potential time series indicator
-            if df[c].dropna().is_monotonic_increasing or df[c].dropna().is_monotonic_decreasing:
-                potential_timeseries = True
-                column_data["is_sorted"] = True
-        
+            non_null = col.dropna()
+            if non_null.is_monotonic_increasing or non_null.is_monotonic_decreasing:
+                metadata.potential_timeseries = True
+                is_sorted = True
+
         # Add statistics for numeric columns
-        if pd.api.types.is_numeric_dtype(df[c]):
-            numeric_columns.append(c)
-            # Add basic stats
-            column_data.update({
-                "min": float(df[c].min()) if not pd.isna(df[c].min()) else None,
-                "max": float(df[c].max()) if not pd.isna(df[c].max()) else None,
-                "mean": float(df[c].mean()) if not pd.isna(df[c].mean()) else None,
-                "std": float(df[c].std()) if not pd.isna(df[c].std()) else None
-            })
-            
+        if pd.api.types.is_numeric_dtype(col):
+            stats = tuple(
+                None if pd.isna(v) else float(v)
+                for v in (col.min(), col.max(), col.mean(), col.std())
+            )
             # Check if column looks like a potential target (by name)
-            target_indicators = ["target", "class", "label", "y", "price", "sales", "revenue", "cases"]
-            if any(indicator in c.lower() for indicator in target_indicators):
-                potential_targets.append(c)
-                
+            potential_target = any(indicator in str(c).lower() for indicator in target_indicators)
+
         # Check for categorical columns
-        elif df[c].nunique() < len(df) * 0.5:  # Less than 50% unique values
-            categorical_columns.append(c)
-            if df[c].nunique() > 10:  # High cardinality categorical
-                high_cardinality_columns.append(c)
-        
-        column_info.append(column_data)
-    
-    metadata = {
-        "type": "tabular",
-        "n_rows": len(df),
-        "columns": column_info,
-        "has_datetime": has_datetime,
-        "potential_timeseries": potential_timeseries,
-        "potential_targets": potential_targets,
-        "categorical_columns": categorical_columns,
-        "numeric_columns": numeric_columns,
-        "high_cardinality_columns": high_cardinality_columns
-    }
-    
+        elif n_unique < n_rows * 0.5:  # Less than 50% unique values
+            categorical = True
+            high_cardinality = n_unique > 10  # High cardinality categorical
+
+        metadata.add_column(
+            c, str(col.dtype), n_unique, float(col.isna().mean()),
+            is_datetime=column_is_datetime, is_sorted=is_sorted, stats=stats,
+            categorical=categorical, potential_target=potential_target, high_cardinality=high_cardinality
+        )
+
     return metadata
@@ -0,0 +1,385 @@
+import os
+import tempfile
+import threading
+import requests
+from zero_shot_theory_generator.config.settings import (
+    GEMINI_API_KEY, OUTPUT_DIR, TRACE_ENABLED, TRACE_MEMORY, SCHEMA_REUSE_THRESHOLD, EVAL_SECONDS,
+    INCREMENTAL_PROFILE, EXCEL_ALL_SHEETS, STREAM_PROFILE
+)
+from zero_shot_theory_generator.utils.file_utils import load_dataset_path
+from zero_shot_theory_generator.core.dataset_loader import detect_dataset
+from zero_shot_theory_generator.core.file_profile import StreamingFileProfile, streamable, update_file_profile
+from zero_shot_theory_generator.core.file_ranking import take_metadata
+from zero_shot_theory_generator.core.task_inference import column_index, infer_task
+from zero_shot_theory_generator.core.timeseries_profile import profile_timeseries
+from zero_shot_theory_generator.core.text_profile import profile_text, text_fields
+from zero_shot_theory_generator.core.interaction_profile import profile_interactions
+from zero_shot_theory_generator.core.pipeline_suggester import suggest_pipeline
+from zero_shot_theory_generator.core.cost_model import fit_to_budget, get_cost_model, make_budget
+from zero_shot_theory_generator.core.theory_generator import generate_theory, create_model, llm_failed
+from zero_shot_theory_generator.core.report_formatter import format_output
+from zero_shot_theory_generator.core.stage_graph import Stage, StageGraph, fingerprint
+from zero_shot_theory_generator.core.schema_index import SchemaIndex, task_applies
+from zero_shot_theory_generator.utils.eval_utils import evaluate_pipeline
+from zero_shot_theory_generator.utils.logger import log_output
+from zero_shot_theory_generator.utils.report_store import get_report_store
+from zero_shot_theory_generator.utils.tracing import Tracer, StageMetrics
+
+
+class AnalysisEngine:
+    """
+    Long-lived analysis pipeline shared by the CLI, the Gradio UI and the HTTP service.
+    Output directories, the HTTP session and the LLM client are created once and reused,
+    and every pipeline stage is exposed as its own method.
+    """
+
+    def __init__(self, output_dir=OUTPUT_DIR, tracing=TRACE_ENABLED, trace_memory=TRACE_MEMORY, llm=None,
+                 reuse_threshold=SCHEMA_REUSE_THRESHOLD, budget=None, eval_seconds=EVAL_SECONDS,
+                 incremental_profile=INCREMENTAL_PROFILE):
+        self.output_dir = output_dir
+        self.reuse_threshold = reuse_threshold
+        # Training budget the suggested model has to fit (see core/cost_model.py)
+        self.budget = budget or make_budget()
+        self.cost_model = get_cost_model(os.path.join(output_dir, "cost_model.json"))
+        # Time box of the quick baseline evaluation; 0 skips it
+        self.eval_seconds = eval_seconds
+        # Whole-file column profiles with byte-offset checkpoints (see core/file_profile.py)
+        self.incremental_profile = incremental_profile
+        self.profile_state_dir = os.path.join(output_dir, "profiles")
+        self.tracing = tracing
+        self.trace_memory = trace_memory
+        self.metrics = StageMetrics()
+        self.reports_dir = os.path.join(output_dir, "reports")
+        os.makedirs(self.reports_dir, exist_ok=True)
+        self.report_store = get_report_store(os.path.join(self.reports_dir, "reports.db"))
+        self.schema_index = SchemaIndex(os.path.join(self.reports_dir, "schema_index.db"))
+        self.session = requests.Session()
+        # Anything with generate_content(prompt) works, which lets benchmarks inject a fake LLM
+        self._llm = llm
+        self._lock = threading.Lock()
+        # Remote sources (URL, Hugging Face, Kaggle) -> local path of the already fetched copy
+        self._downloads = {}
+        # Profile URL downloads while they stream in: provisional reports by source, final
+        # whole-file profiles by local path (picked up by detect), callbacks of running analyses
+        self.stream_profile = STREAM_PROFILE
+        self._provisional = {}
+        self._streamed = {}
+        self._provisional_listeners = {}
+        # load -> detect -> (schema lookup) -> infer_task -> (full-file profile) -> suggest_pipeline
+        # -> (evaluate) -> generate_theory -> format
+        self.graph = StageGraph([
+            Stage("dataset_path", self.load, ["source"], cache=False, label="load_dataset_path"),
+            Stage("dataset_signature", self.file_signature, ["dataset_path"], cache=False, label="file_signature"),
+            Stage("metadata", self.detect, ["dataset_path", "dataset_signature"], label="detect_dataset"),
+            Stage("prior", self.find_prior, ["metadata"], cache=False, label="schema_lookup"),
+            Stage("task", self.infer_task, ["metadata", "prior"], label="infer_task"),
+            Stage("profile", self.profile, ["metadata", "dataset_path", "dataset_signature", "task"],
+                  label="profile_dataset"),
+            Stage("pipeline", self.suggest_pipeline, ["task", "profile", "prior"], params=["budget"],
+                  label="suggest_pipeline"),
+            Stage("evaluation", self.evaluate, ["dataset_path", "dataset_signature", "task", "pipeline"],
+                  params=["eval_seconds"], label="evaluate_model"),
+            # A transient LLM error must not be served from the memo cache on later runs
+            Stage("theory", self.generate_theory, ["profile", "task", "pipeline", "prior"], params=["seed"],
+                  label="generate_theory", keep=lambda theory: not llm_failed(theory)),
+            Stage("output_md", self.format, ["profile", "task", "pipeline", "theory", "evaluation"],
+                  label="format_output"),
+        ])
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            with self._lock:
+                if self._llm is None:
+                    self._llm = create_model()
+        return self._llm
+
+    def load(self, source):
+        """Resolve a path, upload or URL to a local dataset path, reusing earlier downloads."""
+        if hasattr(source, "name"):
+            source = source.name
+        if os.path.exists(source):
+            return os.path.abspath(source)
+        cached = self._downloads.get(source)
+        if cached and os.path.exists(cached):
+            return cached
+        profiler = None
+        name = os.path.basename(source).split("?")[0]
+        if self.stream_profile and source.startswith("http") and streamable(name):
+            profiler = StreamingFileProfile(name, on_provisional=lambda p: self._provisional_report(source, p))
+        dataset_path = load_dataset_path(source, session=self.session, profiler=profiler)
+        self._downloads[source] = dataset_path
+        # A profiler that hit unparseable input is dropped; detect then reads the file as usual
+        if profiler is not None and profiler.done:
+            try:
+                profiler.save(dataset_path, self.profile_state_dir)
+            except OSError as e:
+                print(f"[WARN] Could not checkpoint the streamed profile: {e}")
+            self._streamed[dataset_path] = profiler.summary()
+        return dataset_path
+
+    def _provisional_report(self, source, profiler):
+        """
+        Report built from the first megabytes of a download while the rest is still arriving:
+        the sampled head is detected as usual and the streamed profile so far is attached.
+        Failures only cost the provisional report, never the download.
+        """
+        try:
+            head = bytes(profiler.head[:profiler.head.rfind(b"\n") + 1])
+            with tempfile.NamedTemporaryFile("wb", suffix=os.path.splitext(profiler.name)[1], delete=False) as f:
+                f.write(head)
+            try:
+                meta = detect_dataset(f.name)
+            finally:
+                os.remove(f.name)
+            file_profile = profiler.summary()
+            meta["file_profile"] = file_profile
+            if meta.get("type") == "tabular" and profiler.total_bytes and file_profile["bytes"]:
+                meta["n_rows_estimate"] = int(file_profile["n_rows"] * profiler.total_bytes / file_profile["bytes"])
+            task = infer_task(meta)
+            pipeline = suggest_pipeline(task, meta, budget=self.budget, cost_model=self.cost_model)
+            progress = f"{profiler.received / 2 ** 20:.1f} MB" + (
+                f" of {profiler.total_bytes / 2 ** 20:.1f} MB" if profiler.total_bytes else "")
+            theory = {"rules": [f"Provisional report from the first {progress}; the download is still running."]}
+            report = {"metadata": meta, "task": task, "pipeline": pipeline, "provisional": True,
+                      "markdown": format_output(meta, task, pipeline, theory)}
+        except Exception as e:
+            print(f"[WARN] Provisional report skipped: {e}")
+            return
+        self._provisional[source] = report
+        print(f"[INFO] Provisional report for {source} after {progress}: {task.get('task')}")
+        listener = self._provisional_listeners.get(source)
+        if listener is not None:
+            listener(report)
+
+    def provisional_report(self, source):
+        """Latest provisional report of a URL download (see load), or None."""
+        return self._provisional.get(source)
+
+    def file_signature(self, dataset_path):
+        """Cheap change detector for a local dataset: size and mtime of the file or folder."""
+        st = os.stat(dataset_path)
+        return [st.st_size, st.st_mtime_ns]
+
+    def detect(self, dataset_path, signature=None):
+        # A file picked from a multi-file download was already profiled while ranking
+        meta, candidates = take_metadata(dataset_path)
+        if meta is None:
+            meta = detect_dataset(dataset_path, all_sheets=EXCEL_ALL_SHEETS, sheet_workers=self.budget["cores"])
+        elif len(candidates) > 1:
+            meta["candidate_files"] = candidates
+        # Profiled while downloading; its checkpoint is saved, so nothing is re-read
+        file_profile = self._streamed.pop(dataset_path, None)
+        if file_profile is None and self.incremental_profile and os.path.isfile(dataset_path):
+            try:
+                file_profile = update_file_profile(dataset_path, self.profile_state_dir)
+            except (ValueError, OSError, UnicodeDecodeError) as e:
+                print(f"[WARN] Whole-file profile skipped: {e}")
+                file_profile = None
+        if file_profile:
+            meta["file_profile"] = file_profile
+            if meta.get("type") == "tabular":
+                # Exact count instead of the extrapolation from the first rows
+                meta["n_rows_estimate"] = file_profile["n_rows"]
+        return meta
+
+    def find_prior(self, meta):
+        """
+        Look up an earlier report whose schema fingerprint matches (or nearly matches) this
+        dataset, so its task, pipeline and theory can be reused instead of recomputed.
+        Reports of this very dataset are skipped (re-runs are served by the stage cache and
+        Iterate must not get its own earlier theory back), as are deleted ones.
+        """
+        if self.reuse_threshold is None:
+            return None
+        for report_id, similarity in self.schema_index.matches(meta, threshold=self.reuse_threshold,
+                                                               exclude_fp=fingerprint(meta)):
+            prior = self.report_store.get(report_id)
+            # Reports whose theory is an LLM error (e.g. the key was missing) are never worth reusing
+            if not prior or llm_failed(prior.get("theory", {})) or not task_applies(prior.get("task", {}), meta):
+                continue
+            return {
+                "report_id": report_id,
+                "similarity": round(similarity, 4),
+                "task": prior["task"],
+                "pipeline": prior["pipeline"],
+                "theory": prior["theory"]
+            }
+        return None
+
+    def infer_task(self, meta, prior=None):
+        if prior:
+            return prior["task"]
+        return infer_task(meta)
+
+    def profile(self, meta, dataset_path, signature, task):
+        """
+        Metadata enriched with a full-file profile where one applies: "timeseries_profile"
+        (frequency, gaps, seasonal periods) for forecasting tasks and any other table with a
+        date-like column (its sampled head may be unsorted or sparse), "interaction_profile" (users,
+        items, density, degree distributions, cold start) for recommendation tasks, "text_profile"
+        (length distributions, vocabulary, duplicates, truncation and batch size) for text corpora.
+        Otherwise the metadata is returned unchanged.
+        """
+        if not os.path.isfile(dataset_path):
+            return meta
+        key = profile = None
+        try:
+            if task.get("task") == "time_series_forecasting":
+                key = "timeseries_profile"
+                value_cols = [c for c in meta.get("numeric_columns", []) if c != task.get("time_col")]
+                profile = profile_timeseries(dataset_path, task["time_col"], value_cols, target=task.get("target"))
+            elif task.get("task") == "recommendation":
+                key = "interaction_profile"
+                profile = profile_interactions(dataset_path, task["user_col"], task["item_col"],
+                                               rating_col=task.get("rating_col"))
+            elif meta.get("type") in ("text", "jsonl"):
+                key = "text_profile"
+                fields = text_fields(dataset_path) if meta["type"] == "jsonl" else None
+                profile = profile_text(dataset_path, fields=fields, workers=self.budget["cores"])
+            elif meta.get("type") == "tabular":
+                time_col = _date_column(meta)
+                value_cols = [c for c in meta.get("numeric_columns", []) if c != time_col]
+                if time_col is not None and value_cols:
+                    key = "timeseries_profile"
+                    profile = profile_timeseries(dataset_path, time_col, value_cols, target=task.get("target"))
+        except (ValueError, KeyError, UnicodeDecodeError) as e:
+            print(f"[WARN] Dataset profiling skipped: {e}")
+            return meta
+        if profile is None:
+            return meta
+        enriched = meta.copy()
+        enriched[key] = profile
+        return enriched
+
+    def suggest_pipeline(self, task, meta, prior=None, budget=None):
+        budget = budget or self.budget
+        if prior:
+            # The reused pipeline is re-fitted to this run's budget and profile, starting from the
+            # model the prior run preferred before its own budget replaced it
+            pipeline = dict(prior["pipeline"])
+            cost = pipeline.pop("cost_estimate", None) or {}
+            key = "model" if "model" in pipeline else "clustering" if "clustering" in pipeline else None
+            if key and cost.get("replaced"):
+                pipeline[key] = cost["replaced"]
+            return fit_to_budget(pipeline, task, meta, budget=budget, cost_model=self.cost_model)
+        return suggest_pipeline(task, meta, budget=budget, cost_model=self.cost_model)
+
+    def evaluate(self, dataset_path, signature, task, pipeline, eval_seconds=0):
+        """Time-boxed baseline evaluation of the suggested pipeline, or None when disabled."""
+        if not eval_seconds or not os.path.isfile(dataset_path):
+            return None
+        return evaluate_pipeline(pipeline, dataset_path, task, time_budget_sec=eval_seconds,
+                                 n_jobs=self.budget["cores"], cost_model=self.cost_model)
+
+    def generate_theory(self, meta, task, pipeline, prior=None, seed=None):
+        # An explicit seed (Iterate) always asks the LLM again
+        if prior and seed is None:
+            return prior["theory"]
+        # Without a key (and no injected client) generate_theory reports the missing key itself
+        model = self.llm if self._llm is not None or GEMINI_API_KEY else None
+        return generate_theory(meta, task, pipeline, model=model, seed=seed)
+
+    def format(self, meta, task, pipeline, theory, evaluation=None):
+        return format_output(meta, task, pipeline, theory, evaluation)
+
+    def save(self, report):
+        return log_output(report, reports_dir=self.reports_dir)
+
+    def status_message(self, theory, report_id=None):
+        status_msg = f"Report {report_id} saved to {os.path.join(self.reports_dir, 'reports.db')}"
+        if "GOOGLE_API_KEY not set" in str(theory.get("llm", "")):
+            status_msg += " [Gemini API key missing!]"
+        return status_msg
+
+    def analyze(self, source, seed=None, force=(), budget=None, on_provisional=None):
+        """
+        Run the stage graph and return (report, output_md, status_msg). Errors propagate.
+        Stages whose inputs are unchanged since an earlier run are served from the memo cache;
+        pass a new seed to re-query only the LLM, or stage names in force to recompute them.
+        budget (see cost_model.make_budget) overrides the engine's training budget for this run.
+        on_provisional(report) is called with the provisional report of a URL that is still downloading.
+        """
+        if on_provisional is not None:
+            self._provisional_listeners[source] = on_provisional
+        try:
+            report, output_md, status_msg, _ = self._run(source, seed, force, budget)
+        finally:
+            if on_provisional is not None:
+                self._provisional_listeners.pop(source, None)
+        return report, output_md, status_msg
+
+    def _run(self, source, seed=None, force=(), budget=None):
+        if hasattr(source, "name"):
+            source = source.name
+        tracer = Tracer(enabled=self.tracing, trace_memory=self.trace_memory)
+        try:
+            values, recomputed = self.graph.run({"source": source}, params={"seed": seed, "budget": budget or self.budget, "eval_seconds": self.eval_seconds}, force=force, tracer=tracer)
+        except Exception as e:
+            if tracer.enabled:
+                # The failing stage's span is marked "error"; count it here and hand the spans
+                # to callers that aggregate them elsewhere (the HTTP service's worker pool)
+                self.metrics.observe(tracer.spans)
+                e.spans = tracer.spans
+            raise
+        report = {
+            "metadata": values["profile"],
+            "task": values["task"],
+            "pipeline": values["pipeline"],
+            "theory": values["theory"]
+        }
+        if values["evaluation"] is not None:
+            report["evaluation"] = values["evaluation"]
+        prior = values["prior"]
+        if prior:
+            report["reused_from"] = {"report_id": prior["report_id"], "similarity": prior["similarity"]}
+        if tracer.enabled:
+            # The save span is appended after the report is serialized, so it shows up in the
+            # returned report and the metrics but not in the stored copy
+            report["spans"] = tracer.spans
+            with tracer.span("log_output"):
+                report_id = self.save(report)
+            self.metrics.observe(tracer.spans)
+        else:
+            report_id = self.save(report)
+        status_msg = self.status_message(values["theory"], report_id)
+        if prior:
+            status_msg += f" [Reused analysis of report {prior['report_id']} (schema similarity {prior['similarity']:.2f})]"
+        elif report_id and not llm_failed(values["theory"]):
+            self.schema_index.add(report_id, report["metadata"], dataset_fp=fingerprint(values["metadata"]))
+        return report, values["output_md"], status_msg, recomputed
+
+    def analyze_markdown(self, source, seed=None):
+        """UI/CLI entry point: returns (output_md, status_msg) and never raises."""
+        try:
+            _, output_md, status_msg, recomputed = self._run(source, seed=seed)
+            recomputed = [s for s in recomputed if s not in ("dataset_path", "dataset_signature", "prior")]
+            status_msg += f" Recomputed: {', '.join(recomputed) or 'nothing (all stages cached)'}"
+            return output_md, status_msg
+        except Exception as e:
+            return f"**Error:** {str(e)}", f"Error: {str(e)}"
+
+
+def _date_column(meta):
+    """
+    First column that parsed as dates in the sample, or is named like one (date, timestamp, ...)
+    without holding integers (year or month numbers are not timestamps on their own); else None.
+    """
+    for c in column_index(meta["columns"]).time_cols:
+        if c.get("is_datetime") or not str(c.get("dtype")).startswith(("int", "uint")):
+            return c["name"]
+    return None
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Return the process-wide engine, creating it on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = AnalysisEngine()
+    return _engine
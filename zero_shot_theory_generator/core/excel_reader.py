@@ -0,0 +1,274 @@
+"""
+Streaming reader for .xlsx workbooks (Office Open XML) using only zipfile and expat.
+
+pd.read_excel(nrows=...) still parses the whole sheet XML; here a sheet is parsed
+incrementally and parsing stops after the requested rows. Shared strings are read only
+up to the highest index the sampled rows use, and sheet names and dimensions come from
+the workbook metadata and the <dimension> element at the top of each sheet, so neither
+depends on the size of the workbook.
+"""
+import os
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+# Built-in number formats that display dates or times
+_DATE_FORMAT_IDS = set(range(14, 23)) | set(range(27, 37)) | {45, 46, 47} | set(range(50, 59))
+_DATE_CODE = re.compile(r"[dmyhs]")
+_CELL_REF = re.compile(r"([A-Z]+)(\d+)")
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _attr(elem, name):
+    """Attribute by local name (r:id and friends carry a namespace that differs in strict OOXML)."""
+    for key, value in elem.attrib.items():
+        if _local(key) == name:
+            return value
+    return None
+
+
+def _column_index(letters):
+    n = 0
+    for ch in letters:
+        n = n * 26 + ord(ch) - 64
+    return n - 1
+
+
+def _ref_size(ref):
+    """(rows, columns) of a dimension ref like "A1:K2000", None when unknown."""
+    m = _CELL_REF.fullmatch(ref.split(":")[-1]) if ref else None
+    if not m or ":" not in ref:
+        return None
+    return int(m.group(2)), _column_index(m.group(1)) + 1
+
+
+def _resolve(base_dir, target):
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return os.path.normpath(os.path.join(base_dir, target)).replace(os.sep, "/")
+
+
+def _rels(zf, path):
+    """{relationship id: (target path, type)} of a part's .rels file."""
+    base_dir, name = os.path.split(path)
+    rels_path = f"{base_dir}/_rels/{name}.rels" if base_dir else f"_rels/{name}.rels"
+    try:
+        root = ET.fromstring(zf.read(rels_path))
+    except KeyError:
+        return {}
+    return {r.get("Id"): (_resolve(base_dir, r.get("Target")), r.get("Type", "")) for r in root}
+
+
+def _workbook(zf):
+    """(workbook part, [(sheet name, sheet part)], date1904)."""
+    workbook = "xl/workbook.xml"
+    for target, kind in _rels(zf, "").values():
+        if kind.endswith("/officeDocument"):
+            workbook = target
+    root = ET.fromstring(zf.read(workbook))
+    rels = _rels(zf, workbook)
+    sheets, date1904 = [], False
+    for elem in root.iter():
+        tag = _local(elem.tag)
+        if tag == "workbookPr":
+            date1904 = elem.get("date1904") in ("1", "true")
+        elif tag == "sheet":
+            target = rels.get(_attr(elem, "id"))
+            if target:
+                sheets.append((elem.get("name"), target[0]))
+    return workbook, sheets, date1904
+
+
+def _date_styles(zf, workbook):
+    """Indexes of cell formats (the s attribute of a cell) that display dates."""
+    styles = next((t for t, kind in _rels(zf, workbook).values() if kind.endswith("/styles")), None)
+    if not styles or styles not in zf.namelist():
+        return set()
+    root = ET.fromstring(zf.read(styles))
+    custom = {}
+    date_xfs = set()
+    for elem in root.iter():
+        if _local(elem.tag) == "numFmt":
+            # Quoted text and [colour]/[$-locale] sections are not date parts
+            code = re.sub(r'"[^"]*"|\[[^\]]*\]|\\.', "", elem.get("formatCode", "")).lower()
+            custom[int(elem.get("numFmtId"))] = bool(_DATE_CODE.search(code))
+    for elem in root.iter():
+        if _local(elem.tag) == "cellXfs":
+            for i, xf in enumerate(x for x in elem if _local(x.tag) == "xf"):
+                fmt = int(xf.get("numFmtId", 0))
+                if custom.get(fmt, fmt in _DATE_FORMAT_IDS):
+                    date_xfs.add(i)
+            break
+    return date_xfs
+
+
+def _shared_strings(zf, workbook, needed):
+    """{index: text} for the needed shared-string indexes, parsing no further than the largest one."""
+    if not needed:
+        return {}
+    path = next((t for t, kind in _rels(zf, workbook).values() if kind.endswith("/sharedStrings")), None)
+    if not path or path not in zf.namelist():
+        return {}
+    last = max(needed)
+    strings = {}
+    i = 0
+    with zf.open(path) as f:
+        for _, elem in ET.iterparse(f, events=("end",)):
+            if _local(elem.tag) != "si":
+                continue
+            if i in needed:
+                # Plain <t> or rich-text runs <r><t>; phonetic hints (<rPh>) are not part of the value
+                parts = []
+                for child in elem:
+                    tag = _local(child.tag)
+                    if tag == "t":
+                        parts.append(child.text or "")
+                    elif tag == "r":
+                        parts.extend(t.text or "" for t in child if _local(t.tag) == "t")
+                strings[i] = "".join(parts)
+            elem.clear()
+            i += 1
+            if i > last:
+                break
+    return strings
+
+
+def _sheet_rows(zf, sheet_path, max_rows):
+    """
+    (dimension, rows) of a sheet: up to max_rows rows as {column index: (type, style, raw value)}.
+    Parsing stops at the last needed row.
+    """
+    dimension = None
+    rows = []
+    row = None
+    with zf.open(sheet_path) as f:
+        for event, elem in ET.iterparse(f, events=("start", "end")):
+            tag = _local(elem.tag)
+            if event == "start":
+                if tag == "row":
+                    row = {}
+                elif tag == "sheetData" and max_rows <= 0:
+                    break
+                continue
+            if tag == "dimension":
+                dimension = _ref_size(elem.get("ref", ""))
+            elif tag == "c" and row is not None:
+                ref = elem.get("r")
+                col = _column_index(_CELL_REF.match(ref).group(1)) if ref else len(row)
+                kind = elem.get("t", "n")
+                value = None
+                for child in elem:
+                    child_tag = _local(child.tag)
+                    if child_tag == "v":
+                        value = child.text
+                    elif child_tag == "is":
+                        value = "".join(t.text or "" for t in child.iter() if _local(t.tag) == "t")
+                if value is not None:
+                    row[col] = (kind, int(elem.get("s", 0)), value)
+            elif tag == "row":
+                rows.append(row)
+                row = None
+                elem.clear()
+                if len(rows) >= max_rows:
+                    break
+            elif tag == "sheetData":
+                break
+    return dimension, rows
+
+
+def _convert(cell, strings, date_xfs, epoch):
+    kind, style, raw = cell
+    if kind == "s":
+        return strings.get(int(raw))
+    if kind in ("str", "inlineStr"):
+        return raw
+    if kind == "b":
+        return raw == "1"
+    if kind == "e":
+        return None
+    if kind == "d":
+        return pd.Timestamp(raw)
+    number = float(raw)
+    if style in date_xfs:
+        return epoch + pd.to_timedelta(number, unit="D")
+    return int(number) if number.is_integer() and abs(number) < 2 ** 53 else number
+
+
+def list_sheets(path):
+    """[{"name", "n_rows", "n_cols"}] of every sheet from the workbook metadata (dimensions may be None)."""
+    with zipfile.ZipFile(path) as zf:
+        _, sheets, _ = _workbook(zf)
+        result = []
+        for name, sheet_path in sheets:
+            dimension, _ = _sheet_rows(zf, sheet_path, 0)
+            result.append({"name": name, "n_rows": dimension[0] if dimension else None,
+                           "n_cols": dimension[1] if dimension else None})
+    return result
+
+
+def read_sheet_sample(path, sheet=0, nrows=100):
+    """
+    First nrows data rows of a sheet (index or name) as a DataFrame, with the first row as
+    header like pd.read_excel. Dates are converted using the cell formats, and columns without
+    any values are float64 NaN as in pd.read_excel.
+    """
+    with zipfile.ZipFile(path) as zf:
+        workbook, sheets, date1904 = _workbook(zf)
+        if not sheets:
+            raise ValueError(f"No worksheets in {path}")
+        if isinstance(sheet, int):
+            sheet_path = sheets[sheet][1]
+        else:
+            sheet_path = dict(sheets)[sheet]
+        # <dimension> sits before <sheetData>, so it is read on the way (max_rows counts the header)
+        _, rows = _sheet_rows(zf, sheet_path, nrows + 1)
+        needed = {int(c[2]) for r in rows for c in r.values() if c[0] == "s"}
+        strings = _shared_strings(zf, workbook, needed)
+        date_xfs = _date_styles(zf, workbook) if any(c[0] == "n" for r in rows for c in r.values()) else set()
+    epoch = pd.Timestamp("1904-01-01") if date1904 else pd.Timestamp("1899-12-30")
+    if not rows:
+        return pd.DataFrame()
+    width = max((max(r) + 1 for r in rows if r), default=0)
+    table = [[_convert(r[c], strings, date_xfs, epoch) if c in r else None for c in range(width)] for r in rows]
+    header = [h if h is not None else f"Unnamed: {i}" for i, h in enumerate(table[0])]
+    # pd.read_excel reads a column without any values as float64 NaN rather than object None
+    empty = [c for c in range(width) if all(row[c] is None for row in table[1:])]
+    for row in table[1:]:
+        for c in empty:
+            row[c] = float("nan")
+    return pd.DataFrame(table[1:], columns=header)
+
+
+def _profile_sheet(path, name, sample_size):
+    # Imported here: dataset_loader imports this module
+    from zero_shot_theory_generator.core.dataset_loader import analyze_tabular_data
+    meta = analyze_tabular_data(read_sheet_sample(path, name, sample_size))
+    return {
+        "columns": [c["name"] for c in meta["columns"]],
+        "numeric_columns": list(meta["numeric_columns"]),
+        "potential_targets": list(meta["potential_targets"]),
+        "has_datetime": meta["has_datetime"],
+    }
+
+
+def profile_sheets(path, sample_size=100, workers=None):
+    """
+    list_sheets() plus a sampled column profile per sheet. Sheets are parsed in parallel
+    processes (the XML parsing is CPU bound) when there are several.
+    """
+    sheets = list_sheets(path)
+    names = [s["name"] for s in sheets]
+    workers = max(1, min(len(names), workers or os.cpu_count() or 1))
+    if workers == 1:
+        profiles = [_profile_sheet(path, name, sample_size) for name in names]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            profiles = list(pool.map(_profile_sheet, [path] * len(names), names, [sample_size] * len(names)))
+    for sheet, profile in zip(sheets, profiles):
+        sheet.update(profile)
+    return sheets
@@ -1,8 +1,25 @@
-# Placeholder for explainability integration (SHAP, Grad-CAM, LIME)
-def explain_pipeline(model, data=None):
+# Explainability recommendations (SHAP, Grad-CAM, LIME) plus a cost plan sized to a CPU budget
+import math
+from zero_shot_theory_generator.config.settings import EXPLAIN_MINUTES
+from zero_shot_theory_generator.core.cost_model import MODELS, get_cost_model, make_budget, workload, GB
+
+
+def explain_pipeline(model, data=None, meta=None, task=None, budget_sec=None, cores=None):
     """
     Returns explainability recommendations based on model type and task.
+    With dataset metadata, a cost plan is appended: estimated runtime and memory per technique
+    and the sample / background sizes that fit budget_sec of CPU time on `cores` cores.
     """
+    text = _recommendations(model)
+    if not model or meta is None:
+        return text
+    plan = plan_explanations(model, meta, task, budget_sec=budget_sec, cores=cores)
+    if not plan["techniques"]:
+        return text
+    return text + "\n\n" + format_plan(plan)
+
+
+def _recommendations(model):
     if not model:
         return "No model specified for explainability analysis."
         
@@ -61,3 +78,228 @@ def explain_pipeline(model, data=None):
 - Partial dependence plots
 - SHAP values for local and global explanations
 - Counterfactual examples to test model behavior"""
+
+
+TREE_MODELS = ["RandomForest", "XGBoost", "GBM", "LightGBM", "DecisionTree", "CatBoost", "IsolationForest"]
+LINEAR_MODELS = ["LinearRegression", "LogisticRegression", "Lasso", "Ridge"]
+IMAGE_MODELS = ["ResNet", "CNN", "VGG", "EfficientNet", "MobileNet", "YOLO", "RCNN", "SSD"]
+TEXT_MODELS = ["BERT", "Transformer", "GPT", "RoBERTa", "T5", "Marian"]
+TS_MODELS = ["ARIMA", "Prophet", "LSTM", "GRU", "VAR", "GARCH"]
+CLUSTER_MODELS = ["KMeans", "DBSCAN", "Hierarchical", "Spectral"]
+
+# Explained rows beyond this add little to global summaries
+_MAX_EXPLAINED = 1000
+# Fewer explained rows than this is not worth recommending
+_MIN_EXPLAINED = 20
+# Cheap per-row explainers (TreeSHAP, LinearSHAP) and embeddings are capped here
+_MAX_SAMPLE = 100_000
+
+
+def _family(model):
+    for family, names in (("tree", TREE_MODELS), ("linear", LINEAR_MODELS), ("image", IMAGE_MODELS),
+                          ("text", TEXT_MODELS), ("timeseries", TS_MODELS), ("cluster", CLUSTER_MODELS)):
+        if any(n in model for n in names):
+            return family
+    return "other"
+
+
+def _tree_shape(model, w):
+    """(trees, leaves per tree, depth) assumed for TreeSHAP: shallow boosted trees or fully grown forests."""
+    if "RandomForest" in model or "DecisionTree" in model:
+        depth = math.ceil(math.log2(max(w["rows"], 2)))
+        return (1 if "DecisionTree" in model else 100), min(w["rows"], 2 ** 20), depth
+    if "IsolationForest" in model:
+        return 100, 256, 8
+    if "CatBoost" in model:
+        return 1000, 64, 6
+    return 100, 64, 6
+
+
+def _choose(options, per_unit_sec, budget_sec, max_units, min_units=_MIN_EXPLAINED):
+    """
+    First option (most faithful first) that can process at least min_units units within budget_sec.
+    Returns (option, units, seconds, fits); if none fits, the cheapest option with min_units units.
+    """
+    for option in options:
+        per_unit = per_unit_sec(option)
+        units = min(max_units, int(budget_sec / per_unit) if per_unit > 0 else max_units)
+        if units >= min(min_units, max_units):
+            return option, units, units * per_unit, True
+    option = options[-1]
+    units = min(min_units, max_units)
+    return option, units, units * per_unit_sec(option), False
+
+
+def _technique(name, complexity, option, units, unit_name, seconds, mem_bytes, fits, note=""):
+    return {
+        "technique": name,
+        "complexity": complexity,
+        "settings": dict(option, **{unit_name: units}),
+        "est_sec": round(seconds, 2),
+        "peak_mem_gb": round(mem_bytes / GB, 3),
+        "fits_budget": fits,
+        "note": note
+    }
+
+
+def plan_explanations(model, meta, task=None, budget_sec=None, cores=None, cost_model=None):
+    """
+    Cost plan for the explainability techniques that apply to `model` on this dataset:
+    per technique the complexity, the most faithful settings (explained rows/images, background
+    size, perturbation samples) that fit budget_sec of CPU time, estimated seconds and memory,
+    and a fast variant when the exact technique cannot fit.
+    """
+    task = task or {}
+    budget_sec = budget_sec or EXPLAIN_MINUTES * 60
+    cores = cores or make_budget()["cores"]
+    cost_model = cost_model or get_cost_model()
+    w = workload(task, meta)
+    family = _family(model)
+    spec = MODELS.get(model, {})
+    # Explanations are embarrassingly parallel over explained rows
+    scan = cost_model.throughput("scan", cores)
+    dense = cost_model.throughput("dense", cores)
+    rate = dense if spec.get("rate") == "dense" else scan
+    predict_ops = spec["predict"](w) if "predict" in spec else w["features"] * 10
+    predict_sec = predict_ops / rate
+    rows, features = w["rows"], w["raw_features"]
+    max_rows = min(rows, _MAX_EXPLAINED)
+    techniques = []
+
+    if family in ("tree", "linear", "other") and meta.get("type") == "tabular":
+        if family == "tree":
+            trees, leaves, depth = _tree_shape(model, w)
+            per_row = trees * leaves * depth ** 2 / scan
+            option, n, sec, ok = _choose([{}], lambda o: per_row, budget_sec, min(rows, _MAX_SAMPLE))
+            techniques.append(_technique(
+                "TreeSHAP", "O(T·L·D²) per row", {"trees": trees, "leaves": leaves, "depth": depth}, n,
+                "explained_rows", sec, trees * leaves * depth * 8 + n * features * 8, ok,
+                "exact and polynomial; prefer it over KernelSHAP for tree models"))
+        if family == "linear":
+            n = min(rows, _MAX_SAMPLE)
+            techniques.append(_technique(
+                "LinearSHAP", "O(F) per row", {}, n, "explained_rows", n * features / scan,
+                n * features * 8, True, "closed form from coefficients"))
+
+        # KernelSHAP: nsamples coalitions x background rows model calls per explained row
+        def kernel_sec(o):
+            return o["nsamples"] * o["background"] * predict_sec + o["nsamples"] * features ** 2 / dense
+
+        full = 2 * features + 2048
+        options = [{"background": b, "nsamples": ns} for ns in (full, max(2 * features + 1, 200))
+                   for b in (100, 50, 25, 10)]
+        option, n, sec, ok = _choose(options, kernel_sec, budget_sec, max_rows)
+        faster = {"tree": "TreeSHAP", "linear": "LinearSHAP"}.get(family, "PermutationSHAP (max_evals=2F+1)")
+        techniques.append(_technique(
+            "KernelSHAP", "O(nsamples·B·predict + nsamples·F²) per row", option, n, "explained_rows", sec,
+            option["nsamples"] * option["background"] * features * 8, ok,
+            f"summarize the background with shap.kmeans(X, {option['background']})" if ok
+            else f"does not fit; use {faster}"))
+
+        def lime_sec(o):
+            return o["num_samples"] * predict_sec + o["num_samples"] * min(features, 10) ** 2 / dense
+
+        option, n, sec, ok = _choose([{"num_samples": s} for s in (5000, 2000, 1000)], lime_sec, budget_sec, max_rows)
+        techniques.append(_technique(
+            "LIME", "O(num_samples·predict) per row", option, n, "explained_rows", sec,
+            option["num_samples"] * features * 8, ok, "" if ok else "explain a handful of representative rows only"))
+
+        # Permutation importance: every feature x repeats x evaluation rows
+        def perm_sec(o):
+            return features * o["n_repeats"] * predict_sec
+
+        option, n, sec, ok = _choose([{"n_repeats": 5}, {"n_repeats": 3}], perm_sec, budget_sec,
+                                     min(rows, 10_000), min_units=500)
+        techniques.append(_technique(
+            "PermutationImportance", "O(F·repeats·n·predict)", option, n, "evaluation_rows", sec,
+            n * features * 8, ok, "" if ok else "restrict to the top features from a model-specific importance"))
+
+        # PDP/ICE for the top 10 features on a 20-point grid
+        def pdp_sec(o):
+            return min(features, 10) * o["grid"] * predict_sec
+
+        option, n, sec, ok = _choose([{"grid": 20}, {"grid": 10}], pdp_sec, budget_sec, min(rows, 10_000),
+                                     min_units=200)
+        techniques.append(_technique(
+            "PDP/ICE", "O(features·grid·n·predict)", dict(option, features=min(features, 10)), n, "sample_rows",
+            sec, n * option["grid"] * 8, ok))
+
+    elif family == "image":
+        images = w["images"]
+        fwd = predict_sec
+
+        option, n, sec, ok = _choose([{}], lambda o: 3 * fwd, budget_sec, images)
+        techniques.append(_technique("Grad-CAM", "one forward + backward per image", option, n, "images", sec,
+                                     spec["mem"](w) / 32 if spec else 0, ok))
+        option, n, sec, ok = _choose([{"steps": 50}, {"steps": 20}], lambda o: o["steps"] * 3 * fwd, budget_sec,
+                                     images)
+        techniques.append(_technique("IntegratedGradients", "steps x (forward + backward) per image", option, n,
+                                     "images", sec, spec["mem"](w) / 32 * 4 if spec else 0, ok))
+        option, n, sec, ok = _choose([{"stride": s, "window": 2 * s} for s in (8, 16, 32)],
+                                     lambda o: (224 // o["stride"]) ** 2 * fwd, budget_sec, images)
+        techniques.append(_technique("Occlusion", "(H/stride)·(W/stride) forwards per image", option, n, "images",
+                                     sec, spec["mem"](w) / 32 if spec else 0, ok,
+                                     "" if ok else "use Grad-CAM; occlusion does not fit"))
+
+    elif family == "text":
+        docs = w["rows"]
+        fwd = predict_sec
+        option, n, sec, ok = _choose([{}], lambda o: fwd, budget_sec, docs)
+        techniques.append(_technique("AttentionVisualization", "one forward per document", option, n, "documents",
+                                     sec, 0, ok))
+        option, n, sec, ok = _choose([{"num_samples": s} for s in (5000, 1000, 300)],
+                                     lambda o: o["num_samples"] * fwd, budget_sec, min(docs, _MAX_EXPLAINED))
+        techniques.append(_technique("LIME (text)", "num_samples forwards per document", option, n, "documents",
+                                     sec, 0, ok, "" if ok else "use attention or integrated gradients instead"))
+        option, n, sec, ok = _choose([{"steps": 50}, {"steps": 20}], lambda o: o["steps"] * 3 * fwd, budget_sec,
+                                     min(docs, _MAX_EXPLAINED))
+        techniques.append(_technique("IntegratedGradients", "steps x (forward + backward) per document", option, n,
+                                     "documents", sec, 0, ok))
+
+    if family == "timeseries":
+        techniques.append(_technique(
+            "SeasonalDecomposition", "O(n log n)", {}, rows, "points", 50 * rows * math.log2(max(rows, 2)) / scan,
+            rows * 8 * 4, True, "residual and component analysis run on the full series"))
+
+    if family == "cluster":
+        # Silhouette needs all pairwise distances of the sample: O(n²·F)
+        # (at least 1000 rows, below that the score is too noisy to be worth the budget)
+        n = min(rows, max(int(math.sqrt(budget_sec * scan / max(features, 1))), 1000))
+        sec = n * n * features / scan
+        techniques.append(_technique(
+            "SilhouetteAnalysis", "O(n²·F)", {}, n, "sample_rows", sec, n * min(n, 1024) * 8, sec <= budget_sec,
+            "sample_size for sklearn's silhouette_score" + (f" (sample of {rows} rows)" if n < rows else "")))
+        # Barnes-Hut t-SNE: ~1000 iterations of O(n log n)
+        n = min(rows, _MAX_SAMPLE)
+        while n > 1000 and 1000 * n * math.log2(n) * 50 / scan > budget_sec:
+            n //= 2
+        sec = 1000 * n * math.log2(max(n, 2)) * 50 / scan
+        techniques.append(_technique(
+            "t-SNE (Barnes-Hut)", "O(iterations·n log n)", {"iterations": 1000}, n, "sample_rows",
+            sec, n * features * 8 * 3, sec <= budget_sec,
+            "" if n == rows else f"sample of {rows} rows; UMAP scales to the full data"))
+
+    return {"model": model, "budget_sec": budget_sec, "cores": cores, "techniques": techniques}
+
+
+def _duration(sec):
+    if sec < 60:
+        return f"{sec:.1f}s"
+    if sec < 3600:
+        return f"{sec / 60:.1f} min"
+    if sec < 86400:
+        return f"{sec / 3600:.1f} h"
+    return f"{sec / 86400:.1f} days"
+
+
+def format_plan(plan):
+    lines = [f"**Cost plan ({_duration(plan['budget_sec'])} CPU budget, {plan['cores']} cores):**"]
+    for t in plan["techniques"]:
+        settings = ", ".join(f"{k}={v}" for k, v in t["settings"].items())
+        status = "fits" if t["fits_budget"] else "over budget"
+        line = (f"- {t['technique']} [{t['complexity']}]: {settings} → ~{_duration(t['est_sec'])}, "
+                f"{t['peak_mem_gb']} GB ({status})")
+        if t["note"]:
+            line += f"; {t['note']}"
+        lines.append(line)
+    return "\n".join(lines)
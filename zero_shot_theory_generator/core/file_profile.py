@@ -0,0 +1,369 @@
+"""
+Whole-file column profile of CSV/TSV/JSONL datasets, kept up to date incrementally.
+
+The profile state (row count, per-column counts, numeric sums and HyperLogLog distinct
+sketches) is saved together with a byte-offset checkpoint and checksums of the first and
+last bytes before it. When the file has only grown since, a re-run reads just the appended
+bytes and merges them into the stored state; when the prefix changed (rewritten, truncated,
+edited), the checksums differ and the file is rescanned from the start. Only complete lines
+are profiled, so a file that is still being written is picked up where it stopped.
+"""
+import base64
+import hashlib
+import io
+import json
+import os
+import numpy as np
+import pandas as pd
+from zero_shot_theory_generator.utils.sketches import HyperLogLog
+
+STATE_VERSION = 1
+# Bytes hashed at the start of the file and just before the checkpoint
+HEAD_BYTES = 64 << 10
+TAIL_BYTES = 64 << 10
+CHUNK_ROWS = 200_000
+# Streamed bytes are parsed in blocks of about this size
+PARSE_BYTES = 4 << 20
+# A provisional profile is published once this much of a stream has arrived
+PROVISIONAL_BYTES = 2 << 20
+# Same tolerance as the sample read in dataset_loader: undecodable bytes are dropped and
+# rows with too many fields are skipped rather than failing the profile
+CSV_OPTIONS = {"dtype": str, "encoding_errors": "ignore", "on_bad_lines": "skip"}
+# Distinct-value sketches per column: 2**12 registers (4 KB), ~1.6% relative error
+SKETCH_P = 12
+
+
+def _format(path):
+    if path.endswith(".jsonl"):
+        return "jsonl"
+    if path.endswith((".csv", ".tsv")):
+        return "csv"
+    return None
+
+
+def _digest(f, start, end):
+    f.seek(start)
+    return hashlib.blake2b(f.read(end - start), digest_size=16).hexdigest()
+
+
+def _checksums(path, offset):
+    """Checksums of the head and of the bytes just before offset."""
+    with open(path, "rb") as f:
+        return [_digest(f, 0, min(HEAD_BYTES, offset)), _digest(f, max(0, offset - TAIL_BYTES), offset)]
+
+
+def _complete_end(path, size):
+    """Offset just past the last newline: everything before it is whole lines."""
+    with open(path, "rb") as f:
+        pos = size
+        while pos > 0:
+            start = max(0, pos - (1 << 16))
+            f.seek(start)
+            i = f.read(pos - start).rfind(b"\n")
+            if i >= 0:
+                return start + i + 1
+            pos = start
+    return 0
+
+
+class _Range(io.RawIOBase):
+    """Read-only view of bytes [start, end) of a file, for handing a byte range to read_csv."""
+
+    def __init__(self, path, start, end):
+        self._f = open(path, "rb")
+        self._f.seek(start)
+        self._left = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self._f.readinto(memoryview(buffer)[:min(len(buffer), self._left)])
+        self._left -= n
+        return n
+
+    def close(self):
+        self._f.close()
+        super().close()
+
+
+def streamable(name):
+    return _format(name) is not None
+
+
+def _parse_header(first, name):
+    """(columns, separator) of a CSV/TSV header line."""
+    line = first.decode("utf-8", "replace")
+    sep = "\t" if name.endswith(".tsv") or ("\t" in line and "," not in line) else ","
+    return list(pd.read_csv(io.StringIO(line), sep=sep, nrows=0).columns), sep
+
+
+def _csv_header(path):
+    """(columns, separator, offset of the first data row)."""
+    with open(path, "rb") as f:
+        first = f.readline()
+        data_start = f.tell()
+    columns, sep = _parse_header(first, path)
+    return columns, sep, data_start
+
+
+def _new_state(fmt):
+    return {"version": STATE_VERSION, "format": fmt, "offset": 0, "n_rows": 0, "columns": {}, "invalid_lines": 0}
+
+
+def _jsonl_frames(lines, state):
+    records = []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        if not isinstance(record, dict):
+            state["invalid_lines"] += 1
+            continue
+        records.append(record)
+        if len(records) >= CHUNK_ROWS:
+            yield pd.DataFrame.from_records(records)
+            records = []
+    if records:
+        yield pd.DataFrame.from_records(records)
+
+
+def _frames(path, fmt, start, end, state):
+    """DataFrame chunks of the rows in [start, end), every value read as a string."""
+    if fmt == "csv":
+        with io.BufferedReader(_Range(path, start, end), 1 << 20) as raw:
+            yield from pd.read_csv(raw, sep=state["sep"], header=None, names=state["header"], chunksize=CHUNK_ROWS,
+                                   **CSV_OPTIONS)
+        return
+    with io.BufferedReader(_Range(path, start, end), 1 << 20) as raw:
+        yield from _jsonl_frames(raw, state)
+
+
+def _update(state, sketches, frame):
+    state["n_rows"] += len(frame)
+    columns = state["columns"]
+    for name in frame.columns:
+        key = str(name)
+        col = columns.get(key)
+        if col is None:
+            col = columns[key] = {"count": 0, "numeric": 0, "min": None, "max": None, "sum": 0.0, "sumsq": 0.0}
+            sketches[key] = HyperLogLog(SKETCH_P)
+        values = frame[name].dropna()
+        if not len(values):
+            continue
+        values = values.astype(str)
+        col["count"] += len(values)
+        nums = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+        nums = nums[np.isfinite(nums)]
+        if len(nums):
+            col["numeric"] += len(nums)
+            col["sum"] += float(nums.sum())
+            col["sumsq"] += float((nums * nums).sum())
+            lo, hi = float(nums.min()), float(nums.max())
+            col["min"] = lo if col["min"] is None else min(col["min"], lo)
+            col["max"] = hi if col["max"] is None else max(col["max"], hi)
+        # pandas' hash_array uses a fixed key, so sketches saved by an earlier run stay mergeable
+        sketches[key].add_hashes(pd.util.hash_array(values.to_numpy(dtype=object)))
+
+
+def _load_state(state_path):
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None, {}
+    if state.get("version") != STATE_VERSION:
+        return None, {}
+    sketches = {k: HyperLogLog.from_bytes(base64.b64decode(v)) for k, v in state.pop("sketches").items()}
+    return state, sketches
+
+
+def _save_state(state_path, state, sketches):
+    body = dict(state, sketches={k: base64.b64encode(s.to_bytes()).decode("ascii") for k, s in sketches.items()})
+    tmp = f"{state_path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(body, f, separators=(",", ":"))
+    # Atomic, so concurrent runs on the same file never see a half-written state
+    os.replace(tmp, state_path)
+
+
+def _summary(state, sketches, scanned, mode):
+    n_rows = state["n_rows"]
+    columns = {}
+    for name, col in state["columns"].items():
+        summary = {
+            "missing_rate": round(1 - col["count"] / n_rows, 4) if n_rows else 0.0,
+            "distinct": min(sketches[name].count(), col["count"]),
+        }
+        # Numeric stats only for columns whose values all parse as numbers
+        if col["numeric"] and col["numeric"] == col["count"]:
+            mean = col["sum"] / col["numeric"]
+            summary.update({
+                "min": col["min"], "max": col["max"], "mean": round(mean, 6),
+                "std": round(max(col["sumsq"] / col["numeric"] - mean * mean, 0.0) ** 0.5, 6),
+            })
+        columns[name] = summary
+    profile = {
+        "n_rows": n_rows,
+        "bytes": state["offset"],
+        "scanned_bytes": scanned,
+        "mode": mode,
+        "columns": columns,
+    }
+    if state["format"] == "jsonl":
+        profile["invalid_lines"] = state["invalid_lines"]
+    return profile
+
+
+def state_path_for(path, state_dir):
+    key = hashlib.blake2b(os.path.abspath(path).encode("utf-8"), digest_size=10).hexdigest()
+    return os.path.join(state_dir, f"{key}.json")
+
+
+def update_file_profile(path, state_dir):
+    """
+    Whole-file profile of a CSV/TSV/JSONL file (None for other formats): row count and, per
+    column, missing rate, approximate distinct count and min/max/mean/std of numeric columns.
+    "mode" says how it was obtained: "full" scan, "incremental" (only appended bytes read)
+    or "unchanged" (nothing new since the stored checkpoint).
+    """
+    fmt = _format(path)
+    if fmt is None:
+        return None
+    os.makedirs(state_dir, exist_ok=True)
+    state_path = state_path_for(path, state_dir)
+    end = _complete_end(path, os.path.getsize(path))
+    state, sketches = _load_state(state_path)
+    if (state and state["format"] == fmt and state["offset"] <= end
+            and _checksums(path, state["offset"]) == state["checksums"]):
+        if state["offset"] == end:
+            return _summary(state, sketches, 0, "unchanged")
+        mode = "incremental"
+    else:
+        mode = "full"
+        state = _new_state(fmt)
+        sketches = {}
+        if fmt == "csv":
+            state["header"], state["sep"], state["offset"] = _csv_header(path)
+            end = max(end, state["offset"])
+    start = state["offset"]
+    for frame in _frames(path, fmt, start, end, state):
+        _update(state, sketches, frame)
+    state["offset"] = end
+    state["checksums"] = _checksums(path, end)
+    _save_state(state_path, state, sketches)
+    return _summary(state, sketches, end - start, mode)
+
+
+class StreamingFileProfile:
+    """
+    The same whole-file profile built from bytes as they arrive, e.g. teed from a download.
+    Complete lines are parsed in blocks of PARSE_BYTES; once PROVISIONAL_BYTES have arrived,
+    on_provisional(self) is called (the stream then continues), and after finish() the
+    profile covers the whole file. save() stores it as the checkpoint of the written file,
+    so update_file_profile() on it reads nothing.
+    Profiling never interrupts the stream it is fed from: if a block cannot be parsed, the
+    error is kept in `failed`, parsing stops and the caller falls back to reading the file.
+    """
+
+    def __init__(self, name, on_provisional=None, provisional_bytes=PROVISIONAL_BYTES, total_bytes=None):
+        self.name = name
+        self.state = _new_state(_format(name))
+        self.sketches = {}
+        self.on_provisional = on_provisional
+        self.provisional_bytes = provisional_bytes
+        # Content-Length when known, for progress and row extrapolation
+        self.total_bytes = total_bytes
+        self.received = 0
+        # First provisional_bytes of the stream, for sampling a provisional report
+        self.head = bytearray()
+        self.done = False
+        self.failed = None
+        self._buffer = bytearray()
+        self._provisional_sent = on_provisional is None
+
+    def feed(self, chunk):
+        self.received += len(chunk)
+        if self.failed:
+            return
+        self._buffer += chunk
+        if len(self.head) < self.provisional_bytes:
+            self.head += chunk[:self.provisional_bytes - len(self.head)]
+        provisional = not self._provisional_sent and self.received >= self.provisional_bytes
+        if provisional or len(self._buffer) >= PARSE_BYTES:
+            self._parse()
+        if provisional and not self.failed:
+            self._provisional_sent = True
+            try:
+                self.on_provisional(self)
+            except Exception as e:
+                print(f"[WARN] Provisional report callback failed: {e}")
+
+    def _block_end(self):
+        """Offset past the last newline that is not inside a quoted CSV field (0 if none yet)."""
+        end = self._buffer.rfind(b"\n") + 1
+        if self.state["format"] != "csv":
+            return end
+        # An even number of quotes before a newline means it ends a record ("" escapes count twice)
+        quotes = self._buffer.count(b'"', 0, end)
+        while end and quotes % 2:
+            prev = self._buffer.rfind(b"\n", 0, end - 1) + 1
+            quotes -= self._buffer.count(b'"', prev, end)
+            end = prev
+        return end
+
+    def _parse(self):
+        try:
+            self._parse_block()
+        except Exception as e:
+            self.failed = f"{type(e).__name__}: {e}"
+            self._buffer = bytearray()
+            print(f"[WARN] Streaming profile of {self.name} stopped: {self.failed}")
+
+    def _parse_block(self):
+        end = self._block_end()
+        if not end:
+            return
+        block = bytes(self._buffer[:end])
+        del self._buffer[:end]
+        state = self.state
+        if state["format"] == "csv" and "header" not in state:
+            first = block.index(b"\n") + 1
+            state["header"], state["sep"] = _parse_header(block[:first], self.name)
+            state["offset"] += first
+            block = block[first:]
+        if not block:
+            return
+        if state["format"] == "csv":
+            frames = pd.read_csv(io.BytesIO(block), sep=state["sep"], header=None, names=state["header"],
+                                 chunksize=CHUNK_ROWS, **CSV_OPTIONS)
+        else:
+            frames = _jsonl_frames(block.split(b"\n"), state)
+        for frame in frames:
+            _update(state, self.sketches, frame)
+        state["offset"] += len(block)
+
+    def finish(self):
+        """Parse what is left (a trailing line without newline stays unprofiled, as in update_file_profile)."""
+        if not self.failed:
+            self._parse()
+        self.done = not self.failed
+        return self.summary()
+
+    def summary(self):
+        profile = _summary(self.state, self.sketches, self.state["offset"], "streamed" if self.done else "streaming")
+        profile["received_bytes"] = self.received
+        if self.total_bytes:
+            profile["total_bytes"] = self.total_bytes
+        return profile
+
+    def save(self, path, state_dir):
+        """Checkpoint the finished profile for the file the stream was written to."""
+        if not self.done or os.path.getsize(path) < self.state["offset"]:
+            return
+        os.makedirs(state_dir, exist_ok=True)
+        state = dict(self.state, checksums=_checksums(path, self.state["offset"]))
+        _save_state(state_path_for(path, state_dir), state, self.sketches)
@@ -0,0 +1,167 @@
+"""
+Choosing the main data file of a multi-file dataset (e.g. a Kaggle download).
+
+The folder is indexed in one os.scandir walk; the most promising files are then
+profiled in parallel with detect_dataset (header, sample rows, row estimate, target-like
+columns) and ranked by that profile. Profiles are kept per file (by inode, so hard links
+in the dataset store hit too) and handed to the detect stage, so the chosen file is not
+opened again.
+"""
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from zero_shot_theory_generator.core.dataset_loader import detect_dataset
+
+# Formats detect_dataset understands, best first
+PROFILED_EXTS = ('.csv', '.tsv', '.xlsx', '.xls', '.jsonl', '.json', '.txt')
+# Other usable formats, in the order they are preferred when nothing above is present
+FALLBACK_EXTS = ('.parquet', '.npz', '.npy', '.zip', '.jpg', '.jpeg', '.png', '.bmp', '.gif')
+# Candidates profiled per folder
+TOP_K = 8
+# detect_dataset reads these formats whole, so larger files are only used as a fallback
+WHOLE_READ_EXTS = ('.json',)
+MAX_WHOLE_READ_BYTES = 64 << 20
+_MAX_CACHED = 64
+
+_MAIN_NAME = re.compile(r"(^|[^a-z])(train|training|data|dataset|main|full|all)([^a-z]|$)")
+_AUX_NAME = re.compile(r"(^|[^a-z])(test|sample|submission|valid|validation|val|dev|meta|metadata|readme|"
+                       r"dictionary|description|lookup|mapping)([^a-z]|$)")
+
+_profiles = OrderedDict()
+_profiles_lock = threading.Lock()
+
+
+def index_directory(directory):
+    """[(path, size, ext)] of the usable files under directory, one os.scandir pass per folder."""
+    files = []
+    stack = [directory]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    ext = os.path.splitext(entry.name)[1].lower()
+                    if ext in PROFILED_EXTS or ext in FALLBACK_EXTS:
+                        files.append((entry.path, entry.stat().st_size, ext))
+                except OSError:
+                    continue
+    return files
+
+
+def _file_key(path):
+    st = os.stat(path)
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def _rows(meta):
+    return (meta.get("n_rows_estimate") or meta.get("n_rows") or meta.get("n_items")
+            or meta.get("n_lines") or 0)
+
+
+def score_profile(name, meta):
+    """Higher for files that look like the main table: tabular, many rows and columns, a target, a main-ish name."""
+    kind = meta.get("type", "")
+    score = {"tabular": 3.0, "jsonl": 1.5, "json_list": 1.5, "text": 1.0}.get(kind, 0.0)
+    score += math.log10(_rows(meta) + 1)
+    if kind == "tabular":
+        score += min(len(meta.get("columns", [])), 20) / 10
+        if meta.get("potential_targets"):
+            score += 2.0
+    stem = os.path.splitext(name.lower())[0]
+    if _AUX_NAME.search(stem):
+        score -= 3.0
+    elif _MAIN_NAME.search(stem):
+        score += 1.0
+    return round(score, 3)
+
+
+def _profile(path, size):
+    try:
+        meta = detect_dataset(path)
+    except Exception as e:
+        return {"path": path, "size": size, "error": str(e), "score": float("-inf")}, None
+    return {
+        "path": path,
+        "size": size,
+        "type": meta.get("type"),
+        "rows": _rows(meta),
+        "n_columns": len(meta.get("columns", [])) or len(meta.get("keys", [])),
+        "target_columns": list(meta.get("potential_targets", [])),
+        "score": score_profile(os.path.basename(path), meta),
+    }, meta
+
+
+def rank_dataset_files(directory, top_k=TOP_K, workers=None, files=None):
+    """
+    Profiles of the top_k candidate files under directory (largest files of the best format
+    groups first), best first. Each profiled file's metadata is cached for take_metadata().
+    files is an index_directory() result to reuse.
+    """
+    if files is None:
+        files = index_directory(directory)
+    candidates = [f for f in files
+                  if f[2] in PROFILED_EXTS and not (f[2] in WHOLE_READ_EXTS and f[1] > MAX_WHOLE_READ_BYTES)]
+    # Tabular files first, then by size, so top_k covers the likely main tables
+    candidates.sort(key=lambda f: (f[2] not in (".csv", ".tsv", ".xlsx", ".xls"), -f[1]))
+    candidates = candidates[:top_k]
+    if not candidates:
+        return []
+    workers = max(1, min(len(candidates), workers or (os.cpu_count() or 1) * 2))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda f: _profile(f[0], f[1]), candidates))
+    profiles = [p for p, _ in results]
+    profiles.sort(key=lambda p: p["score"], reverse=True)
+    summary = [p for p in profiles if "error" not in p]
+    with _profiles_lock:
+        for profile, meta in results:
+            if meta is None:
+                continue
+            try:
+                key = _file_key(profile["path"])
+            except OSError:
+                continue
+            _profiles[key] = (meta, summary)
+            _profiles.move_to_end(key)
+        while len(_profiles) > _MAX_CACHED:
+            _profiles.popitem(last=False)
+    return profiles
+
+
+def pick_dataset_file(directory, workers=None):
+    """
+    Path of the main data file under directory: the best ranked profile, else the largest file
+    of the most preferred fallback format, else the directory itself.
+    """
+    files = index_directory(directory)
+    if len(files) == 1:
+        return os.path.abspath(files[0][0])
+    profiles = [p for p in rank_dataset_files(directory, workers=workers, files=files) if "error" not in p]
+    if profiles:
+        return os.path.abspath(profiles[0]["path"])
+    for ext in PROFILED_EXTS + FALLBACK_EXTS:
+        of_type = [f for f in files if f[2] == ext]
+        if of_type:
+            return os.path.abspath(max(of_type, key=lambda f: f[1])[0])
+    return os.path.abspath(directory)
+
+
+def take_metadata(path):
+    """
+    (metadata, candidate profiles) cached when path (or a hard link to it) was ranked, else
+    (None, None). The entry is removed, so the caller owns the metadata.
+    """
+    try:
+        key = _file_key(path)
+    except OSError:
+        return None, None
+    with _profiles_lock:
+        return _profiles.pop(key, (None, None))
@@ -0,0 +1,147 @@
+"""
+Full-file profile of user-item interaction data for recommendation tasks.
+
+The user, item (and rating) columns are streamed in chunks; users and items get dense
+integer ids through index maps, so degree counts are plain arrays and distinct
+(user, item) pairs are counted with a HyperLogLog over packed id pairs. Index maps
+stop growing at max_keys entries per side; further keys are only counted (sketch).
+"""
+import numpy as np
+import pandas as pd
+from zero_shot_theory_generator.core.timeseries_profile import read_chunks
+from zero_shot_theory_generator.utils.sketches import HyperLogLog, hash_many, mix64
+
+# Users / items indexed exactly; beyond this only their number is estimated
+MAX_KEYS = 5_000_000
+# Users or items with fewer interactions than this count as cold start
+COLD_START = 5
+# Share of interactions the candidate pool of popular items should cover
+HEAD_COVERAGE = 0.8
+
+
+class _KeyIndex:
+    """Dense ids and interaction counts for one side (users or items)."""
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self.ids = {}
+        self.degree = np.zeros(0, dtype=np.int64)
+        self.overflow = HyperLogLog()
+        self.overflow_rows = 0
+
+    def encode(self, series):
+        """Global ids of the chunk's values; -1 for missing values and keys beyond max_keys."""
+        present = series.notna().to_numpy()
+        codes, uniques = pd.factorize(series[present].astype(str))
+        ids = self.ids
+        lookup = np.empty(len(uniques), dtype=np.int64)
+        for k, key in enumerate(uniques):
+            idx = ids.get(key)
+            if idx is None and len(ids) < self.max_keys:
+                idx = ids[key] = len(ids)
+            lookup[k] = -1 if idx is None else idx
+        unindexed = lookup < 0
+        if unindexed.any():
+            self.overflow.add_hashes(hash_many(uniques[unindexed]))
+        out = np.full(len(series), -1, dtype=np.int64)
+        out[present] = lookup[codes]
+        indexed = out[out >= 0]
+        self.overflow_rows += int(present.sum()) - len(indexed)
+        if len(self.degree) < len(ids):
+            self.degree = np.pad(self.degree, (0, max(len(ids), 2 * len(self.degree)) - len(self.degree)))
+        self.degree += np.bincount(indexed, minlength=len(self.degree))
+        return out
+
+    def summary(self, n_interactions):
+        degree = self.degree[:len(self.ids)]
+        exact = not self.overflow_rows
+        count = len(self.ids) + (0 if exact else self.overflow.count())
+        if not len(degree):
+            return {"count": count, "exact": exact}
+        ordered = np.sort(degree)[::-1]
+        cumulative = np.cumsum(ordered)
+        # Gini of the degree distribution (0: uniform, 1: all interactions on one key)
+        ascending = np.cumsum(ordered[::-1])
+        n = len(ordered)
+        gini = float((n + 1 - 2 * ascending.sum() / ascending[-1]) / n)
+        return {
+            "count": count,
+            "exact": exact,
+            "degree": {
+                "mean": round(float(degree.mean()), 2),
+                "p50": int(np.percentile(degree, 50)),
+                "p90": int(np.percentile(degree, 90)),
+                "p99": int(np.percentile(degree, 99)),
+                "max": int(ordered[0]),
+            },
+            "cold_start_share": round(float(np.mean(degree < COLD_START)), 4),
+            "gini": round(gini, 4),
+            # How many of the most popular keys cover HEAD_COVERAGE of the interactions
+            "head_size": int(np.searchsorted(cumulative, HEAD_COVERAGE * cumulative[-1]) + 1),
+            "top1pct_share": round(float(cumulative[max(len(ordered) // 100, 1) - 1] / max(n_interactions, 1)), 4),
+        }
+
+
+def profile_interactions(path, user_col, item_col, rating_col=None, max_keys=MAX_KEYS):
+    """
+    Profile every interaction in a CSV/TSV/JSONL file: user and item counts and degree
+    distributions, matrix density (distinct pairs over users x items), cold-start shares
+    and, with a rating column, whether feedback is explicit or implicit.
+    Returns None for other formats or when no interaction has both ids.
+    """
+    if not path.endswith((".csv", ".tsv", ".jsonl", ".txt")):
+        return None
+    columns = [user_col, item_col] + ([rating_col] if rating_col else [])
+    users, items = _KeyIndex(max_keys), _KeyIndex(max_keys)
+    pairs = HyperLogLog(16)
+    n_rows = n_interactions = 0
+    rating_sum = rating_sq = 0.0
+    rating_n = 0
+    rating_min, rating_max = np.inf, -np.inf
+    rating_values = set()
+    # Ids as strings, so 7 and "7" (or 7 and 7.0 in chunks with missing values) are one key
+    for chunk in read_chunks(path, columns, dtype={user_col: str, item_col: str}):
+        n_rows += len(chunk)
+        u = users.encode(chunk[user_col])
+        i = items.encode(chunk[item_col])
+        both = (u >= 0) & (i >= 0)
+        n_interactions += int(both.sum())
+        pairs.add_hashes(mix64((u[both] << 32) | i[both]))
+        if rating_col:
+            r = pd.to_numeric(chunk[rating_col], errors="coerce").to_numpy(dtype=np.float64)
+            r = r[np.isfinite(r)]
+            if len(r):
+                rating_sum += float(r.sum())
+                rating_sq += float((r * r).sum())
+                rating_n += len(r)
+                rating_min, rating_max = min(rating_min, float(r.min())), max(rating_max, float(r.max()))
+                if len(rating_values) <= 100:
+                    rating_values.update(np.unique(r)[:101].tolist())
+    if not n_interactions:
+        return None
+    user_summary = users.summary(n_interactions)
+    item_summary = items.summary(n_interactions)
+    distinct_pairs = min(pairs.count(), n_interactions)
+    profile = {
+        "n_rows": n_rows,
+        "n_interactions": n_interactions,
+        "n_users": user_summary["count"],
+        "n_items": item_summary["count"],
+        "distinct_pairs": distinct_pairs,
+        "repeat_share": round(1 - distinct_pairs / n_interactions, 4),
+        "density": float(f"{distinct_pairs / (user_summary['count'] * item_summary['count']):.3g}"),
+        "users": user_summary,
+        "items": item_summary,
+    }
+    if rating_n:
+        mean = rating_sum / rating_n
+        profile["rating"] = {
+            "min": rating_min,
+            "max": rating_max,
+            "mean": round(mean, 4),
+            "std": round(max(rating_sq / rating_n - mean * mean, 0.0) ** 0.5, 4),
+            "n_values": len(rating_values) if len(rating_values) <= 100 else None,
+            # A single value (all 1s) or 0/1 flags carry no preference strength
+            "implicit": rating_values <= {0.0, 1.0},
+        }
+    return profile
@@ -1,4 +1,67 @@
-def suggest_pipeline(task, meta):
+import math
+from zero_shot_theory_generator.core.cost_model import fit_to_budget
+
+
+def suggest_pipeline(task, meta, budget=None, cost_model=None):
+    """
+    Pipeline suggestion whose model fits the training budget (cores, RAM, minutes; see
+    cost_model.make_budget). The heuristic choice is kept when its estimated cost fits,
+    otherwise the best fallback that does; the estimate is reported under "cost_estimate".
+    """
+    return fit_to_budget(heuristic_pipeline(task, meta), task, meta, budget=budget, cost_model=cost_model)
+
+
+def _with_text_profile(pipeline, meta):
+    """Concrete sequence length, batch size and padding from the corpus profile, when there is one."""
+    profile = meta.get("text_profile")
+    if not profile:
+        return pipeline
+    preprocessing = list(pipeline.get("preprocessing", []))
+    if profile["duplicate_rate"] > 0.02:
+        preprocessing.insert(0, "Deduplicate")
+    if profile["padding"]["strategy"] == "length_bucketing":
+        preprocessing.append("LengthBucketing")
+    pipeline["preprocessing"] = preprocessing
+    pipeline["max_length"] = profile["truncate_tokens"]
+    pipeline["batch_size"] = profile["batch_size"]
+    pipeline["padding"] = profile["padding"]["strategy"]
+    return pipeline
+
+
+def _with_interaction_profile(pipeline, meta):
+    """
+    Model and sizes from the full-file interaction profile, when there is one. Neighbourhood
+    CF only pays off on dense, moderately sized explicit-rating matrices; otherwise matrix
+    factorization, with more latent factors the more observations each user/item has.
+    """
+    profile = meta.get("interaction_profile")
+    if not profile:
+        return pipeline
+    implicit = "rating_col" not in pipeline or profile.get("rating", {}).get("implicit", False)
+    users, items = profile["users"], profile["items"]
+    if implicit:
+        pipeline["model"] = "MatrixFactorization"
+        pipeline["metrics"] = ["recall@k", "precision@k", "ndcg"]
+    elif profile["density"] >= 0.01 and profile["n_items"] <= 100_000:
+        pipeline["model"] = "CollaborativeFiltering"
+        pipeline["neighbors"] = int(min(100, max(10, items.get("degree", {}).get("p50", 10))))
+    else:
+        pipeline["model"] = "MatrixFactorization"
+    if pipeline["model"] == "MatrixFactorization":
+        per_entity = profile["distinct_pairs"] / max(profile["n_users"] + profile["n_items"], 1)
+        pipeline["factors"] = int(min(128, max(8, 2 ** round(math.log2(max(4 * per_entity, 1))))))
+    preprocessing = list(pipeline["preprocessing"])
+    if profile["repeat_share"] > 0.2:
+        preprocessing.insert(0, "AggregateRepeatInteractions")
+    pipeline["preprocessing"] = preprocessing
+    # Popular items covering most interactions, as the candidate pool for ranking
+    pipeline["candidate_pool"] = int(min(profile["n_items"], max(100, min(items.get("head_size", 100), 1000))))
+    if max(users.get("cold_start_share", 0), items.get("cold_start_share", 0)) > 0.3:
+        pipeline["cold_start_fallback"] = "Popularity"
+    return pipeline
+
+
+def heuristic_pipeline(task, meta):
     """Enhanced pipeline suggestions for various ML tasks."""
     
     # Classification tasks
@@ -9,7 +72,8 @@ def suggest_pipeline(task, meta):
         
         # Determine appropriate model based on data characteristics
         n_features = len(meta.get("columns", []))
-        n_rows = meta.get("n_rows", 0)
+        # n_rows only counts the profiled sample; the estimate covers the whole file
+        n_rows = meta.get("n_rows_estimate") or meta.get("n_rows", 0)
         high_cardinality = len(meta.get("high_cardinality_columns", [])) > 0
         
         if high_cardinality and n_rows > 1000:
@@ -49,7 +113,8 @@ def suggest_pipeline(task, meta):
             
         # Select model based on data characteristics
         n_features = len(meta.get("columns", []))
-        n_rows = meta.get("n_rows", 0)
+        # n_rows only counts the profiled sample; the estimate covers the whole file
+        n_rows = meta.get("n_rows_estimate") or meta.get("n_rows", 0)
         
         if n_features > 20 and n_rows > 1000:
             model = "XGBoostRegressor"
@@ -70,12 +135,15 @@ def suggest_pipeline(task, meta):
         # Time Series specific pipeline
         time_col = task.get("time_col", "Period")
         target = task.get("target", "Revenue")
-        
+        # Full-series profile (frequency, gaps, seasonal periods) when the engine could stream the file
+        profile = meta.get("timeseries_profile") or {}
+
         # Check if we have enough data points for deep learning models
-        n_rows = meta.get("n_rows", 0)
-        
+        n_rows = profile.get("n_points") or meta.get("n_rows_estimate") or meta.get("n_rows", 0)
+        period = profile.get("seasonal_period")
+
         if n_rows > 1000:
-            return {
+            pipeline = {
                 "preprocessing": ["TimeSeriesSplit", "Normalization"],
                 "feature_engineering": ["LagFeatures", "RollingStatistics", "SeasonalDecomposition"],
                 "model": "LSTM",
@@ -86,7 +154,7 @@ def suggest_pipeline(task, meta):
                 "forecast_horizon": "Auto-detected"
             }
         elif n_rows > 100:
-            return {
+            pipeline = {
                 "preprocessing": ["TimeSeriesSplit", "Normalization"],
                 "feature_engineering": ["LagFeatures", "SeasonalDecomposition"],
                 "model": "Prophet",
@@ -97,7 +165,7 @@ def suggest_pipeline(task, meta):
                 "forecast_horizon": "Auto-detected"
             }
         else:
-            return {
+            pipeline = {
                 "preprocessing": ["TimeSeriesSplit", "Normalization"],
                 "feature_engineering": ["LagFeatures"],
                 "model": "ARIMA",
@@ -107,7 +175,27 @@ def suggest_pipeline(task, meta):
                 "target": target,
                 "forecast_horizon": "Auto-detected"
             }
-    
+        if profile:
+            pipeline["forecast_horizon"] = profile["forecast_horizon"]
+            if profile.get("frequency"):
+                pipeline["frequency"] = profile["frequency"]
+            if profile.get("n_gaps"):
+                # Regularize before lag features so lags mean the same distance everywhere
+                pipeline["preprocessing"].insert(0, "ResampleToFrequency")
+            if period:
+                periods = profile.get("seasonal_periods", [period])
+                pipeline["seasonality"] = {"period": period, "periods": periods,
+                                           "duration": profile.get("seasonal_duration")}
+                # Short lags (up to 7 steps) plus the seasonal lags themselves
+                pipeline["lags"] = sorted(set(range(1, min(period, 7) + 1)) | set(periods))
+                if "SeasonalDecomposition" not in pipeline["feature_engineering"]:
+                    pipeline["feature_engineering"].append("SeasonalDecomposition")
+                if pipeline["model"] == "ARIMA":
+                    pipeline["model_params"] = {"seasonal_order": [1, 0, 1, period]}
+            else:
+                pipeline["seasonality"] = None
+        return pipeline
+
     # Anomaly detection
     if task["task"] == "anomaly_detection":
         return {
@@ -121,7 +209,7 @@ def suggest_pipeline(task, meta):
     # Recommendation systems
     if task["task"] == "recommendation":
         if "rating_col" in task:
-            return {
+            pipeline = {
                 "preprocessing": ["SplitTrainTest"],
                 "model": "CollaborativeFiltering",
                 "metrics": ["rmse", "mae", "ndcg"],
@@ -130,14 +218,15 @@ def suggest_pipeline(task, meta):
                 "rating_col": task.get("rating_col")
             }
         else:
-            return {
+            pipeline = {
                 "preprocessing": ["SplitTrainTest"],
                 "model": "MatrixFactorization",
                 "metrics": ["recall@k", "precision@k"],
                 "user_col": task.get("user_col"),
                 "item_col": task.get("item_col")
             }
-    
+        return _with_interaction_profile(pipeline, meta)
+
     # Clustering (specific type of unsupervised)
     if task["task"] == "clustering":
         n_cols = len(meta.get("columns", []))
@@ -176,39 +265,39 @@ def suggest_pipeline(task, meta):
     
     # Text classification
     if task["task"] == "text_classification":
-        return {
+        return _with_text_profile({
             "preprocessing": ["Tokenize", "Truncate"],
             "model": "DistilBERT",
             "loss": "CrossEntropy",
             "metrics": ["f1", "precision", "recall"]
-        }
+        }, meta)
     
     # Question answering
     if task["task"] == "question_answering":
-        return {
+        return _with_text_profile({
             "preprocessing": ["Tokenize", "Truncate"],
             "model": "BERT",
             "metrics": ["exact_match", "f1"],
             "alternative_models": ["RoBERTa", "T5"]
-        }
+        }, meta)
     
     # Named entity recognition
     if task["task"] == "named_entity_recognition":
-        return {
+        return _with_text_profile({
             "preprocessing": ["Tokenize", "Truncate"],
             "model": "BERT-NER",
             "metrics": ["token_f1", "span_f1"],
             "alternative_models": ["SpaCy", "Flair"]
-        }
+        }, meta)
     
     # Translation
     if task["task"] == "translation":
-        return {
+        return _with_text_profile({
             "preprocessing": ["Tokenize", "Truncate"],
             "model": "MarianMT",
             "metrics": ["bleu", "meteor"],
             "alternative_models": ["T5", "M2M100"]
-        }
+        }, meta)
     
     # Generic unsupervised
     if task["task"] == "unsupervised":
@@ -0,0 +1,141 @@
+import os
+from zero_shot_theory_generator.core.explainability import explain_pipeline
+
+def paradigm_and_strategy(task, meta):
+    paradigm = "Unknown"
+    strategy = []
+    # Supervised learning
+    if task["task"] in ["classification", "regression", "image_classification", "text_classification"]:
+        paradigm = "Supervised Learning"
+        n_rows = meta.get("n_rows", 100)
+        batch_size = min(64, max(8, n_rows // 10))
+        epochs = 10 if n_rows < 1000 else 50
+        split = "80% train / 20% test" if n_rows > 50 else "Leave-one-out"
+        cross_val = "5-fold" if n_rows > 200 else "3-fold"
+        optimizer = "Adam" if task["task"] in ["classification", "image_classification", "text_classification"] else "SGD"
+        early_stopping = "Yes" if n_rows > 100 else "No"
+        strategy = [
+            f"Split: {split}",
+            f"Cross-validation: {cross_val}",
+            f"Epochs: {epochs}",
+            f"Batch size: {batch_size}",
+            f"Optimizer: {optimizer}",
+            f"Early stopping: {early_stopping}"
+        ]
+    # Unsupervised learning
+    elif task["task"] == "unsupervised":
+        paradigm = "Unsupervised Learning"
+        n_cols = len(meta.get("columns", []))
+        clustering = "K-means" if n_cols < 10 else "DBSCAN"
+        dim_red = "PCA" if n_cols < 20 else "t-SNE"
+        association = "Apriori" if n_cols > 2 else "None"
+        strategy = [
+            f"Clustering: {clustering}",
+            f"Dimensionality Reduction: {dim_red}",
+            f"Association Rule Mining: {association}"
+        ]
+    else:
+        paradigm = "Unknown/Other"
+        strategy = ["Custom analysis required"]
+
+    return paradigm, strategy
+
+def format_output(meta, task, pipeline, theory, evaluation=None):
+    # Dataset summary
+    dataset_md = f"## 📊 Dataset\n"
+    if meta.get("type") == "image_folder":
+        dataset_md += f"**Type:** Image Folder\n**Classes:** {meta.get('classes', [])}\n"
+    elif meta.get("type") == "tabular":
+        cols = meta.get("columns", [])
+        dataset_md += f"**Type:** Tabular\n**Columns:** {', '.join([c['name'] for c in cols])}\n"
+        sheets = meta.get("sheets")
+        if sheets:
+            dataset_md += "**Sheets:** " + ", ".join(
+                f"{s['name']} ({s['n_rows'] or '?'} x {s['n_cols'] or '?'})" for s in sheets) + "\n"
+        ts = meta.get("timeseries_profile")
+        if ts:
+            dataset_md += (f"**Time series:** {ts['n_points']} points every {ts['step']} from {ts['start']} to {ts['end']}"
+                           f", {ts['n_gaps']} gaps ({ts['missing_points']} missing points)"
+                           f"{'' if ts['is_sorted'] else ', not sorted by time'}\n")
+            if ts.get("seasonal_period"):
+                dataset_md += f"**Seasonality:** period {ts['seasonal_period']} steps ({ts['seasonal_duration']})\n"
+        ip = meta.get("interaction_profile")
+        if ip:
+            dataset_md += (f"**Interactions:** {ip['n_interactions']} between {ip['n_users']} users and "
+                           f"{ip['n_items']} items (density {ip['density']:.3g}); "
+                           f"{ip['users'].get('cold_start_share', 0):.0%} of users and "
+                           f"{ip['items'].get('cold_start_share', 0):.0%} of items have fewer than 5\n")
+    elif meta.get("type") == "text":
+        dataset_md += f"**Type:** Text\n**Sample:**\n```\n{''.join(meta.get('sample', []))}\n```\n"
+    elif meta.get("type", "").startswith("json"):
+        dataset_md += f"**Type:** JSON\n**Keys:** {meta.get('keys', [])}\n"
+    else:
+        dataset_md += f"**Type:** {meta.get('type')}\n"
+    candidates = meta.get("candidate_files")
+    if candidates:
+        others = ", ".join(f"{os.path.basename(c['path'])} ({c['rows']} rows)" for c in candidates[1:4])
+        dataset_md += (f"**File:** {os.path.basename(candidates[0]['path'])} ranked best of {len(candidates)} "
+                       f"profiled files (also: {others})\n")
+    fp = meta.get("file_profile")
+    if fp:
+        received = f"{fp.get('received_bytes')} of {fp.get('total_bytes', 'unknown')} bytes received"
+        read = {"full": "full scan", "incremental": f"{fp['scanned_bytes']} appended bytes read",
+                "unchanged": "unchanged since last run", "streamed": "profiled while downloading",
+                "streaming": f"provisional, {received}"}.get(fp["mode"], fp["mode"])
+        dataset_md += f"**Rows:** {fp['n_rows']} in {fp['bytes']} bytes ({read})\n"
+    tp = meta.get("text_profile")
+    if tp:
+        dataset_md += (f"**Corpus:** {tp['n_docs']} documents, median {tp['tokens']['p50']} tokens "
+                       f"(p95 {tp['tokens']['p95']}, max {tp['tokens']['max']}), ~{tp['vocab_size']} distinct words, "
+                       f"{tp['duplicate_rate']:.1%} duplicates\n")
+
+    # Task summary
+    task_md = f"## 🎯 Task\n"
+    for k, v in task.items():
+        task_md += f"- **{k.capitalize()}**: {v}\n"
+
+    # Pipeline summary
+    pipeline_md = "## 🛠️ Pipeline Suggestion\n"
+    if isinstance(pipeline, dict):
+        for k, v in pipeline.items():
+            pipeline_md += f"- **{k.capitalize()}**: {v}\n"
+    else:
+        pipeline_md += f"{pipeline}\n"
+
+    # Quick baseline evaluation (only when enabled)
+    evaluation_md = ""
+    if evaluation:
+        evaluation_md = "## ✅ Quick Baseline Evaluation\n"
+        if evaluation.get("model"):
+            evaluation_md += (f"**Best baseline:** {evaluation['model']} on {evaluation['sample_size']} rows "
+                              f"({evaluation['elapsed_sec']}s{', stopped at time budget' if evaluation.get('stopped_early') else ''})\n")
+        for m, v in evaluation.get("metrics", {}).items():
+            evaluation_md += f"- **{m}**: {v}\n"
+        if evaluation.get("note"):
+            evaluation_md += f"\n_{evaluation['note']}_\n"
+        evaluation_md += "\n"
+
+    # Paradigm and Strategy summary
+    paradigm, strategy = paradigm_and_strategy(task, meta)
+    strategy_md = f"## 🌍 ML Paradigm & Training Strategy\n**Paradigm:** {paradigm}\n**Recommended Strategy:**\n"
+    for s in strategy:
+        strategy_md += f"- {s}\n"
+
+    # Explainability summary
+    explain_md = "## 🔍 Explainability\n"
+    model_name = pipeline.get("model") if isinstance(pipeline, dict) else None
+    # Size the explainability plan for the same cores the model was chosen for
+    cores = pipeline.get("cost_estimate", {}).get("budget", {}).get("cores") if isinstance(pipeline, dict) else None
+    explain_md += explain_pipeline(model_name, meta=meta, task=task, cores=cores) + "\n"
+
+    # Theory summary
+    theory_md = "## 🧪 Scientific Theory Insights\n"
+    rules = theory.get("rules", [])
+    if rules:
+        for r in rules:
+            theory_md += f"- {r}\n"
+    llm = theory.get("llm", "")
+    if llm:
+        theory_md += f"\n**LLM Insights:**\n{llm}\n"
+
+    return f"# 🧠 Zero-Shot AI Theory Generator\n\n{dataset_md}\n{task_md}\n{pipeline_md}\n{evaluation_md}{strategy_md}\n{explain_md}\n{theory_md}"
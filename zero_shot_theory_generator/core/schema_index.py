@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import numpy as np
+
+NUM_PERM = 128
+BANDS = 32
+ROWS_PER_BAND = NUM_PERM // BANDS
+_PRIME = (1 << 61) - 1
+_rng = np.random.RandomState(1729)
+# Fixed coefficients so signatures are comparable across processes and runs
+_A = _rng.randint(1, 1 << 29, size=NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, 1 << 29, size=NUM_PERM).astype(np.uint64)
+
+# Task fields that name dataset columns; a reused task is only valid if they still exist
+_COLUMN_FIELDS = ("target", "time_col", "user_col", "item_col", "rating_col", "input")
+
+
+def normalize_name(name):
+    return re.sub(r"[^0-9a-z]+", "_", str(name).lower()).strip("_")
+
+
+def dtype_family(dtype):
+    dtype = str(dtype)
+    if dtype.startswith(("int", "uint")):
+        return "int"
+    if dtype.startswith("float"):
+        return "float"
+    if dtype.startswith("bool"):
+        return "bool"
+    if dtype.startswith("datetime"):
+        return "datetime"
+    return "str"
+
+
+def cardinality_bucket(n_unique, n_rows):
+    if n_unique <= 1:
+        return "const"
+    if n_unique <= 2:
+        return "binary"
+    if n_unique <= 10:
+        return "low"
+    if n_rows and n_unique < n_rows * 0.5:
+        return "mid"
+    return "high"
+
+
+def schema_tokens(meta):
+    """Normalized schema description: one token per column (name|dtype|cardinality) or per key/class."""
+    kind = meta.get("type", "unknown")
+    if kind == "tabular":
+        n_rows = meta.get("n_rows", 0)
+        tokens = [
+            f"{normalize_name(c['name'])}|{dtype_family(c.get('dtype'))}|"
+            f"{cardinality_bucket(c.get('n_unique', 0), n_rows)}"
+            for c in meta.get("columns", [])
+        ]
+    elif kind == "image_folder":
+        tokens = [f"class|{normalize_name(c)}" for c in meta.get("classes", [])]
+    else:
+        tokens = [f"key|{normalize_name(k)}" for k in meta.get("keys", [])]
+    return sorted(set(tokens + [f"type|{kind}"]))
+
+
+def schema_fingerprint(tokens):
+    return hashlib.sha256("\n".join(tokens).encode("utf-8")).hexdigest()
+
+
+def minhash(tokens, chunk=8192):
+    """MinHash signature (NUM_PERM uint64 values) of a token set."""
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=4).digest(), "little") for t in tokens],
+        dtype=np.uint64
+    )
+    signature = np.full(NUM_PERM, np.iinfo(np.uint64).max, dtype=np.uint64)
+    for start in range(0, len(hashes), chunk):
+        h = hashes[start:start + chunk]
+        perm = (_A[:, None] * h[None, :] + _B[:, None]) % _PRIME
+        signature = np.minimum(signature, perm.min(axis=1))
+    return signature
+
+
+def _band_keys(signature):
+    return [
+        hashlib.blake2b(signature[i * ROWS_PER_BAND:(i + 1) * ROWS_PER_BAND].tobytes(), digest_size=8).hexdigest()
+        for i in range(BANDS)
+    ]
+
+
+def jaccard(a, b):
+    a, b = set(a), set(b)
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def task_applies(task, meta):
+    """True if every column the task refers to exists in meta."""
+    if meta.get("type") != "tabular":
+        return True
+    names = {c["name"] for c in meta.get("columns", [])}
+    return all(task.get(f) in names for f in _COLUMN_FIELDS if task.get(f) is not None)
+
+
+class SchemaIndex:
+    """
+    Maps schema fingerprints to the reports that analysed them.
+    Exact matches use an indexed fingerprint lookup; near matches use MinHash LSH
+    (BANDS x ROWS_PER_BAND) to fetch candidates, then exact Jaccard on the stored tokens.
+    Each entry also keeps the content fingerprint of the dataset metadata, so a dataset
+    never matches its own earlier reports.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS schemas (
+                report_id TEXT PRIMARY KEY,
+                schema_fp TEXT NOT NULL,
+                tokens TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_schemas_fp ON schemas (schema_fp);
+            CREATE TABLE IF NOT EXISTS schema_bands (
+                band INTEGER NOT NULL,
+                bucket TEXT NOT NULL,
+                report_id TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_bands ON schema_bands (band, bucket);
+        """)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(schemas)")}
+        if "dataset_fp" not in columns:
+            # Indexes created before dataset fingerprints were stored
+            self._conn.execute("ALTER TABLE schemas ADD COLUMN dataset_fp TEXT")
+
+    def add(self, report_id, meta, dataset_fp=None):
+        tokens = schema_tokens(meta)
+        bands = _band_keys(minhash(tokens))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO schemas (report_id, schema_fp, tokens, created_at, dataset_fp) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (report_id, schema_fingerprint(tokens), json.dumps(tokens), time.time(), dataset_fp)
+            )
+            self._conn.executemany(
+                "INSERT INTO schema_bands (band, bucket, report_id) VALUES (?, ?, ?)",
+                [(i, key, report_id) for i, key in enumerate(bands)]
+            )
+
+    def lookup(self, meta, threshold=0.9, max_candidates=50, exclude_fp=None):
+        """
+        Return (report_id, similarity) of the closest indexed schema with Jaccard >= threshold,
+        preferring exact fingerprint matches and, among equals, the newest report; else None.
+        """
+        matches = self.matches(meta, threshold, max_candidates, exclude_fp)
+        return matches[0] if matches else None
+
+    def matches(self, meta, threshold=0.9, max_candidates=50, exclude_fp=None):
+        """
+        All (report_id, similarity) with Jaccard >= threshold, best first: exact fingerprint
+        matches (newest first), then near matches by similarity. Entries of the dataset whose
+        metadata fingerprint is exclude_fp are skipped.
+        """
+        tokens = schema_tokens(meta)
+        with self._lock:
+            exact = self._conn.execute(
+                "SELECT report_id, dataset_fp FROM schemas WHERE schema_fp = ? ORDER BY created_at DESC LIMIT ?",
+                (schema_fingerprint(tokens), max_candidates)
+            ).fetchall()
+            candidates = []
+            if threshold < 1.0:
+                bands = _band_keys(minhash(tokens))
+                clauses = " OR ".join(["(band = ? AND bucket = ?)"] * len(bands))
+                params = [v for i, key in enumerate(bands) for v in (i, key)]
+                candidates = self._conn.execute(
+                    f"SELECT s.report_id, s.dataset_fp, s.tokens FROM schemas s JOIN ("
+                    f"  SELECT report_id, COUNT(*) AS hits FROM schema_bands WHERE {clauses}"
+                    f"  GROUP BY report_id ORDER BY hits DESC LIMIT ?"
+                    f") c ON c.report_id = s.report_id ORDER BY s.created_at DESC",
+                    params + [max_candidates]
+                ).fetchall()
+        matches = [(report_id, 1.0) for report_id, fp in exact if exclude_fp is None or fp != exclude_fp]
+        seen = {report_id for report_id, _ in exact}
+        near = []
+        for report_id, fp, stored in candidates:
+            if report_id in seen or (exclude_fp is not None and fp == exclude_fp):
+                continue
+            sim = jaccard(tokens, json.loads(stored))
+            if sim >= threshold:
+                near.append((report_id, sim))
+        # Stable sort keeps the newest first among equal similarities
+        near.sort(key=lambda hit: hit[1], reverse=True)
+        return matches + near
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from zero_shot_theory_generator.core.tabular_meta import TabularMetadata, json_default
+from zero_shot_theory_generator.utils.tracing import DISABLED_TRACER
+
+
+def _fingerprint_default(o):
+    # Columnar metadata hashes its binary encoding instead of expanding every column
+    if isinstance(o, TabularMetadata):
+        return {"__tabular_meta__": o.digest()}
+    return json_default(o)
+
+
+def fingerprint(value):
+    """Stable content hash of any JSON-like value."""
+    data = json.dumps(value, sort_keys=True, default=_fingerprint_default).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+class Stage:
+    """
+    One node of the analysis DAG.
+      name:   key under which the stage output is published
+      fn:     callable receiving the dependency values (in order) plus the declared params as keywords
+      deps:   names of graph inputs or earlier stage outputs
+      params: run parameters that affect only this stage (e.g. the LLM seed)
+      cache:  False for cheap stages that must always run (e.g. stat-ing the file)
+      label:  span name used when tracing (defaults to name)
+      keep:   optional predicate on the output; outputs it rejects (e.g. a failed LLM call)
+              are used for this run but not memoized, so the next run tries again
+    """
+
+    def __init__(self, name, fn, deps, params=(), cache=True, label=None, keep=None):
+        self.name = name
+        self.label = label or name
+        self.fn = fn
+        self.deps = list(deps)
+        self.params = list(params)
+        self.cache = cache
+        self.keep = keep
+
+
+class StageGraph:
+    """
+    Runs stages in topological (declaration) order and memoizes every stage output
+    under a hash of its inputs' content. Because keys are derived from the content
+    of upstream outputs, a rerun only recomputes the stages whose inputs changed.
+    Cached outputs are shared between runs, so stages must not mutate their inputs.
+    """
+
+    def __init__(self, stages, max_entries=256):
+        self.stages = list(stages)
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        names = [stage.name for stage in self.stages]
+        if len(names) != len(set(names)):
+            raise ValueError(f"Duplicate stage names in graph: {names}")
+
+    def _get(self, key):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        return None
+
+    def _put(self, key, entry):
+        with self._lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def run(self, inputs, params=None, force=(), tracer=DISABLED_TRACER):
+        """
+        Execute the graph, recording a tracer span for every stage that executes.
+        Returns (values, recomputed) where values maps every input and stage name to its
+        value and recomputed lists the stages that actually executed.
+        """
+        params = params or {}
+        values = dict(inputs)
+        hashes = {name: fingerprint(value) for name, value in inputs.items()}
+        recomputed = []
+        for stage in self.stages:
+            missing = [d for d in stage.deps if d not in values]
+            if missing:
+                raise KeyError(f"Stage '{stage.name}' is missing inputs: {missing}")
+            stage_params = {p: params.get(p) for p in stage.params}
+            key = fingerprint([stage.name, [hashes[d] for d in stage.deps], stage_params])
+            entry = self._get(key) if stage.cache and stage.name not in force else None
+            if entry is None:
+                with tracer.span(stage.label, stage=stage.name):
+                    output = stage.fn(*[values[d] for d in stage.deps], **stage_params)
+                entry = (output, fingerprint(output))
+                if stage.cache and (stage.keep is None or stage.keep(output)):
+                    self._put(key, entry)
+                recomputed.append(stage.name)
+            values[stage.name], hashes[stage.name] = entry
+        return values, recomputed
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
@@ -0,0 +1,292 @@
+import hashlib
+import json
+import math
+import struct
+import zlib
+from array import array
+from collections.abc import MutableMapping, Sequence
+
+IS_DATETIME = 1
+IS_SORTED = 2
+
+_MAGIC = b"ZTM1"
+_CORE_KEYS = (
+    "type", "n_rows", "columns", "has_datetime", "potential_timeseries", "potential_targets",
+    "categorical_columns", "numeric_columns", "high_cardinality_columns"
+)
+_STATS = ("min", "max", "mean", "std")
+# Sections of the binary body: header, names, dtype codes, n_unique, missing, flags,
+# numeric index, the four stats, categorical / target / high-cardinality indexes
+_N_PARTS = 14
+_LAYOUT = f"<I{_N_PARTS}Q"
+
+
+def _opt_float(value):
+    """None for NaN-like values (how missing stats were represented in the column dicts)."""
+    return None if value is None or math.isnan(value) else value
+
+
+class ColumnList(Sequence):
+    """
+    Read-only list view over TabularMetadata columns. Items are built as the original
+    per-column dicts on access; bulk readers can use .names / .dtypes directly.
+    """
+
+    def __init__(self, meta):
+        self._meta = meta
+
+    @property
+    def names(self):
+        return self._meta.names
+
+    @property
+    def dtypes(self):
+        table, codes = self._meta.dtype_table, self._meta.dtype_codes
+        return [table[c] for c in codes]
+
+    def datetime_positions(self):
+        return [i for i, f in enumerate(self._meta.flags) if f & IS_DATETIME]
+
+    def __len__(self):
+        return len(self._meta.names)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._meta.column(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("column index out of range")
+        return self._meta.column(i)
+
+    def __iter__(self):
+        column = self._meta.column
+        for i in range(len(self._meta.names)):
+            yield column(i)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class TabularMetadata(MutableMapping):
+    """
+    Struct-of-arrays form of the tabular metadata dict produced by analyze_tabular_data.
+    Per-column values live in typed arrays and column roles (numeric, categorical,
+    potential target, high cardinality) are index arrays instead of repeated names.
+    It behaves like the original dict for readers (meta["columns"][0]["name"], meta.get(...));
+    the core keys are read-only, other keys (later enrichments) can be set freely.
+    to_dict() gives the plain dict, to_bytes()/from_bytes() a compact binary encoding.
+    """
+
+    def __init__(self, n_rows=0, has_datetime=False, potential_timeseries=False):
+        self.n_rows = n_rows
+        self.has_datetime = has_datetime
+        self.potential_timeseries = potential_timeseries
+        self.names = []
+        self.dtype_table = []
+        self._dtype_lookup = {}
+        self.dtype_codes = array("I")
+        self.n_unique = array("q")
+        self.missing = array("d")
+        self.flags = bytearray()
+        # Stats are stored only for numeric columns, aligned with numeric_idx
+        self.numeric_idx = array("i")
+        self.stats = {k: array("d") for k in _STATS}
+        self.categorical_idx = array("i")
+        self.target_idx = array("i")
+        self.high_card_idx = array("i")
+        self.extra = {}
+        self._columns = None
+        self._digest = None
+        self._numeric_pos_cache = None
+
+    # --- building -------------------------------------------------------
+
+    def add_column(self, name, dtype, n_unique, missing, is_datetime=False, is_sorted=False,
+                   stats=None, categorical=False, potential_target=False, high_cardinality=False):
+        """Append one column; stats is (min, max, mean, std) for numeric columns, else None."""
+        i = len(self.names)
+        code = self._dtype_lookup.get(dtype)
+        if code is None:
+            code = self._dtype_lookup[dtype] = len(self.dtype_table)
+            self.dtype_table.append(dtype)
+        self.names.append(name)
+        self.dtype_codes.append(code)
+        self.n_unique.append(n_unique)
+        self.missing.append(missing)
+        self.flags.append((IS_DATETIME if is_datetime else 0) | (IS_SORTED if is_sorted else 0))
+        if stats is not None:
+            self.numeric_idx.append(i)
+            for key, value in zip(_STATS, stats):
+                self.stats[key].append(float("nan") if value is None else value)
+        if categorical:
+            self.categorical_idx.append(i)
+        if potential_target:
+            self.target_idx.append(i)
+        if high_cardinality:
+            self.high_card_idx.append(i)
+        self._columns = None
+        self._digest = None
+        return i
+
+    # --- dict-compatible view -------------------------------------------
+
+    def column(self, i):
+        """Column i as the original dict (same keys, same order)."""
+        col = {
+            "name": self.names[i],
+            "dtype": self.dtype_table[self.dtype_codes[i]],
+            "n_unique": self.n_unique[i],
+            "missing": self.missing[i]
+        }
+        flags = self.flags[i]
+        if flags & IS_DATETIME:
+            col["is_datetime"] = True
+        if flags & IS_SORTED:
+            col["is_sorted"] = True
+        pos = self._numeric_pos().get(i)
+        if pos is not None:
+            for key in _STATS:
+                col[key] = _opt_float(self.stats[key][pos])
+        return col
+
+    def _numeric_pos(self):
+        if self._numeric_pos_cache is None or len(self._numeric_pos_cache) != len(self.numeric_idx):
+            self._numeric_pos_cache = {col: pos for pos, col in enumerate(self.numeric_idx)}
+        return self._numeric_pos_cache
+
+    def _names_at(self, idx):
+        names = self.names
+        return [names[i] for i in idx]
+
+    def __getitem__(self, key):
+        if key == "type":
+            return "tabular"
+        if key == "n_rows":
+            return self.n_rows
+        if key == "columns":
+            # One stable view per instance, so caches keyed on the column list (task_inference) hit
+            if self._columns is None:
+                self._columns = ColumnList(self)
+            return self._columns
+        if key == "has_datetime":
+            return self.has_datetime
+        if key == "potential_timeseries":
+            return self.potential_timeseries
+        if key == "potential_targets":
+            return self._names_at(self.target_idx)
+        if key == "categorical_columns":
+            return self._names_at(self.categorical_idx)
+        if key == "numeric_columns":
+            return self._names_at(self.numeric_idx)
+        if key == "high_cardinality_columns":
+            return self._names_at(self.high_card_idx)
+        return self.extra[key]
+
+    def __setitem__(self, key, value):
+        if key in _CORE_KEYS:
+            raise TypeError(f"'{key}' is part of the columnar metadata and cannot be reassigned")
+        self.extra[key] = value
+        self._digest = None
+
+    def __delitem__(self, key):
+        if key in _CORE_KEYS:
+            raise TypeError(f"'{key}' is part of the columnar metadata and cannot be deleted")
+        del self.extra[key]
+        self._digest = None
+
+    def __iter__(self):
+        yield from _CORE_KEYS
+        yield from self.extra
+
+    def __len__(self):
+        return len(_CORE_KEYS) + len(self.extra)
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+    def copy(self):
+        """Copy sharing the (immutable) column arrays but with its own extra keys."""
+        clone = TabularMetadata.__new__(TabularMetadata)
+        clone.__dict__.update(self.__dict__)
+        clone.extra = dict(self.extra)
+        clone._columns = None
+        return clone
+
+    def to_dict(self):
+        data = {key: self[key] for key in _CORE_KEYS}
+        data["columns"] = list(data["columns"])
+        data.update(self.extra)
+        return data
+
+    def digest(self):
+        """Content hash, cached until the metadata changes."""
+        if self._digest is None:
+            h = hashlib.sha256(self.to_bytes(compress=False))
+            self._digest = h.hexdigest()
+        return self._digest
+
+    # --- binary encoding ------------------------------------------------
+
+    def to_bytes(self, compress=True):
+        header = json.dumps({
+            "n_rows": self.n_rows,
+            "has_datetime": self.has_datetime,
+            "potential_timeseries": self.potential_timeseries,
+            "dtype_table": self.dtype_table,
+            "extra": self.extra,
+            # Names that are not strings (e.g. integer column labels) keep their type via JSON
+            **({} if all(isinstance(n, str) for n in self.names) else {"names": self.names})
+        }, separators=(",", ":"), sort_keys=True, default=json_default).encode("utf-8")
+        names = "\0".join(map(str, self.names)).encode("utf-8")
+        parts = [
+            header, names, self.dtype_codes.tobytes(), self.n_unique.tobytes(), self.missing.tobytes(),
+            bytes(self.flags), self.numeric_idx.tobytes(), *(self.stats[k].tobytes() for k in _STATS),
+            self.categorical_idx.tobytes(), self.target_idx.tobytes(), self.high_card_idx.tobytes()
+        ]
+        body = struct.pack(_LAYOUT, len(self.names), *(len(p) for p in parts)) + b"".join(parts)
+        return _MAGIC + (b"z" + zlib.compress(body) if compress else b"r" + body)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:4] != _MAGIC:
+            raise ValueError("Not a TabularMetadata encoding")
+        body = zlib.decompress(data[5:]) if data[4:5] == b"z" else data[5:]
+        n_cols, *lengths = struct.unpack_from(_LAYOUT, body)
+        offset = struct.calcsize(_LAYOUT)
+        parts = []
+        for length in lengths:
+            parts.append(body[offset:offset + length])
+            offset += length
+        header = json.loads(parts[0])
+        meta = cls(header["n_rows"], header["has_datetime"], header["potential_timeseries"])
+        meta.names = header.get("names") or (parts[1].decode("utf-8").split("\0") if n_cols else [])
+        meta.dtype_table = header["dtype_table"]
+        meta._dtype_lookup = {d: i for i, d in enumerate(meta.dtype_table)}
+        meta.extra = header["extra"]
+
+        def arr(typecode, raw):
+            a = array(typecode)
+            a.frombytes(raw)
+            return a
+
+        meta.dtype_codes = arr("I", parts[2])
+        meta.n_unique = arr("q", parts[3])
+        meta.missing = arr("d", parts[4])
+        meta.flags = bytearray(parts[5])
+        meta.numeric_idx = arr("i", parts[6])
+        meta.stats = {k: arr("d", parts[7 + j]) for j, k in enumerate(_STATS)}
+        meta.categorical_idx = arr("i", parts[11])
+        meta.target_idx = arr("i", parts[12])
+        meta.high_card_idx = arr("i", parts[13])
+        return meta
+
+
+def json_default(o):
+    """json.dump(s) hook: columnar metadata as the plain dict, numpy values as Python ones, anything else as str."""
+    if isinstance(o, (TabularMetadata, ColumnList)):
+        return o.to_dict() if isinstance(o, TabularMetadata) else list(o)
+    if hasattr(o, "dtype") and hasattr(o, "tolist"):
+        # numpy scalars and arrays (np.int64(5) -> 5, arrays -> lists)
+        return o.tolist()
+    return str(o)
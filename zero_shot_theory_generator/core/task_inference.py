@@ -1,3 +1,169 @@
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import accumulate, compress
+from operator import itemgetter, methodcaller
+from zero_shot_theory_generator.core.tabular_meta import ColumnList
+
+# Rule flags; a column can carry several (e.g. "price" is a time-series and a regression target name)
+IMAGE = 1 << 0
+TIME = 1 << 1
+TS_TARGET = 1 << 2
+USER = 1 << 3
+ITEM = 1 << 4
+RATING = 1 << 5
+REG_NAME = 1 << 6
+CLS_NAME = 1 << 7
+ANOMALY = 1 << 8
+REG_SUBSTR = 1 << 9
+LABELS = 1 << 10
+CASES = 1 << 11
+
+# Exact (lowercased) column names per rule
+_NAME_RULES = [
+    (IMAGE, ("image_path", "image_url", "img", "image")),
+    (TIME, ("date", "time", "datetime", "timestamp", "year", "month", "day", "period", "week")),
+    (TS_TARGET, ("revenue", "sales", "price", "value", "demand", "volume",
+                 "consumption", "production", "stock", "return")),
+    (USER, ("user", "user_id", "customer", "customer_id")),
+    (ITEM, ("item", "item_id", "product", "product_id")),
+    (RATING, ("rating", "score", "preference", "rank")),
+    (REG_NAME, ("target", "y", "value", "price", "sales", "revenue", "cases", "count", "amount")),
+    (CLS_NAME, ("target", "label", "class", "y", "category", "type", "result")),
+    (LABELS, ("labels",)),
+    (CASES, ("cases",)),
+]
+# Lowercased name -> OR of all exact-name flags
+NAME_FLAGS = {}
+for _flag, _names in _NAME_RULES:
+    for _name in _names:
+        NAME_FLAGS[_name] = NAME_FLAGS.get(_name, 0) | _flag
+
+_SUFFIX_RULES = {"_target": REG_NAME, "_class": CLS_NAME, "_label": CLS_NAME}
+_SUBSTRING_RULES = {
+    "anomaly": ANOMALY, "outlier": ANOMALY, "fraud": ANOMALY, "error": ANOMALY,
+    "cases": REG_SUBSTR, "count": REG_SUBSTR, "amount": REG_SUBSTR,
+    "price": REG_SUBSTR, "value": REG_SUBSTR, "rate": REG_SUBSTR,
+}
+# Compiled rule table over the "\n"-delimited lowercased names: (needle, flags, offset of the
+# name's first character relative to the match). Exact names are "\nname\n", suffixes "suffix\n".
+EXACT_RULES = {name: (f"\n{name}\n", flags, 1) for name, flags in NAME_FLAGS.items()}
+SCAN_RULES = (
+    [(f"{suffix}\n", flag, 0) for suffix, flag in _SUFFIX_RULES.items()]
+    + [(keyword, flag, 0) for keyword, flag in _SUBSTRING_RULES.items()]
+)
+_NUMERIC_PREFIXES = ("float", "int")
+
+
+def _name_flags(lname):
+    """Rule flags for one lowercased name."""
+    text = f"\n{lname}\n"
+    flags = NAME_FLAGS.get(lname, 0)
+    for needle, flag, _ in SCAN_RULES:
+        if needle in text:
+            flags |= flag
+    return flags
+
+
+def _column_flags(names):
+    """
+    Map column position -> rule flags for the (usually few) columns matching any rule.
+    Exact names are found by one set intersection; only the hit names and the suffix/substring
+    needles are then located with str.find over one text holding all names, so the scans run
+    in C and only matches are mapped back to columns (by bisecting name offsets).
+    """
+    text = "\n" + "\n".join(names).lower() + "\n"
+    if len(text) != sum(map(len, names)) + len(names) + 1 or text.count("\n") != len(names) + 1:
+        # A newline inside a name, or a character whose lowercase form has a different
+        # length, would shift offsets; fall back to matching name by name
+        flags = ((i, _name_flags(n.lower())) for i, n in enumerate(names))
+        return {i: f for i, f in flags if f}
+    exact_hits = NAME_FLAGS.keys() & set(text[1:-1].split("\n"))
+    flags = {}
+    name_starts = None
+    for needle, flag, offset in [EXACT_RULES[name] for name in exact_hits] + SCAN_RULES:
+        pos = text.find(needle)
+        if pos != -1 and name_starts is None:
+            name_starts = list(accumulate(map((1).__add__, map(len, names[:-1])), initial=1))
+        while pos != -1:
+            i = bisect_right(name_starts, pos + offset) - 1
+            flags[i] = flags.get(i, 0) | flag
+            pos = text.find(needle, pos + 1)
+    return flags
+
+
+class ColumnIndex:
+    """
+    Index over meta["columns"] that answers every tabular rule of infer_task:
+    per-rule first matching column plus the dtype/cardinality-conditioned lookups.
+    Name rules are searched over all names at once; only matching columns are visited
+    in Python. Built once per column list (see column_index) so repeated inference is O(1).
+    """
+
+    def __init__(self, columns):
+        self.first = {}
+        self.explicit_target = None
+        self.numeric_substr_target = None
+        self.labels_single = False
+        self.cases_multi = False
+        if isinstance(columns, ColumnList):
+            # Columnar metadata: read the arrays instead of materialising every column dict
+            names, dtype_list = list(columns.names), columns.dtypes
+            time_pos = set(columns.datetime_positions())
+        else:
+            names, dtype_list = list(map(itemgetter("name"), columns)), map(itemgetter("dtype"), columns)
+            time_pos = set(compress(range(len(columns)), map(methodcaller("get", "is_datetime", False), columns)))
+        flags_by_pos = _column_flags(names)
+        dtypes = "\n" + "\n".join(dtype_list)
+        self.n_numeric = sum(dtypes.count("\n" + prefix) for prefix in _NUMERIC_PREFIXES)
+        time_pos.update(i for i, f in flags_by_pos.items() if f & TIME)
+        self.time_cols = [columns[i] for i in sorted(time_pos)]
+        for i in sorted(flags_by_pos):
+            flags, c = flags_by_pos[i], columns[i]
+            is_numeric = c["dtype"].startswith(_NUMERIC_PREFIXES)
+            n_unique = c.get("n_unique", 0)
+            for flag in (IMAGE, TS_TARGET, USER, ITEM, RATING, ANOMALY):
+                if flags & flag and flag not in self.first:
+                    self.first[flag] = c
+            if self.explicit_target is None:
+                # Regression is checked before classification for the same column
+                if flags & REG_NAME and is_numeric:
+                    self.explicit_target = ("regression", c)
+                elif flags & CLS_NAME and n_unique <= 50:
+                    kind = "binary_classification" if n_unique <= 2 else "classification"
+                    self.explicit_target = (kind, c)
+            if flags & REG_SUBSTR and is_numeric and self.numeric_substr_target is None:
+                self.numeric_substr_target = c
+            if flags & LABELS and n_unique == 1:
+                self.labels_single = True
+            if flags & CASES and n_unique > 1:
+                self.cases_multi = True
+
+
+_index_cache = OrderedDict()
+_index_lock = threading.Lock()
+_INDEX_CACHE_SIZE = 64
+
+
+def column_index(columns):
+    """
+    Return the ColumnIndex for this column list, building it on first use.
+    Entries hold a reference to the list, so its id cannot be recycled while cached.
+    """
+    key = id(columns)
+    with _index_lock:
+        entry = _index_cache.get(key)
+        if entry is not None and entry[0] is columns and entry[1] == len(columns):
+            _index_cache.move_to_end(key)
+            return entry[2]
+    index = ColumnIndex(columns)
+    with _index_lock:
+        _index_cache[key] = (columns, len(columns), index)
+        while len(_index_cache) > _INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
+
+
 def infer_task(meta):
     """Improved task inference with better domain detection."""
     
@@ -11,115 +177,76 @@ def infer_task(meta):
 
     # Handle tabular data
     if meta["type"] == "tabular":
+        idx = column_index(meta["columns"])
+
         # Check for image columns (embedded or path-based)
-        image_cols = [c for c in meta["columns"] if c["name"].lower() in ("image_path", "image_url", "img", "image")]
-        if image_cols:
-            return {"task": "image_classification", "input": image_cols[0]["name"], "confidence": 0.9}
-        
+        if IMAGE in idx.first:
+            return {"task": "image_classification", "input": idx.first[IMAGE]["name"], "confidence": 0.9}
+
         # Time series detection with enhanced logic
-        if meta.get("potential_timeseries", False) or meta.get("has_datetime", False):
-            time_cols = [c for c in meta["columns"] 
-                        if c.get("is_datetime", False) or c["name"].lower() in 
-                        ("date", "time", "datetime", "timestamp", "year", "month", "day", "period", "week")]
-            
-            if time_cols:
-                # Try to find target columns
-                potential_targets = meta.get("potential_targets", [])
-                if not potential_targets:
-                    # Look by name
-                    potential_targets = [c["name"] for c in meta["columns"] 
-                                      if c["name"].lower() in ("revenue", "sales", "price", "value", "demand", "volume", 
-                                                            "consumption", "production", "stock", "return")]
-                
-                if potential_targets:
-                    return {
-                        "task": "time_series_forecasting", 
-                        "time_col": time_cols[0]["name"],
-                        "target": potential_targets[0], 
-                        "confidence": 0.9
-                    }
-                else:
-                    # Use first numeric column that's not the time column as target
-                    numeric_cols = meta.get("numeric_columns", [])
-                    time_col_names = [c["name"] for c in time_cols]
-                    potential_targets = [c for c in numeric_cols if c not in time_col_names]
-                    
-                    if potential_targets:
-                        return {
-                            "task": "time_series_forecasting",
-                            "time_col": time_cols[0]["name"],
-                            "target": potential_targets[0],
-                            "confidence": 0.85
-                        }
-        
+        if (meta.get("potential_timeseries", False) or meta.get("has_datetime", False)) and idx.time_cols:
+            time_col = idx.time_cols[0]["name"]
+            # Try to find target columns, then look by name
+            potential_targets = meta.get("potential_targets", [])
+            if not potential_targets and TS_TARGET in idx.first:
+                potential_targets = [idx.first[TS_TARGET]["name"]]
+
+            if potential_targets:
+                return {
+                    "task": "time_series_forecasting",
+                    "time_col": time_col,
+                    "target": potential_targets[0],
+                    "confidence": 0.9
+                }
+            # Use first numeric column that's not the time column as target
+            time_col_names = {c["name"] for c in idx.time_cols}
+            fallback = next((c for c in meta.get("numeric_columns", []) if c not in time_col_names), None)
+            if fallback is not None:
+                return {
+                    "task": "time_series_forecasting",
+                    "time_col": time_col,
+                    "target": fallback,
+                    "confidence": 0.85
+                }
+
         # Anomaly detection - if column named "anomaly", "outlier", "fraud", etc.
-        anomaly_cols = [c for c in meta["columns"] 
-                       if any(term in c["name"].lower() for term in ["anomaly", "outlier", "fraud", "error"])]
-        if anomaly_cols:
+        if ANOMALY in idx.first:
             return {
                 "task": "anomaly_detection",
-                "target": anomaly_cols[0]["name"],
+                "target": idx.first[ANOMALY]["name"],
                 "confidence": 0.9
             }
-        
+
         # Recommendation - if columns suggest user-item interactions
-        user_cols = [c for c in meta["columns"] if c["name"].lower() in ("user", "user_id", "customer", "customer_id")]
-        item_cols = [c for c in meta["columns"] if c["name"].lower() in ("item", "item_id", "product", "product_id")]
-        rating_cols = [c for c in meta["columns"] if c["name"].lower() in ("rating", "score", "preference", "rank")]
-        
-        if user_cols and item_cols:
+        if USER in idx.first and ITEM in idx.first:
             task_info = {
                 "task": "recommendation",
-                "user_col": user_cols[0]["name"],
-                "item_col": item_cols[0]["name"],
+                "user_col": idx.first[USER]["name"],
+                "item_col": idx.first[ITEM]["name"],
                 "confidence": 0.85
             }
-            if rating_cols:
-                task_info["rating_col"] = rating_cols[0]["name"]
+            if RATING in idx.first:
+                task_info["rating_col"] = idx.first[RATING]["name"]
             return task_info
-        
-        # Common target column names
-        regression_target_names = ["target", "y", "value", "price", "sales", "revenue", "cases", "count", "amount"]
-        classification_target_names = ["target", "label", "class", "y", "category", "type", "result"]
-        
-        # First look for explicit target columns
-        for c in meta["columns"]:
-            col_name = c["name"].lower()
-            
-            # Check for regression targets
-            if col_name in regression_target_names or col_name.endswith("_target"):
-                if c["dtype"].startswith(("float", "int")):
-                    return {"task": "regression", "target": c["name"], "confidence": 0.9}
-                
-            # Check for classification targets
-            if col_name in classification_target_names or col_name.endswith(("_class", "_label")):
-                if c.get("n_unique", 0) <= 50:  # Classification typically has limited classes
-                    # Determine if binary or multi-class
-                    task_type = "binary_classification" if c.get("n_unique", 0) <= 2 else "classification"
-                    return {"task": task_type, "target": c["name"], "confidence": 0.9}
-        
-        # If no explicit targets found, try to infer from data characteristics
-        # Look for numeric columns that might be targets
-        numeric_cols = [c for c in meta["columns"] if c["dtype"].startswith(("float", "int"))]
-        
-        # Check for common regression scenarios (like forecasting, prediction)
-        for c in numeric_cols:
-            col_name = c["name"].lower()
-            # Columns likely to be regression targets
-            if any(term in col_name for term in ["cases", "count", "amount", "price", "value", "rate"]):
-                return {"task": "regression", "target": c["name"], "confidence": 0.85}
-        
+
+        # First look for explicit target columns (regression or classification names)
+        if idx.explicit_target is not None:
+            task_type, c = idx.explicit_target
+            return {"task": task_type, "target": c["name"], "confidence": 0.9}
+
+        # If no explicit targets found, numeric columns likely to be regression targets
+        if idx.numeric_substr_target is not None:
+            return {"task": "regression", "target": idx.numeric_substr_target["name"], "confidence": 0.85}
+
         # If still no target found but we have columns named "labels" with only 1 unique value
         # and "cases" with multiple values, assume "cases" is the regression target
-        labels_col = next((c for c in meta["columns"] if c["name"].lower() == "labels" and c.get("n_unique", 0) == 1), None)
-        cases_col = next((c for c in meta["columns"] if c["name"].lower() == "cases" and c.get("n_unique", 0) > 1), None)
-        if labels_col and cases_col:
+        if idx.labels_single and idx.cases_multi:
             return {"task": "regression", "target": "cases", "confidence": 0.9}
-        
+
         # Check for clustering task (no clear target, mostly numeric features)
-        if len(numeric_cols) > 3 and len(meta.get("categorical_columns", [])) < len(numeric_cols):
+        if idx.n_numeric > 3 and len(meta.get("categorical_columns", [])) < idx.n_numeric:
             return {"task": "clustering", "confidence": 0.7}
-            
+
         return {"task": "unsupervised", "confidence": 0.5}
 
     # Handle text data
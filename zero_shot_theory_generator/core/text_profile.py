@@ -0,0 +1,263 @@
+"""
+Full-corpus statistics for line-based text and JSONL datasets: document length
+distributions (words and approximate subword tokens), vocabulary size and duplicate
+rate, and from those a truncation length and batch size for transformer fine-tuning.
+
+The file is split into byte ranges aligned to line boundaries and the ranges are
+profiled in a process pool; every shard returns fixed-size histograms and
+HyperLogLog sketches, so merging is cheap and memory does not grow with the corpus.
+"""
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from zero_shot_theory_generator.utils.sketches import HyperLogLog, hash_many
+
+# JSONL keys that hold the text to model
+TEXT_KEYS = ("text", "content", "body", "description", "title", "question", "answer", "context",
+             "sentence", "review", "comment", "summary", "document", "source", "target")
+# Histogram bins per length; longer documents share the last bin
+LENGTH_CAP = 4096
+SHARD_BYTES = 16 << 20
+# Duplicate-rate sketch precision: 2**16 registers, ~0.4% relative error
+DOC_SKETCH_P = 16
+# Words buffered per shard before they are folded into the vocabulary sketch
+_VOCAB_FLUSH = 1 << 20
+TRUNCATE_CHOICES = (32, 64, 128, 256, 384, 512)
+# Position limit of BERT-style encoders; longer documents are truncated to it
+MODEL_MAX_TOKENS = 512
+# [CLS]/[SEP] (or <s>/</s>) added to every sequence
+SPECIAL_TOKENS = 2
+# Share of documents that should fit without truncation
+COVERAGE = 0.95
+# Padded tokens per training step that a base-size encoder fits in ~16 GB with mixed precision
+TOKENS_PER_BATCH = 16_384
+MAX_BATCH = 256
+
+_PUNCTUATION = ".,;:!?\"'()[]{}-/"
+
+
+def approx_tokens(text, n_words=None):
+    """
+    WordPiece/BPE-like token count without a tokenizer (about 4 characters per subword):
+    one token per word and per punctuation mark, plus one per 4 characters beyond an
+    average of 4 per word. Uses only C-level str methods, so it costs far less than a regex.
+    """
+    if n_words is None:
+        n_words = len(text.split())
+    punctuation = sum(map(text.count, _PUNCTUATION))
+    chars = len(text) - sum(map(text.count, " \t\n")) - punctuation
+    return n_words + punctuation + max(0, chars - 4 * n_words) // 4
+
+
+def text_fields(path, sample_lines=100):
+    """
+    None for plain text (one document per line); for JSONL, the string keys to profile:
+    the known text keys if present, else string values averaging at least 3 words.
+    Returns [] when a JSONL file has no text-like field.
+    """
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        lines = [line for _, line in zip(range(sample_lines), f) if line.strip()]
+    try:
+        records = [json.loads(line) for line in lines]
+    except ValueError:
+        return None
+    records = [r for r in records if isinstance(r, dict)]
+    if not records:
+        return None
+    words = {}
+    for r in records:
+        for k, v in r.items():
+            if isinstance(v, str):
+                words.setdefault(k, []).append(len(v.split()))
+    known = [k for k in words if k.lower() in TEXT_KEYS]
+    return known or [k for k, n in words.items() if sum(n) / len(records) >= 3]
+
+
+def _shards(path, n_shards):
+    size = os.path.getsize(path)
+    bounds = [size * i // n_shards for i in range(n_shards + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(n_shards) if bounds[i] < bounds[i + 1]]
+
+
+def _iter_lines(path, start, end):
+    """Lines whose first byte lies in [start, end)."""
+    with open(path, "rb") as f:
+        if start:
+            f.seek(start - 1)
+            f.readline()
+        pos = f.tell()
+        while pos < end:
+            line = f.readline()
+            if not line:
+                break
+            pos += len(line)
+            yield line
+
+
+def _profile_shard(path, start, end, fields):
+    """Histograms, sums and sketches of one byte range (runs in a worker process)."""
+    n_docs = empty = invalid = 0
+    words, tokens = [], []
+    vocab, vocab_buffer = HyperLogLog(), set()
+    doc_hashes = []
+    for raw in _iter_lines(path, start, end):
+        if fields is None:
+            text = raw.decode("utf-8", "replace").strip()
+        else:
+            try:
+                record = json.loads(raw)
+            except ValueError:
+                invalid += 1
+                continue
+            if not isinstance(record, dict):
+                invalid += 1
+                continue
+            text = "\n".join(v for v in (record.get(k) for k in fields) if isinstance(v, str)).strip()
+        n_docs += 1
+        if not text:
+            empty += 1
+            continue
+        split = text.lower().split()
+        words.append(len(split))
+        tokens.append(approx_tokens(text, len(split)))
+        vocab_buffer.update(split)
+        if len(vocab_buffer) > _VOCAB_FLUSH:
+            vocab.add(vocab_buffer)
+            vocab_buffer.clear()
+        doc_hashes.append(text)
+    vocab.add(vocab_buffer)
+    docs = HyperLogLog(DOC_SKETCH_P)
+    docs.add_hashes(hash_many(doc_hashes))
+    words = np.asarray(words, dtype=np.int64)
+    tokens = np.asarray(tokens, dtype=np.int64)
+    return {
+        "n_docs": n_docs,
+        "empty": empty,
+        "invalid": invalid,
+        "word_hist": np.bincount(np.minimum(words, LENGTH_CAP), minlength=LENGTH_CAP + 1),
+        "token_hist": np.bincount(np.minimum(tokens, LENGTH_CAP), minlength=LENGTH_CAP + 1),
+        "word_sum": int(words.sum()),
+        "token_sum": int(tokens.sum()),
+        "word_max": int(words.max()) if len(words) else 0,
+        "token_max": int(tokens.max()) if len(tokens) else 0,
+        "vocab": vocab.registers,
+        "docs": docs.registers,
+    }
+
+
+def _merge(parts):
+    total = dict(parts[0])
+    for part in parts[1:]:
+        for key in ("n_docs", "empty", "invalid", "word_sum", "token_sum"):
+            total[key] += part[key]
+        for key in ("word_max", "token_max"):
+            total[key] = max(total[key], part[key])
+        for key in ("word_hist", "token_hist"):
+            total[key] = total[key] + part[key]
+        for key in ("vocab", "docs"):
+            total[key] = np.maximum(total[key], part[key])
+    return total
+
+
+def _quantile(hist, q):
+    cdf = np.cumsum(hist)
+    return int(np.searchsorted(cdf, q * cdf[-1])) if cdf[-1] else 0
+
+
+def _distribution(hist, total, max_value):
+    n = int(hist.sum())
+    return {
+        "mean": round(total / n, 2) if n else 0.0,
+        "p50": _quantile(hist, 0.5),
+        "p90": _quantile(hist, 0.9),
+        "p95": _quantile(hist, 0.95),
+        "p99": _quantile(hist, 0.99),
+        "max": max_value,
+    }
+
+
+def plan_batches(token_hist):
+    """
+    Truncation length, batch size and padding strategy from the token-length histogram.
+    The truncation length is the smallest standard length that keeps COVERAGE of the
+    documents whole; the batch size fills TOKENS_PER_BATCH at that length. Padding waste
+    (share of pad tokens) is reported for padding to max_length, dynamic padding of random
+    batches (expected batch max from the CDF) and batches of length-sorted documents.
+    """
+    lengths = np.arange(len(token_hist)) + SPECIAL_TOKENS
+    n = int(token_hist.sum())
+    if not n:
+        return None
+    cdf = np.cumsum(token_hist) / n
+    truncate = MODEL_MAX_TOKENS
+    for choice in TRUNCATE_CHOICES:
+        if cdf[min(choice - SPECIAL_TOKENS, len(cdf) - 1)] >= COVERAGE:
+            truncate = choice
+            break
+    coverage = float(cdf[min(truncate - SPECIAL_TOKENS, len(cdf) - 1)])
+    batch = max(1, min(MAX_BATCH, 1 << int(math.log2(max(1, TOKENS_PER_BATCH // truncate)))))
+
+    clipped = np.minimum(lengths, truncate)
+    # Histogram of sequence lengths after truncation, indexed by length 0..truncate
+    seq_hist = np.bincount(clipped, weights=token_hist, minlength=truncate + 1)
+    mean_len = float((np.arange(truncate + 1) * seq_hist).sum() / n)
+    seq_cdf = np.cumsum(seq_hist) / n
+    # E[max of `batch` lengths] = sum over l >= 1 of P(max >= l) = sum of 1 - F(l - 1)^batch
+    expected_max = float(np.sum(1.0 - seq_cdf[:-1] ** batch))
+    ordered = np.repeat(np.arange(truncate + 1), seq_hist.astype(np.int64))
+    pad = (-len(ordered)) % batch
+    blocks = np.concatenate([ordered, np.zeros(pad, dtype=ordered.dtype)]).reshape(-1, batch)
+    bucketed_tokens = float(blocks.max(axis=1).sum() * batch)
+    waste = {
+        "fixed": round(1 - mean_len / truncate, 3),
+        "dynamic": round(1 - mean_len / expected_max, 3) if expected_max else 0.0,
+        "bucketed": round(float(1 - ordered.sum() / bucketed_tokens), 3) if bucketed_tokens else 0.0,
+    }
+    # Length bucketing costs some shuffling randomness; only worth it when it saves a lot
+    strategy = "length_bucketing" if waste["dynamic"] - waste["bucketed"] > 0.1 else "dynamic"
+    return {
+        "truncate_tokens": truncate,
+        "truncation_coverage": round(coverage, 4),
+        "batch_size": batch,
+        "padding": {"strategy": strategy, "waste": waste},
+    }
+
+
+def profile_text(path, fields=None, workers=None, shard_bytes=SHARD_BYTES):
+    """
+    Profile every document in a text (one per line) or JSONL file (the given string fields,
+    see text_fields). Large files are sharded across up to `workers` processes.
+    Returns None when there is nothing to profile.
+    """
+    if fields is not None and not fields:
+        return None
+    size = os.path.getsize(path)
+    workers = max(1, workers or os.cpu_count() or 1)
+    n_shards = max(1, math.ceil(size / shard_bytes))
+    shards = _shards(path, n_shards) or [(0, 0)]
+    if workers == 1 or len(shards) == 1:
+        parts = [_profile_shard(path, start, end, fields) for start, end in shards]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as pool:
+            parts = list(pool.map(_profile_shard, *zip(*((path, s, e, fields) for s, e in shards))))
+    total = _merge(parts)
+    non_empty = total["n_docs"] - total["empty"]
+    if not non_empty:
+        return None
+    distinct = min(HyperLogLog(DOC_SKETCH_P, total["docs"]).count(), non_empty)
+    profile = {
+        "n_docs": total["n_docs"],
+        "empty_docs": total["empty"],
+        "invalid_lines": total["invalid"],
+        "fields": fields,
+        "words": _distribution(total["word_hist"], total["word_sum"], total["word_max"]),
+        "tokens": _distribution(total["token_hist"], total["token_sum"], total["token_max"]),
+        "vocab_size": HyperLogLog(registers=total["vocab"]).count(),
+        "distinct_docs": distinct,
+        "duplicate_rate": round(1 - distinct / non_empty, 4),
+        "shards": len(shards),
+    }
+    profile.update(plan_batches(total["token_hist"]))
+    return profile
@@ -1,10 +1,24 @@
 from zero_shot_theory_generator.config.settings import GEMINI_API_KEY
 import google.generativeai as genai
 
+GEMINI_MODEL = "gemini-1.5-flash"
+
 if GEMINI_API_KEY:
     genai.configure(api_key=GEMINI_API_KEY)
 
-def generate_theory(meta, task, pipeline):
+def create_model():
+    """Create the Gemini model client; callers may keep it around and pass it back in."""
+    return genai.GenerativeModel(GEMINI_MODEL)
+
+def llm_failed(theory):
+    """True when the theory's LLM part is an error message instead of an answer."""
+    return str(theory.get("llm", "")).startswith("Gemini LLM error")
+
+def generate_theory(meta, task, pipeline, model=None, seed=None):
+    """
+    Combine rule-based theories with Gemini insights.
+    A seed asks for a fresh sampled answer (used by "Iterate"); None keeps default sampling.
+    """
     base_theories = []
 
     # Add task-specific base theories
@@ -22,12 +36,13 @@ def generate_theory(meta, task, pipeline):
         base_theories.append("Seasonal patterns require specialized decomposition techniques.")
         base_theories.append("Feature engineering (lags, rolling statistics) often improves forecasting accuracy.")
     
-    # Generate detailed theory with LLM if API key is available
-    if not GEMINI_API_KEY:
+    # Generate detailed theory with LLM if API key is available (or a client was injected)
+    if model is None and not GEMINI_API_KEY:
         return {"rules": base_theories, "llm": "Gemini LLM error: GOOGLE_API_KEY not set. Please set it in your .env file."}
 
     try:
-        model = genai.GenerativeModel("gemini-1.5-flash")
+        if model is None:
+            model = create_model()
         
         # Customize prompt based on task type
         task_type = task.get("task", "unknown")
@@ -47,7 +62,11 @@ def generate_theory(meta, task, pipeline):
                 "Suggest 3 scientific insights. Format your answer in Markdown with clear sections."
             )
             
-        response = model.generate_content(prompt)
+        if seed is not None:
+            prompt += f"\nThis is iteration #{seed}: offer perspectives that differ from earlier iterations."
+            response = model.generate_content(prompt, generation_config={"temperature": 1.0})
+        else:
+            response = model.generate_content(prompt)
         llm_theory = response.text if hasattr(response, "text") else str(response)
         llm_theory = llm_theory.replace("\n\n", "\n").strip()
         return {"rules": base_theories, "llm": llm_theory}
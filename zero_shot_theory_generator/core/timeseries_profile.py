@@ -0,0 +1,337 @@
+"""
+Full-series time-series profiling: sampling frequency, gaps and dominant seasonal periods.
+
+The file is streamed in chunks; the time column is parsed once per chunk with the
+format inferred from the first chunk, and rows are binned straight onto a regular time
+grid whose resolution halves whenever the span outgrows a fixed number of points, so
+memory stays bounded (MAX_CELLS in total, however many columns). Periodograms and autocorrelations of every numeric column come
+from batched FFTs over groups of columns (Wiener-Khinchin), so the analysis is O(n log n).
+"""
+import numpy as np
+import pandas as pd
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    from pandas.core.tools.datetimes import guess_datetime_format
+
+# Grid cells kept in memory per column; longer series are block-averaged by 2 until they fit
+MAX_POINTS = 1 << 20
+# ... and over all columns (sums and counts take 16 bytes per cell), so wide files get coarser grids
+MAX_CELLS = 1 << 23
+MIN_POINTS = 1 << 12
+# Columns per batched FFT are chosen so the padded transform stays around this many values
+FFT_CELLS = 1 << 24
+CHUNK_ROWS = 200_000
+# A period must explain at least this share of the detrended variance ...
+MIN_POWER_SHARE = 0.02
+# ... and the series must correlate with itself at that lag at least this much
+MIN_ACF = 0.2
+
+# (seconds, pandas offset alias, default horizon in steps)
+_FREQUENCIES = [
+    (1, "s", 60), (60, "min", 60), (3600, "h", 24), (86400, "D", 7), (7 * 86400, "W", 4),
+    (30.44 * 86400, "MS", 12), (91.31 * 86400, "QS", 4), (365.25 * 86400, "YS", 3),
+]
+_UNITS = [(365.25 * 86400, "year"), (30.44 * 86400, "month"), (7 * 86400, "week"), (86400, "day"),
+          (3600, "hour"), (60, "minute"), (1, "second")]
+
+
+def _frequency(step_sec):
+    """Closest (nominal seconds, pandas offset alias, default horizon) within 10%, else None."""
+    for freq in _FREQUENCIES:
+        if abs(step_sec - freq[0]) <= 0.1 * freq[0]:
+            return freq
+    return None
+
+
+def describe_duration(seconds):
+    for size, unit in _UNITS:
+        if seconds >= size * 0.95:
+            text = f"{seconds / size:.1f}".rstrip("0").rstrip(".")
+            return f"{text} {unit}{'' if text == '1' else 's'}"
+    return f"{seconds:.3g} seconds"
+
+
+def _as_str(values):
+    """Values as strings like read_csv(dtype=str) gives them: 7 stays "7" even in a float column, missing stays NaN."""
+    present = values.notna()
+    if pd.api.types.is_float_dtype(values) and (values[present] % 1 == 0).all():
+        values = values.astype("Int64")
+    return values.astype(object).astype(str).where(present)
+
+
+def read_chunks(path, columns, chunksize=CHUNK_ROWS, **kwargs):
+    """
+    DataFrame chunks of the given columns from a CSV, TSV or JSONL file (kwargs go to read_csv).
+    A dtype of str for a column is honoured for JSONL too, with ids that JSON parsing turned
+    into floats (chunks with missing values) written the way read_csv would read them.
+    """
+    if path.endswith(".jsonl"):
+        as_str = [c for c, t in (kwargs.get("dtype") or {}).items() if t is str]
+        for chunk in pd.read_json(path, lines=True, chunksize=chunksize):
+            chunk = chunk[[c for c in columns if c in chunk.columns]]
+            for c in as_str:
+                if c in chunk.columns:
+                    chunk[c] = _as_str(chunk[c])
+            yield chunk
+        return
+    sep = "\t" if path.endswith(".tsv") else ","
+    yield from pd.read_csv(path, sep=sep, usecols=columns, chunksize=chunksize, **kwargs)
+
+
+class _SeriesGrid:
+    """
+    Streaming accumulator of a series on a regular time grid. Rows are binned into cells of
+    `stride` base steps (sums and counts per column), so duplicates are averaged and memory
+    stays at max_points cells: when the span outgrows it, adjacent cells are merged and the
+    stride doubles (block averaging, which also low-pass filters before downsampling).
+    """
+
+    def __init__(self, t0, step, n_cols, max_points):
+        self.t0, self.step, self.max_points = t0, step, max_points
+        self.stride = 1
+        self.base = 0  # cell number of the first array row (negative once earlier times show up)
+        self.sums = np.zeros((0, n_cols))
+        self.counts = np.zeros((0, n_cols))
+        self.rows = np.zeros(0, dtype=np.int64)
+
+    @property
+    def end(self):
+        return self.base + len(self.rows)
+
+    def _extend(self, lo, hi):
+        """Pad the arrays so cells lo..hi-1 are covered."""
+        before, after = max(self.base - lo, 0), max(hi - self.end, 0)
+        if before or after:
+            self.sums = np.pad(self.sums, ((before, after), (0, 0)))
+            self.counts = np.pad(self.counts, ((before, after), (0, 0)))
+            self.rows = np.pad(self.rows, (before, after))
+            self.base -= before
+
+    def _merge(self):
+        # Align to even cell numbers so cells 2c and 2c+1 become cell c
+        self._extend(self.base - self.base % 2, self.end + self.end % 2)
+        self.sums = self.sums[0::2] + self.sums[1::2]
+        self.counts = self.counts[0::2] + self.counts[1::2]
+        self.rows = self.rows[0::2] + self.rows[1::2]
+        self.base //= 2
+        self.stride *= 2
+
+    def add(self, t, values):
+        steps = np.rint((t - self.t0) / self.step).astype(np.int64)
+        while True:
+            cells = steps // self.stride
+            lo = min(int(cells.min()), self.base) if len(self.rows) else int(cells.min())
+            hi = max(int(cells.max()) + 1, self.end) if len(self.rows) else int(cells.max()) + 1
+            if hi - lo <= self.max_points:
+                break
+            self._merge()
+        if not len(self.rows):
+            self.base = lo
+        self._extend(lo, hi)
+        pos = cells - self.base
+        finite = np.isfinite(values)
+        np.add.at(self.sums, pos, np.where(finite, values, 0.0))
+        np.add.at(self.counts, pos, finite)
+        np.add.at(self.rows, pos, 1)
+
+    def values(self):
+        """Mean per cell, with empty cells linearly interpolated."""
+        grid = np.full(self.sums.shape, np.nan)
+        np.divide(self.sums, self.counts, out=grid, where=self.counts > 0)
+        x = np.arange(len(grid))
+        for j in range(grid.shape[1]):
+            ok = np.isfinite(grid[:, j])
+            if ok.sum() >= 2 and not ok.all():
+                grid[:, j] = np.interp(x, x[ok], grid[ok, j])
+        return grid
+
+
+def read_series(path, time_col, value_cols, max_points=MAX_POINTS):
+    """
+    Stream a delimited or JSONL file onto a regular time grid. The base step is the median
+    positive spacing of the first chunk's timestamps, snapped to the calendar frequency it
+    is within 10% of (so months and quarters of uneven length line up). Returns (grid, stats),
+    or (None, None) when fewer than 8 timestamps parse; stats holds row counts, the step and
+    stride, ordering, and gap figures (exact for time-sorted files, at grid resolution otherwise).
+    """
+    # The cell budget is shared by the columns
+    max_points = max(MIN_POINTS, min(max_points, MAX_CELLS // max(len(value_cols), 1)))
+    fmt = acc = last = None
+    stats = {"n_rows": 0, "n_timestamps": 0, "is_sorted": True, "n_gaps": 0, "missing_points": 0,
+             "largest_gap_ns": 0, "duplicate_timestamps": 0, "start": None, "end": None}
+    for chunk in read_chunks(path, [time_col] + value_cols):
+        stats["n_rows"] += len(chunk)
+        raw = chunk[time_col]
+        if fmt is None:
+            first = raw.dropna()
+            fmt = (guess_datetime_format(str(first.iloc[0])) if len(first) else None) or "mixed"
+        parsed = pd.to_datetime(raw, format=fmt, errors="coerce")
+        ok = ~parsed.isna().to_numpy()
+        if not ok.any():
+            continue
+        t = parsed.to_numpy(dtype="datetime64[ns]").view("int64")[ok]
+        v = chunk.loc[ok, value_cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+        if acc is None:
+            spacing = np.diff(np.unique(t))
+            if not len(spacing):
+                continue
+            step = float(np.median(spacing))
+            nominal = _frequency(step / 1e9)
+            acc = _SeriesGrid(int(t.min()), nominal[0] * 1e9 if nominal else step, len(value_cols), max_points)
+        stats["n_timestamps"] += len(t)
+        stats["start"] = int(t.min()) if stats["start"] is None else min(stats["start"], int(t.min()))
+        stats["end"] = int(t.max()) if stats["end"] is None else max(stats["end"], int(t.max()))
+        # Gaps between consecutive rows (across the chunk boundary too) while the file is sorted
+        deltas = np.diff(t if last is None else np.concatenate(([last], t)))
+        last = int(t[-1])
+        if stats["is_sorted"] and (deltas < 0).any():
+            stats["is_sorted"] = False
+        if stats["is_sorted"] and len(deltas):
+            gaps = deltas[deltas > 1.5 * acc.step]
+            stats["n_gaps"] += len(gaps)
+            stats["missing_points"] += int(np.sum(np.rint(gaps / acc.step) - 1))
+            stats["largest_gap_ns"] = max(stats["largest_gap_ns"], int(deltas.max()))
+            stats["duplicate_timestamps"] += int(np.sum(deltas == 0))
+        acc.add(t, v)
+    if acc is None or stats["n_timestamps"] < 8:
+        return None, None
+    if not stats["is_sorted"]:
+        # Read gaps off the grid instead: runs of empty cells
+        empty = (acc.rows == 0).astype(np.int8)
+        edges = np.diff(np.concatenate(([0], empty, [0])))
+        runs = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+        stats["n_gaps"] = len(runs)
+        stats["missing_points"] = int(empty.sum()) * acc.stride
+        stats["largest_gap_ns"] = int(((runs.max() if len(runs) else 0) + 1) * acc.stride * acc.step)
+        # Rows sharing a cell are only duplicates at full resolution
+        stats["duplicate_timestamps"] = (int(stats["n_timestamps"] - np.count_nonzero(acc.rows))
+                                         if acc.stride == 1 else None)
+    stats["step"] = acc.step
+    stats["stride"] = acc.stride
+    return acc.values(), stats
+
+
+def spectral_periods(grid, top_k=3, min_period=2):
+    """
+    Per column: up to top_k dominant periods (in grid steps, at least min_period) with their
+    share of the detrended variance and autocorrelation at that lag. One rfft per batch of
+    columns (sized by FFT_CELLS), zero-padded to 2n so the inverse gives the linear (not
+    circular) autocorrelation.
+    """
+    n, k = grid.shape
+    results = [[] for _ in range(k)]
+    if n < 8:
+        return results
+    ok_cols = np.isfinite(grid).all(axis=0) & (np.nanstd(grid, axis=0) > 0)
+    if not ok_cols.any():
+        return results
+    y = grid[:, ok_cols]
+    # Remove the linear trend from every column at once
+    design = np.vstack([np.arange(n, dtype=np.float64), np.ones(n)]).T
+    coef, *_ = np.linalg.lstsq(design, y, rcond=None)
+    y = y - design @ coef
+    y /= y.std(axis=0)
+    nfft = 1 << int(np.ceil(np.log2(2 * n)))
+    freqs = np.fft.rfftfreq(nfft)
+    # Periods between 2 steps and n/2 steps (at least two full cycles)
+    band_idx = np.flatnonzero((freqs >= 2.0 / n) & (freqs <= 0.5))
+    cols = np.flatnonzero(ok_cols)
+    batch = max(1, FFT_CELLS // nfft)
+    for start in range(0, len(cols), batch):
+        power = np.abs(np.fft.rfft(y[:, start:start + batch], n=nfft, axis=0)) ** 2
+        acf = np.fft.irfft(power, n=nfft, axis=0)[:n]
+        acf /= acf[0]
+        power = power[band_idx]
+        for out_j, j in enumerate(cols[start:start + batch]):
+            results[j] = _column_periods(power[:, out_j], acf[:, out_j], freqs[band_idx], n, top_k, min_period)
+    return results
+
+
+def _column_periods(p, acf, freqs, n, top_k, min_period):
+    """Dominant periods of one column from its in-band periodogram p and autocorrelation acf."""
+    found = []
+    total = p.sum()
+    # Local maxima of the periodogram, strongest first
+    peaks = np.flatnonzero((p[1:-1] > p[:-2]) & (p[1:-1] >= p[2:])) + 1
+    peaks = peaks[np.argsort(p[peaks])[::-1]]
+    seen = set()
+    for peak in peaks:
+        share = float(p[peak] / total)
+        if share < MIN_POWER_SHARE:
+            break
+        period = int(round(1.0 / freqs[peak]))
+        if period in seen or not min_period <= period < n // 2:
+            continue
+        # The spectrum resolves a period only to about period^2 / n steps;
+        # refine within that window on the autocorrelation
+        width = int(np.ceil(period * period / n))
+        lo, hi = max(min_period, period - width), min(n // 2 - 1, period + width)
+        lag = lo + int(np.argmax(acf[lo:hi + 1]))
+        strength = float(acf[lag])
+        if strength < MIN_ACF or lag in seen:
+            continue
+        seen.update((period, lag))
+        found.append({"period": lag, "power_share": round(share, 4), "acf": round(strength, 4)})
+        if len(found) == top_k:
+            break
+    return found
+
+
+def profile_timeseries(path, time_col, value_cols, target=None, max_points=MAX_POINTS):
+    """
+    Profile the full series in path. Returns None if the file format is not streamable
+    or fewer than 8 timestamps parse, else a dict with frequency, gaps, per-column
+    dominant periods, the consensus seasonal period and a forecast horizon. Periods and
+    the horizon are counted in base steps (the sampling interval of the data).
+    """
+    if not path.endswith((".csv", ".tsv", ".jsonl", ".txt")):
+        return None
+    value_cols = [c for c in value_cols if c != time_col]
+    grid, stats = read_series(path, time_col, value_cols, max_points)
+    if grid is None:
+        return None
+    step_sec = stats["step"] / 1e9
+    stride = stats["stride"]
+    _, alias, default_horizon = _frequency(step_sec) or (None, None, None)
+
+    # Block averaging does not fully remove periods shorter than a few cells; on a
+    # decimated grid they can alias into spurious long ones, so only trust 8+ cells
+    found_periods = spectral_periods(grid, min_period=2 if stride == 1 else 8)
+    columns = {}
+    for col, found in zip(value_cols, found_periods):
+        columns[col] = [dict(p, period=p["period"] * stride,
+                             duration=describe_duration(p["period"] * stride * step_sec)) for p in found]
+
+    # Consensus period: the target's strongest, else the one found in most columns
+    votes = {}
+    for col, found in columns.items():
+        for rank, p in enumerate(found):
+            votes[p["period"]] = votes.get(p["period"], 0) + (3 if col == target else 1) / (rank + 1)
+    seasonal = sorted(votes, key=votes.get, reverse=True)
+    seasonal_period = seasonal[0] if seasonal else None
+    n_points = len(grid) * stride
+    horizon = seasonal_period or default_horizon or n_points // 20
+    horizon = int(max(1, min(horizon, n_points // 10)))
+
+    return {
+        "time_col": time_col,
+        "n_rows": stats["n_rows"],
+        "n_points": n_points,
+        "sampled_every": stride,
+        "start": str(pd.Timestamp(stats["start"])),
+        "end": str(pd.Timestamp(stats["end"])),
+        "is_sorted": stats["is_sorted"],
+        "frequency": alias,
+        "step": describe_duration(step_sec),
+        "n_gaps": stats["n_gaps"],
+        "missing_points": stats["missing_points"],
+        "largest_gap": describe_duration(stats["largest_gap_ns"] / 1e9),
+        "duplicate_timestamps": stats["duplicate_timestamps"],
+        "seasonal_period": seasonal_period,
+        "seasonal_periods": seasonal[:3],
+        "seasonal_duration": describe_duration(seasonal_period * step_sec) if seasonal_period else None,
+        "forecast_horizon": horizon,
+        "columns": columns,
+    }
@@ -3,126 +3,23 @@ import os
 import sys
 import time
 from zero_shot_theory_generator.config.settings import OUTPUT_DIR
-from zero_shot_theory_generator.utils.file_utils import load_dataset_path
-from zero_shot_theory_generator.core.dataset_loader import detect_dataset
-from zero_shot_theory_generator.core.task_inference import infer_task
-from zero_shot_theory_generator.core.pipeline_suggester import suggest_pipeline
-from zero_shot_theory_generator.core.theory_generator import generate_theory
-from zero_shot_theory_generator.core.explainability import explain_pipeline
-from zero_shot_theory_generator.utils.logger import log_output
-
-def paradigm_and_strategy(task, meta):
-    paradigm = "Unknown"
-    strategy = []
-    if task["task"] in ["classification", "regression", "image_classification", "text_classification"]:
-        paradigm = "Supervised Learning"
-        n_rows = meta.get("n_rows", 100)
-        batch_size = min(64, max(8, n_rows // 10))
-        epochs = 10 if n_rows < 1000 else 50
-        split = "80% train / 20% test" if n_rows > 50 else "Leave-one-out"
-        cross_val = "5-fold" if n_rows > 200 else "3-fold"
-        optimizer = "Adam" if task["task"] in ["classification", "image_classification", "text_classification"] else "SGD"
-        early_stopping = "Yes" if n_rows > 100 else "No"
-        strategy = [
-            f"Split: {split}",
-            f"Cross-validation: {cross_val}",
-            f"Epochs: {epochs}",
-            f"Batch size: {batch_size}",
-            f"Optimizer: {optimizer}",
-            f"Early stopping: {early_stopping}"
-        ]
-    elif task["task"] == "unsupervised":
-        paradigm = "Unsupervised Learning"
-        n_cols = len(meta.get("columns", []))
-        clustering = "K-means" if n_cols < 10 else "DBSCAN"
-        dim_red = "PCA" if n_cols < 20 else "t-SNE"
-        association = "Apriori" if n_cols > 2 else "None"
-        strategy = [
-            f"Clustering: {clustering}",
-            f"Dimensionality Reduction: {dim_red}",
-            f"Association Rule Mining: {association}"
-        ]
-    else:
-        paradigm = "Unknown/Other"
-        strategy = ["Custom analysis required"]
-    return paradigm, strategy
-
-def format_output(meta, task, pipeline, theory):
-    dataset_md = f"## 📊 Dataset\n"
-    if meta.get("type") == "image_folder":
-        dataset_md += f"**Type:** Image Folder\n**Classes:** {meta.get('classes', [])}\n"
-    elif meta.get("type") == "tabular":
-        cols = meta.get("columns", [])
-        dataset_md += f"**Type:** Tabular\n**Columns:** {', '.join([c['name'] for c in cols])}\n"
-    elif meta.get("type") == "text":
-        dataset_md += f"**Type:** Text\n**Sample:**\n```\n{''.join(meta.get('sample', []))}\n```\n"
-    elif meta.get("type", "").startswith("json"):
-        dataset_md += f"**Type:** JSON\n**Keys:** {meta.get('keys', [])}\n"
-    else:
-        dataset_md += f"**Type:** {meta.get('type')}\n"
-
-    task_md = f"## 🎯 Task\n"
-    for k, v in task.items():
-        task_md += f"- **{k.capitalize()}**: {v}\n"
-
-    pipeline_md = "## 🛠️ Pipeline Suggestion\n"
-    if isinstance(pipeline, dict):
-        for k, v in pipeline.items():
-            pipeline_md += f"- **{k.capitalize()}**: {v}\n"
-    else:
-        pipeline_md += f"{pipeline}\n"
-
-    paradigm, strategy = paradigm_and_strategy(task, meta)
-    strategy_md = f"## 🌍 ML Paradigm & Training Strategy\n**Paradigm:** {paradigm}\n**Recommended Strategy:**\n"
-    for s in strategy:
-        strategy_md += f"- {s}\n"
-
-    explain_md = "## 🔍 Explainability\n"
-    model_name = pipeline.get("model") if isinstance(pipeline, dict) else None
-    explain_md += explain_pipeline(model_name) + "\n"
-
-    theory_md = "## 🧪 Scientific Theory Insights\n"
-    rules = theory.get("rules", [])
-    if rules:
-        for r in rules:
-            theory_md += f"- {r}\n"
-    llm = theory.get("llm", "")
-    if llm:
-        theory_md += f"\n**LLM Insights:**\n{llm}\n"
-
-    return f"# 🧠 Zero-Shot AI Theory Generator\n\n{dataset_md}\n{task_md}\n{pipeline_md}\n{strategy_md}\n{explain_md}\n{theory_md}"
+from zero_shot_theory_generator.core.engine import get_engine
+from zero_shot_theory_generator.core.cost_model import make_budget
+from zero_shot_theory_generator.utils.tracing import write_chrome_trace
+# format_output and paradigm_and_strategy are re-exported for existing callers of main
+from zero_shot_theory_generator.core.report_formatter import format_output, paradigm_and_strategy
 
 def print_live(text, delay=0.01):
     for line in text.splitlines():
         print(line)
         time.sleep(delay)
 
+def build_report(path_or_file):
+    """Run the full analysis pipeline and return (report, output_md, status_msg)."""
+    return get_engine().analyze(path_or_file)
+
 def analyze(path_or_file):
-    try:
-        if hasattr(path_or_file, "name"):
-            local_path = path_or_file.name
-        else:
-            local_path = path_or_file
-        os.makedirs(os.path.join(OUTPUT_DIR, "reports"), exist_ok=True)
-        dataset_path = load_dataset_path(local_path)
-        meta = detect_dataset(dataset_path)
-        task = infer_task(meta)
-        pipeline = suggest_pipeline(task, meta)
-        theory = generate_theory(meta, task, pipeline)
-        report = {
-            "metadata": meta,
-            "task": task,
-            "pipeline": pipeline,
-            "theory": theory
-        }
-        log_output(report)
-        status_msg = f"Report saved to {os.path.join(OUTPUT_DIR, 'reports')}/"
-        if "GOOGLE_API_KEY not set" in str(theory.get("llm", "")):
-            status_msg += " [Gemini API key missing!]"
-        output_md = format_output(meta, task, pipeline, theory)
-        return output_md, status_msg
-    except Exception as e:
-        return f"**Error:** {str(e)}", f"Error: {str(e)}"
+    return get_engine().analyze_markdown(path_or_file)
 
 def main():
     parser = argparse.ArgumentParser(description="Zero-Shot Theory Generator")
@@ -130,7 +27,41 @@ def main():
                         help="Input mode: file, url, or both (interactive)")
     parser.add_argument("--path", type=str, help="Local dataset path")
     parser.add_argument("--url", type=str, help="Dataset URL")
+    parser.add_argument("--trace", action="store_true",
+                        help="Record per-stage timing/memory spans and write a Chrome trace JSON")
+    parser.add_argument("--cores", type=int, help="Training budget: CPU cores (default: this machine)")
+    parser.add_argument("--ram-gb", type=float, help="Training budget: RAM in GB (default: this machine)")
+    parser.add_argument("--max-minutes", type=float, help="Training budget: minutes per model fit")
+    parser.add_argument("--evaluate", type=float, metavar="SECONDS",
+                        help="Validate the suggested pipeline with quick CPU baselines within SECONDS")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Keep a whole-file profile checkpoint so re-runs only read appended bytes")
+    parser.add_argument("--watch", type=str, metavar="DIR",
+                        help="Keep analyzing new or changed datasets landing in DIR (see service/watcher.py)")
+    parser.add_argument("--workers", type=int,
+                        help="With --watch: analysis worker processes (default: CPU count)")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Keep the pipeline loaded and serve analyses on a Unix socket (see service/client.py)")
     args = parser.parse_args()
+    engine_options = {}
+    if args.evaluate:
+        engine_options["eval_seconds"] = args.evaluate
+    if args.incremental:
+        engine_options["incremental_profile"] = True
+    if args.cores or args.ram_gb or args.max_minutes:
+        engine_options["budget"] = make_budget(args.cores, args.ram_gb, args.max_minutes)
+    if args.watch:
+        # Each worker process builds its own engine, so the options travel with the pool
+        from zero_shot_theory_generator.service.watcher import watch
+        watch(args.watch, workers=args.workers, engine_options=engine_options)
+        return
+    for name, value in engine_options.items():
+        setattr(get_engine(), name, value)
+    if args.daemon:
+        # After the engine options above, so they apply to every request the daemon serves
+        from zero_shot_theory_generator.service.daemon import serve
+        serve()
+        return
 
     # Switch-case for input mode
     match args.mode:
@@ -160,7 +91,19 @@ def main():
             sys.exit(1)
 
     print("\nAnalyzing dataset... Please wait.\n")
-    output_md, status_msg = analyze(input_source)
+    if args.trace:
+        engine = get_engine()
+        engine.tracing = True
+        try:
+            report, output_md, status_msg = engine.analyze(input_source)
+        except Exception as e:
+            output_md, status_msg = f"**Error:** {str(e)}", f"Error: {str(e)}"
+        else:
+            trace_path = os.path.join(OUTPUT_DIR, "traces", f"trace_{int(time.time())}.json")
+            write_chrome_trace(report["spans"], trace_path)
+            status_msg += f"\nChrome trace saved to {trace_path}"
+    else:
+        output_md, status_msg = analyze(input_source)
     print_live(output_md, delay=0.01)
     print(f"\n{status_msg}")
 
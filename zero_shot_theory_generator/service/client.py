@@ -0,0 +1,95 @@
+"""
+Thin client of the analysis daemon (service/daemon.py). It only imports the standard library
+and the settings, so a call costs the interpreter start plus the analysis itself:
+
+    python -m zero_shot_theory_generator.service.client --path data.csv
+    for f in data/*.csv; do python -m zero_shot_theory_generator.service.client --path "$f" --json; done
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+from zero_shot_theory_generator.config.settings import DAEMON_SOCKET
+
+
+class DaemonUnavailableError(Exception):
+    """Raised when no daemon is listening on the socket."""
+
+
+def request(payload, socket_path=DAEMON_SOCKET, timeout=None):
+    """Send one request to the daemon and yield its event dicts as they arrive."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError) as e:
+        sock.close()
+        raise DaemonUnavailableError(f"No analysis daemon on {socket_path} ({e.strerror}); "
+                                     f"start one with: python -m zero_shot_theory_generator.service.daemon")
+    with sock, sock.makefile("rb") as events:
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        for line in events:
+            yield json.loads(line)
+
+
+def analyze(source, socket_path=DAEMON_SOCKET, fmt="markdown", seed=None, on_provisional=None, timeout=None):
+    """
+    Analyze source on the daemon and return its result event ("markdown" or "report", plus
+    "status_msg" and "elapsed_sec"). Local paths are made absolute, as the daemon has its own
+    working directory. Raises RuntimeError when the analysis fails.
+    """
+    if os.path.exists(source):
+        source = os.path.abspath(source)
+    payload = {"op": "analyze", "source": source, "format": fmt, "seed": seed,
+               "provisional": on_provisional is not None}
+    for event in request(payload, socket_path, timeout):
+        if event["event"] == "provisional":
+            on_provisional(event["markdown"])
+        elif event["event"] == "error":
+            raise RuntimeError(event["error"])
+        elif event["event"] == "result":
+            return event
+    raise RuntimeError("Daemon closed the connection without a result")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a dataset on the running analysis daemon")
+    parser.add_argument("--path", type=str, help="Local dataset path")
+    parser.add_argument("--url", type=str, help="Dataset URL")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON instead of markdown")
+    parser.add_argument("--seed", type=int, default=None, help="Re-query the LLM with a new seed")
+    parser.add_argument("--provisional", action="store_true",
+                        help="Print the provisional report of a URL that is still downloading to stderr")
+    parser.add_argument("--socket", type=str, default=DAEMON_SOCKET)
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds to wait for the daemon")
+    parser.add_argument("--ping", action="store_true", help="Check that the daemon is up")
+    parser.add_argument("--stop", action="store_true", help="Stop the daemon")
+    args = parser.parse_args()
+
+    try:
+        if args.ping or args.stop:
+            for event in request({"op": "ping" if args.ping else "shutdown"}, args.socket, args.timeout):
+                print(json.dumps(event))
+            return
+        source = args.path or args.url
+        if not source:
+            parser.error("Please provide --path or --url")
+        on_provisional = (lambda md: print(md, file=sys.stderr, flush=True)) if args.provisional else None
+        result = analyze(source, args.socket, "json" if args.json else "markdown", args.seed, on_provisional,
+                         args.timeout)
+    except DaemonUnavailableError as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        sys.exit(2)
+    except (RuntimeError, OSError) as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        sys.exit(1)
+    if args.json:
+        print(json.dumps(result["report"], indent=2))
+    else:
+        print(result["markdown"])
+    print(f"{result['status_msg']} ({result['elapsed_sec']}s on the daemon)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from zero_shot_theory_generator.config.settings import DAEMON_SOCKET
+from zero_shot_theory_generator.core.engine import get_engine
+from zero_shot_theory_generator.core.tabular_meta import json_default
+
+# Longest request line accepted (a source path or URL plus a few options)
+MAX_REQUEST_BYTES = 64 << 10
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """
+    One JSON request line per connection, answered with JSON event lines:
+      {"op": "analyze", "source": ..., "format": "markdown" | "json", "seed": ..., "provisional": bool}
+        -> {"event": "provisional", "markdown"} while a URL is still downloading (if asked),
+           then {"event": "result", "markdown" | "report", "status_msg", "elapsed_sec"}
+           or {"event": "error", "error"}
+      {"op": "ping"}     -> {"event": "pong", "pid", "uptime_sec", "served"}
+      {"op": "shutdown"} -> {"event": "bye"}, then the daemon exits
+    """
+
+    def _send(self, payload):
+        self.wfile.write(json.dumps(payload, default=json_default).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+    def handle(self):
+        line = self.rfile.readline(MAX_REQUEST_BYTES)
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError:
+            request = None
+        if not isinstance(request, dict):
+            self._send({"event": "error", "error": "Request must be one line of JSON"})
+            return
+        op = request.get("op", "analyze")
+        try:
+            if op == "ping":
+                self._send({"event": "pong", "pid": os.getpid(),
+                            "uptime_sec": round(time.time() - self.server.started_at, 3),
+                            "served": self.server.served})
+            elif op == "shutdown":
+                self._send({"event": "bye"})
+                # shutdown() waits for serve_forever, which is blocked on this handler's thread otherwise
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            elif op == "analyze":
+                self._analyze(request)
+            else:
+                self._send({"event": "error", "error": f"Unknown op: {op}"})
+        except (BrokenPipeError, ConnectionResetError):
+            # Client went away (e.g. Ctrl-C); the analysis result is still in the report store
+            pass
+
+    def _analyze(self, request):
+        source = request.get("source")
+        if not source:
+            self._send({"event": "error", "error": "Request needs a 'source' (path or URL)"})
+            return
+        on_provisional = None
+        if request.get("provisional"):
+            def on_provisional(report):
+                try:
+                    self._send({"event": "provisional", "markdown": report["markdown"]})
+                except OSError:
+                    pass
+        started = time.time()
+        # The engine's memo cache and report store are shared, so analyses run one at a time
+        with self.server.engine_lock:
+            try:
+                report, output_md, status_msg = self.server.engine.analyze(
+                    source, seed=request.get("seed"), on_provisional=on_provisional)
+            except Exception as e:
+                self._send({"event": "error", "error": str(e)})
+                return
+            finally:
+                self.server.served += 1
+        result = {"event": "result", "status_msg": status_msg, "elapsed_sec": round(time.time() - started, 3)}
+        if request.get("format") == "json":
+            result["report"] = report
+        else:
+            result["markdown"] = output_md
+        self._send(result)
+
+
+class AnalysisDaemon(socketserver.ThreadingUnixStreamServer):
+    """Unix-socket server around the process-wide engine, so each request skips interpreter and import startup."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path=DAEMON_SOCKET):
+        self.socket_path = os.path.abspath(socket_path)
+        _claim_socket(self.socket_path)
+        self.engine = get_engine()
+        self.engine_lock = threading.Lock()
+        self.started_at = time.time()
+        self.served = 0
+        super().__init__(self.socket_path, DaemonRequestHandler)
+        # Only the owner may submit paths to analyze
+        os.chmod(self.socket_path, 0o600)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.remove(self.socket_path)
+        except OSError:
+            pass
+
+
+def _claim_socket(path):
+    """Remove a stale socket file left by a daemon that died; refuse if one is still answering."""
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.remove(path)
+        return
+    finally:
+        probe.close()
+    raise RuntimeError(f"An analysis daemon is already listening on {path}")
+
+
+def serve(socket_path=DAEMON_SOCKET):
+    daemon = AnalysisDaemon(socket_path)
+    print(f"[INFO] Analysis daemon listening on {daemon.socket_path} (pid {os.getpid()})")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.server_close()
+    print(f"[INFO] Daemon stopped after {daemon.served} analyses")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep the analysis pipeline loaded and serve it on a Unix socket")
+    parser.add_argument("--socket", type=str, default=DAEMON_SOCKET,
+                        help="Socket path (default: ZSTG_DAEMON_SOCKET or ui/outputs/daemon.sock)")
+    args = parser.parse_args()
+    serve(args.socket)
+
+
+if __name__ == "__main__":
+    main()
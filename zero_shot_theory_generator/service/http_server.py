@@ -0,0 +1,324 @@
+import argparse
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+from zero_shot_theory_generator.core.tabular_meta import json_default
+from zero_shot_theory_generator.utils.tracing import StageMetrics
+
+
+class JobFailedError(Exception):
+    """A failed job with the spans of the stages that ran, which survive the trip back from the worker."""
+
+    def __init__(self, message, spans=None):
+        super().__init__(message)
+        self.spans = spans
+
+    def __reduce__(self):
+        return type(self), (str(self), self.spans)
+
+
+def _run_job(source):
+    """Worker entry point: runs in a pool process so profiling never blocks the HTTP threads."""
+    # Imported lazily so every worker process pays the pandas/LLM import cost once, not per job
+    from zero_shot_theory_generator.core.engine import get_engine
+    started = time.time()
+    try:
+        report, output_md, status_msg = get_engine().analyze(source)
+    except Exception as e:
+        # Extra attributes of arbitrary exceptions are not reliably pickled
+        if getattr(e, "spans", None):
+            raise JobFailedError(str(e), e.spans) from e
+        raise
+    return {
+        "report": report,
+        "markdown": output_md,
+        "status_msg": status_msg,
+        "elapsed_sec": round(time.time() - started, 3)
+    }
+
+
+def _init_worker(engine_options):
+    """Pool initializer: apply the parent's engine options (e.g. eval_seconds, incremental_profile, budget)."""
+    if engine_options:
+        from zero_shot_theory_generator.core.engine import get_engine
+        engine = get_engine()
+        for name, value in engine_options.items():
+            setattr(engine, name, value)
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is saturated and the request should be retried later."""
+
+
+class PoolRestartedError(Exception):
+    """Raised when a worker crash broke the pool; it has been replaced and the request can be retried."""
+
+
+class JobManager:
+    """
+    Bounded job queue in front of a process pool. engine_options are set as attributes on
+    each worker's engine (every worker process builds its own).
+    """
+
+    def __init__(self, workers=None, queue_size=32, max_finished=1000, engine_options=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.capacity = self.workers + queue_size
+        self.max_finished = max_finished
+        self.engine_options = dict(engine_options or {})
+        self._executor = self._new_executor()
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._in_flight = 0
+        # Aggregated from the spans workers attach to reports (enable with ZSTG_TRACE=1)
+        self.metrics = StageMetrics()
+
+    def submit(self, source):
+        if not self._slots.acquire(blocking=False):
+            raise QueueFullError(f"Job queue is full ({self.capacity} jobs in flight)")
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "source": source,
+            "status": "queued",
+            "submitted_at": time.time(),
+            "finished_at": None,
+            "result": None,
+            "error": None,
+            "future": None,
+            "done": threading.Event()
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            self._in_flight += 1
+        try:
+            future = self._submit_job(source)
+        except Exception:
+            with self._lock:
+                self._jobs.pop(job_id, None)
+            self._release(job)
+            raise
+        job["future"] = future
+        future.add_done_callback(lambda f, job=job: self._finish(job, f))
+        return job
+
+    def _submit_job(self, source):
+        """Submit to the pool; a pool broken by a crashed worker is restarted and the job resubmitted once."""
+        executor = self._executor
+        try:
+            return executor.submit(_run_job, source)
+        except BrokenProcessPool:
+            self._restart(executor)
+        executor = self._executor
+        try:
+            return executor.submit(_run_job, source)
+        except BrokenProcessPool as e:
+            self._restart(executor)
+            raise PoolRestartedError("Worker processes keep dying; the worker pool was restarted") from e
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                   initargs=(self.engine_options,))
+
+    def _restart(self, broken):
+        """Replace a broken executor (once, however many requests noticed it)."""
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = self._new_executor()
+        print("[WARN] Worker pool was broken by a crashed worker and has been restarted")
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _finish(self, job, future):
+        try:
+            job["result"] = future.result()
+            job["status"] = "done"
+            self.metrics.observe(job["result"]["report"].get("spans"))
+        except Exception as e:
+            job["error"] = str(e)
+            job["status"] = "error"
+            # Spans up to the failing stage travel on the exception (see _run_job)
+            self.metrics.observe(getattr(e, "spans", None))
+        job["finished_at"] = time.time()
+        self._release(job)
+        job["done"].set()
+
+    def _release(self, job):
+        with self._lock:
+            self._in_flight -= 1
+            # Keep only the most recent finished jobs for polling
+            finished = [j for j in self._jobs.values() if j["finished_at"] is not None]
+            for old in finished[:max(0, len(finished) - self.max_finished)]:
+                self._jobs.pop(old["id"], None)
+        self._slots.release()
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job and job["status"] == "queued" and job["future"] is not None and job["future"].running():
+            job["status"] = "running"
+        return job
+
+    def wait(self, job, timeout=None):
+        if not job["done"].wait(timeout):
+            raise TimeoutError(f"Job {job['id']} still running after {timeout}s")
+        return job
+
+    def stats(self):
+        with self._lock:
+            in_flight = self._in_flight
+        return {"workers": self.workers, "capacity": self.capacity, "in_flight": in_flight}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def job_to_dict(job, include_result=True):
+    data = {
+        "job_id": job["id"],
+        "source": job["source"],
+        "status": job["status"],
+        "submitted_at": job["submitted_at"],
+        "finished_at": job["finished_at"]
+    }
+    if job["status"] == "done" and include_result:
+        data.update(job["result"])
+    elif job["status"] == "error":
+        data["error"] = job["error"]
+    return data
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """JSON endpoints:
+      GET  /health          - pool and queue status
+      GET  /metrics         - per-stage metrics in Prometheus text format
+      POST /analyze         - run synchronously and return the report
+      POST /jobs            - submit asynchronously, returns 202 with a job id
+      GET  /jobs/<job_id>   - poll an asynchronous job
+    """
+
+    manager = None
+    sync_timeout = 300
+    retry_after = 5
+
+    def _send_json(self, code, payload, headers=None):
+        body = json.dumps(payload, default=json_default).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_source(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            return None
+        if length < 0:
+            return None
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(payload, dict):
+            return None
+        return payload.get("path") or payload.get("url")
+
+    def _submit(self):
+        source = self._read_source()
+        if not source:
+            self._send_json(400, {"error": "Request body must be JSON with a 'path' or 'url' field"})
+            return None
+        try:
+            return self.manager.submit(source)
+        except QueueFullError as e:
+            self._send_json(429, {"error": str(e)}, headers={"Retry-After": str(self.retry_after)})
+            return None
+        except PoolRestartedError as e:
+            self._send_json(503, {"error": str(e)}, headers={"Retry-After": str(self.retry_after)})
+            return None
+
+    def do_GET(self):
+        route = urlparse(self.path).path.rstrip("/")
+        if route == "/health":
+            self._send_json(200, {"status": "ok", **self.manager.stats()})
+        elif route == "/metrics":
+            body = self.manager.metrics.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif route.startswith("/jobs/"):
+            job = self.manager.get(route[len("/jobs/"):])
+            if job is None:
+                self._send_json(404, {"error": "Unknown job id"})
+            else:
+                self._send_json(200, job_to_dict(job))
+        else:
+            self._send_json(404, {"error": f"Unknown endpoint: {route}"})
+
+    def do_POST(self):
+        route = urlparse(self.path).path.rstrip("/")
+        if route == "/jobs":
+            job = self._submit()
+            if job:
+                self._send_json(202, job_to_dict(job, include_result=False),
+                                headers={"Location": f"/jobs/{job['id']}"})
+        elif route == "/analyze":
+            job = self._submit()
+            if not job:
+                return
+            try:
+                self.manager.wait(job, timeout=self.sync_timeout)
+            except TimeoutError:
+                self._send_json(202, job_to_dict(job, include_result=False),
+                                headers={"Location": f"/jobs/{job['id']}"})
+                return
+            self._send_json(200 if job["status"] == "done" else 500, job_to_dict(job))
+        else:
+            self._send_json(404, {"error": f"Unknown endpoint: {route}"})
+
+    def log_message(self, format, *args):
+        print(f"[HTTP] {self.address_string()} - {format % args}")
+
+
+def serve(host="127.0.0.1", port=8080, workers=None, queue_size=32, sync_timeout=300):
+    manager = JobManager(workers=workers, queue_size=queue_size)
+    handler = type("Handler", (AnalysisRequestHandler,), {"manager": manager, "sync_timeout": sync_timeout})
+    server = ThreadingHTTPServer((host, port), handler)
+    print(f"[INFO] Analysis service listening on http://{host}:{port} "
+          f"({manager.workers} workers, {manager.capacity} job slots)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        manager.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zero-Shot Theory Generator HTTP service")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--queue-size", type=int, default=32,
+                        help="Jobs allowed to wait beyond the busy workers before returning 429")
+    parser.add_argument("--sync-timeout", type=float, default=300,
+                        help="Seconds /analyze waits before handing back a job id")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.queue_size, args.sync_timeout)
+
+
+if __name__ == "__main__":
+    main()
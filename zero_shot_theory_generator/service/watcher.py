@@ -0,0 +1,198 @@
+import argparse
+import os
+import threading
+import time
+from zero_shot_theory_generator.config.settings import OUTPUT_DIR
+from zero_shot_theory_generator.service.http_server import JobManager, PoolRestartedError, QueueFullError
+
+DATASET_EXTENSIONS = (".csv", ".tsv", ".xlsx", ".xls", ".json", ".jsonl", ".txt", ".zip")
+
+
+def scan(directory, recursive=True):
+    """{path: (size, mtime_ns)} of the dataset files under directory, one os.scandir pass per folder."""
+    index = {}
+    stack = [directory]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.name.startswith((".", "~$")):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            stack.append(entry.path)
+                    elif entry.name.lower().endswith(DATASET_EXTENSIONS):
+                        st = entry.stat()
+                        index[entry.path] = (st.st_size, st.st_mtime_ns)
+                except OSError:
+                    # Removed between listing and stat
+                    continue
+    return index
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class DirectoryWatcher:
+    """
+    Polls a drop directory and analyzes new or changed dataset files on a bounded JobManager.
+    A file is submitted once its size and mtime have not changed for `settle` seconds, so
+    partially written files are not picked up (temporary names like *.part or *.crdownload are
+    not dataset extensions, so files renamed on completion are only seen once complete).
+    Latency is measured from landing (the settled file's mtime, or the watcher start for files
+    that were already there) to the saved report.
+    """
+
+    def __init__(self, directory, manager, settle=2.0, interval=1.0, recursive=True, out_dir=None):
+        self.directory = os.path.abspath(directory)
+        self.manager = manager
+        self.settle = settle
+        self.interval = interval
+        self.recursive = recursive
+        self.out_dir = out_dir
+        self.started_at = time.time()
+        # Reentrant: a job that is already done runs its callback inside poll()
+        self._lock = threading.RLock()
+        # path -> {"sig", "since"}: seen but not yet stable
+        self._pending = {}
+        # path -> signature currently being analyzed / last analyzed
+        self._in_flight = {}
+        self._done = {}
+        self.latencies = []
+        self.errors = 0
+
+    def poll(self, now=None):
+        """Scan once, submit the files that settled; returns the number submitted."""
+        now = time.time() if now is None else now
+        index = scan(self.directory, self.recursive)
+        submitted = 0
+        with self._lock:
+            for path in list(self._pending):
+                if path not in index:
+                    del self._pending[path]
+            for path in list(self._done):
+                if path not in index:
+                    del self._done[path]
+            for path, sig in index.items():
+                if not sig[0] or self._done.get(path) == sig or path in self._in_flight:
+                    continue
+                pending = self._pending.get(path)
+                if pending is None or pending["sig"] != sig:
+                    self._pending[path] = {"sig": sig, "since": now}
+                    continue
+                if now - pending["since"] < self.settle:
+                    continue
+                try:
+                    job = self.manager.submit(path)
+                except (QueueFullError, PoolRestartedError):
+                    # Stays pending and is retried on the next poll
+                    break
+                del self._pending[path]
+                self._in_flight[path] = sig
+                landed_at = max(sig[1] / 1e9, self.started_at)
+                job["future"].add_done_callback(
+                    lambda f, job=job, path=path, sig=sig, landed_at=landed_at: self._finished(job, path, sig, landed_at))
+                submitted += 1
+        return submitted
+
+    def _finished(self, job, path, sig, landed_at):
+        # JobManager's own callback ran first, so status and result are already set
+        latency = time.time() - landed_at
+        name = os.path.relpath(path, self.directory)
+        with self._lock:
+            self._in_flight.pop(path, None)
+            self._done[path] = sig
+            if job["status"] == "done":
+                self.latencies.append(latency)
+            else:
+                self.errors += 1
+        if job["status"] != "done":
+            print(f"[WARN] {name}: analysis failed: {job['error']}")
+            return
+        result = job["result"]
+        if self.out_dir:
+            md_path = os.path.join(self.out_dir, name.replace(os.sep, "__") + ".md")
+            try:
+                with open(md_path, "w", encoding="utf-8") as f:
+                    f.write(result["markdown"])
+            except OSError as e:
+                print(f"[WARN] {name}: could not write {md_path}: {e}")
+        print(f"[WATCH] {name}: {result['status_msg']} "
+              f"(landing to report {latency:.2f}s, analysis {result['elapsed_sec']}s)")
+
+    def busy(self):
+        with self._lock:
+            return bool(self._pending or self._in_flight)
+
+    def stats(self):
+        with self._lock:
+            latencies = list(self.latencies)
+            stats = {"analyzed": len(latencies), "errors": self.errors,
+                     "pending": len(self._pending), "in_flight": len(self._in_flight)}
+        if latencies:
+            stats.update({
+                "latency_p50_sec": round(_percentile(latencies, 0.5), 3),
+                "latency_p90_sec": round(_percentile(latencies, 0.9), 3),
+                "latency_max_sec": round(max(latencies), 3),
+            })
+        return stats
+
+    def run(self, once=False):
+        """Poll until interrupted; with once, stop when everything found so far has been analyzed."""
+        print(f"[INFO] Watching {self.directory} every {self.interval}s "
+              f"({self.manager.workers} workers, {self.manager.capacity} job slots)")
+        try:
+            while True:
+                self.poll()
+                if once and not self.busy():
+                    break
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            pass
+        return self.stats()
+
+
+def watch(directory, workers=None, queue_size=32, settle=2.0, interval=1.0, recursive=True, out_dir=None,
+          once=False, engine_options=None):
+    """
+    Watch directory with a fresh worker pool and return the latency stats when it stops.
+    engine_options (e.g. {"incremental_profile": True, "budget": ...}) apply to every worker's engine.
+    """
+    if out_dir is None:
+        out_dir = os.path.join(OUTPUT_DIR, "reports", "watch")
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    manager = JobManager(workers=workers, queue_size=queue_size, engine_options=engine_options)
+    try:
+        stats = DirectoryWatcher(directory, manager, settle, interval, recursive, out_dir).run(once=once)
+    finally:
+        manager.shutdown()
+    print(f"[INFO] Watch stopped: {stats}")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze datasets landing in a directory")
+    parser.add_argument("directory", type=str)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--queue-size", type=int, default=32, help="Jobs allowed to wait beyond the busy workers")
+    parser.add_argument("--settle", type=float, default=2.0,
+                        help="Seconds a file's size and mtime must stay unchanged before it is analyzed")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between directory scans")
+    parser.add_argument("--no-recursive", action="store_true", help="Only watch the top-level directory")
+    parser.add_argument("--out-dir", type=str, default=None,
+                        help="Where markdown reports are written (default: ui/outputs/reports/watch)")
+    parser.add_argument("--once", action="store_true", help="Analyze what is there now, then exit")
+    args = parser.parse_args()
+    watch(args.directory, args.workers, args.queue_size, args.settle, args.interval, not args.no_recursive,
+          args.out_dir, args.once)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from zero_shot_theory_generator.config.settings import DATASET_STORE_DIR, DATASET_STORE_MAX_GB
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    digest TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS refs (
+    source TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    path TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_objects_access ON objects (last_access);
+CREATE INDEX IF NOT EXISTS idx_refs_digest ON refs (digest);
+"""
+
+_HASH_CHUNK = 1 << 20
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _tree_size(path):
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+def _remove_ref(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def _link_or_copy(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        # Other filesystem or no hard-link support
+        shutil.copy2(src, dst)
+
+
+class DatasetStore:
+    """
+    Content-addressed store for downloaded datasets, shared by processes on one machine.
+    Each file is kept once under objects/<sha256>; every source (URL, "hf:<repo>",
+    "kaggle:<slug>") gets a hard link to its object under refs/<key>/<original name>, so
+    file extensions survive and identical downloads take the space of one. Folder datasets
+    (e.g. class sub-folders of images) are moved under refs/<key>/ as they are and indexed
+    as one object per source, so they count against the cap too. An SQLite index
+    tracks sizes and access times; when the objects outgrow max_bytes the least recently
+    used ones are evicted with their links. Index changes run under an exclusive flock on
+    the store, and fetches of the same source are serialized by a per-source lock.
+    """
+
+    def __init__(self, root=DATASET_STORE_DIR, max_bytes=int(DATASET_STORE_MAX_GB * (1 << 30))):
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        for sub in ("objects", "refs", "tmp", "locks"):
+            os.makedirs(os.path.join(self.root, sub), exist_ok=True)
+        self._db = os.path.join(self.root, "index.db")
+        self._thread_lock = threading.RLock()
+        with self._locked() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _file_lock(self, path):
+        with open(path, "a+b") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _locked(self):
+        """Store-wide lock plus an index connection committed on exit."""
+        with self._thread_lock, self._file_lock(os.path.join(self.root, "locks", "store.lock")):
+            conn = sqlite3.connect(self._db, timeout=30)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                with conn:
+                    yield conn
+            finally:
+                conn.close()
+
+    @staticmethod
+    def _key(source):
+        return hashlib.blake2b(source.encode("utf-8"), digest_size=10).hexdigest()
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], digest)
+
+    def lookup(self, source):
+        """Local path of a stored source (its access time is refreshed), or None."""
+        with self._locked() as conn:
+            row = conn.execute("SELECT digest, path FROM refs WHERE source = ?", (source,)).fetchone()
+            if row is None:
+                return None
+            digest, path = row
+            if not os.path.exists(path):
+                conn.execute("DELETE FROM refs WHERE source = ?", (source,))
+                return None
+            conn.execute("UPDATE objects SET last_access = ? WHERE digest = ?", (time.time(), digest))
+        return path
+
+    def put(self, source, path, move=False):
+        """
+        Store the file at path for source and return the stored path (same file name).
+        With move the file is moved into the store, otherwise it is hard-linked or copied.
+        """
+        digest = file_digest(path)
+        name = os.path.basename(path)
+        obj = self._object_path(digest)
+        ref_dir = os.path.join(self.root, "refs", self._key(source))
+        ref = os.path.join(ref_dir, name)
+        with self._locked() as conn:
+            if not os.path.exists(obj):
+                os.makedirs(os.path.dirname(obj), exist_ok=True)
+                if move:
+                    os.replace(path, obj)
+                else:
+                    _link_or_copy(path, obj)
+            elif move:
+                os.remove(path)
+            old = conn.execute("SELECT path FROM refs WHERE source = ?", (source,)).fetchone()
+            if old:
+                _remove_ref(old[0])
+            os.makedirs(ref_dir, exist_ok=True)
+            _remove_ref(ref)
+            _link_or_copy(obj, ref)
+            now = time.time()
+            conn.execute("INSERT INTO objects (digest, size, last_access) VALUES (?, ?, ?) "
+                         "ON CONFLICT (digest) DO UPDATE SET last_access = excluded.last_access",
+                         (digest, os.path.getsize(obj), now))
+            conn.execute("INSERT OR REPLACE INTO refs (source, digest, path, created_at) VALUES (?, ?, ?, ?)",
+                         (source, digest, ref, now))
+            self._evict(conn, keep=digest)
+        return ref
+
+    def put_folder(self, source, path):
+        """Move the folder at path into the store for source and return the stored path."""
+        key = f"folder-{self._key(source)}"
+        ref_dir = os.path.join(self.root, "refs", self._key(source))
+        ref = os.path.join(ref_dir, os.path.basename(os.path.normpath(path)))
+        size = _tree_size(path)
+        with self._locked() as conn:
+            old = conn.execute("SELECT path FROM refs WHERE source = ?", (source,)).fetchone()
+            if old:
+                _remove_ref(old[0])
+            os.makedirs(ref_dir, exist_ok=True)
+            _remove_ref(ref)
+            shutil.move(path, ref)
+            now = time.time()
+            conn.execute("INSERT INTO objects (digest, size, last_access) VALUES (?, ?, ?) "
+                         "ON CONFLICT (digest) DO UPDATE SET size = excluded.size, last_access = excluded.last_access",
+                         (key, size, now))
+            conn.execute("INSERT OR REPLACE INTO refs (source, digest, path, created_at) VALUES (?, ?, ?, ?)",
+                         (source, key, ref, now))
+            self._evict(conn, keep=key)
+        return ref
+
+    def fetch(self, source, produce, move=True):
+        """
+        Stored path for source; on a miss, produce(tmp_dir) writes the dataset into a scratch
+        directory and returns the file's path, which is then moved into the store (or linked,
+        without move, for files that live in another cache). Folders are moved in as they are
+        with move, and returned as they are without it.
+        Concurrent fetches of the same source wait for the first one instead of downloading it again.
+        """
+        with self._file_lock(os.path.join(self.root, "locks", f"{self._key(source)}.lock")):
+            path = self.lookup(source)
+            if path:
+                print(f"[INFO] Using stored copy of {source}")
+                return path
+            tmp_dir = tempfile.mkdtemp(dir=os.path.join(self.root, "tmp"))
+            try:
+                path = produce(tmp_dir)
+                if os.path.isdir(path):
+                    return self.put_folder(source, path) if move else os.path.abspath(path)
+                return self.put(source, path, move=move)
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _evict(self, conn, keep=None):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        evicted = 0
+        for digest, size in conn.execute("SELECT digest, size FROM objects ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            if digest == keep:
+                continue
+            for (path,) in conn.execute("SELECT path FROM refs WHERE digest = ?", (digest,)).fetchall():
+                try:
+                    _remove_ref(path)
+                    os.rmdir(os.path.dirname(path))
+                except OSError:
+                    pass
+            try:
+                os.remove(self._object_path(digest))
+            except OSError:
+                pass
+            conn.execute("DELETE FROM refs WHERE digest = ?", (digest,))
+            conn.execute("DELETE FROM objects WHERE digest = ?", (digest,))
+            total -= size
+            evicted += 1
+        if evicted:
+            print(f"[INFO] Dataset store: evicted {evicted} least recently used files")
+        return evicted
+
+    def evict(self):
+        """Enforce max_bytes now (e.g. after lowering it); returns the number of evicted files."""
+        with self._locked() as conn:
+            return self._evict(conn)
+
+    def stats(self):
+        with self._locked() as conn:
+            n_objects, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects").fetchone()
+            n_refs = conn.execute("SELECT COUNT(*) FROM refs").fetchone()[0]
+        return {"root": self.root, "objects": n_objects, "sources": n_refs, "bytes": size,
+                "max_bytes": self.max_bytes}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_dataset_store():
+    """Return the process-wide store at DATASET_STORE_DIR, creating it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = DatasetStore()
+    return _store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and trim the dataset download store")
+    parser.add_argument("--root", default=DATASET_STORE_DIR)
+    parser.add_argument("--max-gb", type=float, default=DATASET_STORE_MAX_GB)
+    parser.add_argument("--evict", action="store_true", help="Evict least recently used files down to --max-gb")
+    args = parser.parse_args()
+    store = DatasetStore(args.root, int(args.max_gb * (1 << 30)))
+    if args.evict:
+        print(f"Evicted {store.evict()} files")
+    print(json.dumps(store.stats()))
+
+
+if __name__ == "__main__":
+    main()
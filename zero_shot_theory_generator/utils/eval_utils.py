@@ -1,3 +1,323 @@
-# Future: evaluation helpers for pipelines
-def evaluate_model(model, data, metrics):
-    return {m: "pending" for m in metrics}
+"""
+Quick, time-boxed validation of a suggested pipeline on a sample of the data.
+
+Cheap CPU stand-ins for the suggested model (plus a trivial baseline) are
+cross-validated in parallel over growing sample sizes; after each rung only the
+better half of the candidates continues on a sample `halving_factor` times larger
+(successive halving). A rung is only started if its predicted duration still fits
+in the time budget. Requires scikit-learn; without it every metric reports why.
+"""
+import math
+import os
+import time
+from zero_shot_theory_generator.core.cost_model import get_cost_model, tabular_workload
+
+# metric name in pipelines -> (sklearn scorer for binary targets, scorer for multiclass, sign)
+_SCORERS = {
+    "accuracy": ("accuracy", "accuracy", 1),
+    "f1": ("f1_macro", "f1_macro", 1),
+    "precision": ("precision_macro", "precision_macro", 1),
+    "recall": ("recall_macro", "recall_macro", 1),
+    "auc": ("roc_auc", "roc_auc_ovr", 1),
+    "rmse": ("neg_root_mean_squared_error", "neg_root_mean_squared_error", -1),
+    "mae": ("neg_mean_absolute_error", "neg_mean_absolute_error", -1),
+    "r2": ("r2", "r2", 1),
+    "mape": ("neg_mean_absolute_percentage_error", "neg_mean_absolute_percentage_error", -1),
+}
+_CLUSTER_METRICS = ("silhouette_score", "davies_bouldin_index", "calinski_harabasz")
+# Metrics where lower is better (used to rank candidates between rungs)
+_LOWER_IS_BETTER = {"rmse", "mae", "mape", "davies_bouldin_index"}
+_SUPERVISED = {"classification", "binary_classification", "regression", "time_series_forecasting",
+               "anomaly_detection"}
+_CLUSTERING = {"clustering", "unsupervised"}
+# Baselines configured like the cost model assumes, so their fit times calibrate it
+_CALIBRATES = {"LogisticRegression", "LinearRegression", "MiniBatchKMeans"}
+# Shorter fits are dominated by fixed overhead (validation, pipeline, process start), which the
+# cost model's per-model factor would scale up to full-size workloads
+MIN_CALIBRATION_SEC = 0.5
+
+
+def _baselines(task, model_name):
+    """Candidate (name, estimator factory) pairs: the stand-in for the suggested model plus cheap baselines."""
+    from sklearn import dummy, ensemble, linear_model, cluster
+
+    kind = task.get("task")
+    model_name = model_name or ""
+    if kind in ("classification", "binary_classification", "anomaly_detection"):
+        candidates = [
+            ("DummyClassifier", lambda: dummy.DummyClassifier(strategy="most_frequent")),
+            ("LogisticRegression", lambda: linear_model.LogisticRegression(max_iter=200)),
+        ]
+        if "RandomForest" in model_name:
+            candidates.append(("RandomForestClassifier", lambda: ensemble.RandomForestClassifier(n_estimators=50)))
+        elif model_name != "LogisticRegression":
+            # XGBoost/CatBoost/IsolationForest stand-in (anomaly labels are scored as classification)
+            candidates.append(("HistGradientBoostingClassifier", lambda: ensemble.HistGradientBoostingClassifier()))
+        return candidates
+    if kind in ("regression", "time_series_forecasting"):
+        candidates = [
+            ("DummyRegressor", lambda: dummy.DummyRegressor()),
+            ("LinearRegression", lambda: linear_model.Ridge(alpha=1e-3)),
+        ]
+        if "RandomForest" in model_name:
+            candidates.append(("RandomForestRegressor", lambda: ensemble.RandomForestRegressor(n_estimators=50)))
+        else:
+            # Gradient boosting also stands in for LSTM/Prophet on lag features
+            candidates.append(("HistGradientBoostingRegressor", lambda: ensemble.HistGradientBoostingRegressor()))
+        return candidates
+    if kind in _CLUSTERING:
+        return [
+            ("MiniBatchKMeans", lambda: cluster.MiniBatchKMeans(n_clusters=8, n_init=3, random_state=0)),
+        ]
+    return []
+
+
+def _load_frame(data, max_rows):
+    import pandas as pd
+    if isinstance(data, pd.DataFrame):
+        return data
+    if isinstance(data, str) and os.path.isfile(data):
+        if data.endswith((".xlsx", ".xls")):
+            return pd.read_excel(data, nrows=max_rows)
+        if data.endswith(".jsonl"):
+            return pd.read_json(data, lines=True, nrows=max_rows)
+        if data.endswith(".csv"):
+            return pd.read_csv(data, nrows=max_rows)
+        return pd.read_csv(data, nrows=max_rows, sep=None, engine="python")
+    raise ValueError("evaluate_model needs a DataFrame or a tabular file path")
+
+
+def _design(df, task, pipeline):
+    """(X, y, preprocessor) following the pipeline's preprocessing steps."""
+    import numpy as np
+    from sklearn.compose import ColumnTransformer
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    df = df.reset_index(drop=True)
+    target = task.get("target")
+    time_col = task.get("time_col")
+    if task.get("task") == "time_series_forecasting" and time_col in df.columns:
+        df = df.sort_values(time_col)
+        # Lag features of the target stand in for the pipeline's LagFeatures step
+        lags = pipeline.get("lags") or (1, 2, 7)
+        for lag in lags:
+            df[f"{target}_lag{lag}"] = df[target].shift(lag)
+        df = df.iloc[max(lags):]
+    drop = [c for c in (target, time_col) if c in df.columns]
+    X = df.drop(columns=drop)
+    y = df[target] if target in df.columns else None
+    if y is not None:
+        keep = y.notna().to_numpy()
+        X, y = X[keep], y[keep]
+    steps = set(pipeline.get("preprocessing", [])) | {"ImputeMissing"}
+    numeric = X.select_dtypes(include=np.number).columns.tolist()
+    categorical = [c for c in X.columns if c not in numeric and X[c].nunique() <= 100]
+    num_steps = [SimpleImputer(strategy="median")]
+    if "StandardScaler" in steps or "Normalization" in steps:
+        num_steps.append(StandardScaler())
+    transformers = [("num", make_pipeline(*num_steps), numeric)]
+    if categorical:
+        transformers.append(("cat", make_pipeline(
+            SimpleImputer(strategy="most_frequent"),
+            OneHotEncoder(handle_unknown="ignore", max_categories=100)
+        ), categorical))
+    return X[numeric + categorical], y, ColumnTransformer(transformers)
+
+
+def _score_supervised(estimator, X, y, metrics, task, n_jobs, n_folds):
+    from sklearn.model_selection import KFold, StratifiedKFold, TimeSeriesSplit, cross_validate
+
+    kind = task.get("task")
+    classification = kind in ("classification", "binary_classification", "anomaly_detection")
+    binary = classification and y.nunique() <= 2
+    scoring = {m: _SCORERS[m][0 if binary else 1] for m in metrics if m in _SCORERS}
+    if not scoring:
+        return {}, 0.0
+    if kind == "time_series_forecasting":
+        cv = TimeSeriesSplit(n_splits=n_folds)
+    elif classification and y.value_counts().min() >= n_folds:
+        cv = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=0)
+    else:
+        cv = KFold(n_splits=n_folds, shuffle=True, random_state=0)
+    result = cross_validate(estimator, X, y, cv=cv, scoring=scoring, n_jobs=n_jobs, error_score="raise")
+    scores = {m: float(_SCORERS[m][2] * result[f"test_{m}"].mean()) for m in scoring}
+    return scores, float(result["fit_time"].mean())
+
+
+def _score_clustering(estimator, X, metrics):
+    from sklearn import metrics as skm
+
+    start = time.perf_counter()
+    labels = estimator.fit_predict(X)
+    fit_sec = time.perf_counter() - start
+    if len(set(labels)) < 2:
+        return {}, fit_sec
+    # Scores are computed in the space the clusters were fitted in
+    Xt = estimator[:-1].transform(X)
+    sample = min(len(labels), 5000)
+    funcs = {
+        "silhouette_score": lambda: skm.silhouette_score(Xt, labels, sample_size=sample, random_state=0),
+        "davies_bouldin_index": lambda: skm.davies_bouldin_score(Xt, labels),
+        "calinski_harabasz": lambda: skm.calinski_harabasz_score(Xt, labels),
+    }
+    return {m: float(funcs[m]()) for m in metrics if m in funcs}, fit_sec
+
+
+def _observe_fit(cost_model, name, estimator, Xs, ys, fit_sec, n_train, cores):
+    """
+    Fold a baseline fit into the cost model: the preprocessing share of the measured time is
+    taken out, and the workload uses the encoded feature count the model actually saw.
+    """
+    from sklearn.base import clone
+
+    if name not in _CALIBRATES or fit_sec < MIN_CALIBRATION_SEC:
+        return
+    start = time.perf_counter()
+    encoded = clone(estimator[:-1]).fit_transform(Xs, ys)
+    model_sec = fit_sec - (time.perf_counter() - start) * n_train / len(Xs)
+    if model_sec < MIN_CALIBRATION_SEC:
+        return
+    n_classes = int(ys.nunique()) if ys is not None and name == "LogisticRegression" else 2
+    cost_model.observe(name, tabular_workload(n_train, encoded.shape[1], n_classes), model_sec, cores=cores)
+
+
+def _rank_key(scores, primary):
+    value = scores.get(primary)
+    if value is None:
+        return math.inf
+    return value if primary in _LOWER_IS_BETTER else -value
+
+
+def evaluate_pipeline(pipeline, data, task, metrics=None, time_budget_sec=60, min_sample=500, max_sample=200_000,
+                      halving_factor=3, n_folds=5, n_jobs=None, seed=0, cost_model=None):
+    """
+    Validate a suggested pipeline on data (DataFrame or tabular file path) within time_budget_sec.
+    Long enough baseline fits calibrate cost_model (default: the process-wide one).
+    Returns {"metrics", "model", "sample_size", "rungs", "elapsed_sec", "stopped_early", "note"};
+    "metrics" has one entry per requested metric (a value, or a string saying why it is missing).
+    """
+    metrics = list(metrics or pipeline.get("metrics", []))
+    result = {"metrics": {m: "not evaluated" for m in metrics}, "model": None, "sample_size": 0,
+              "rungs": [], "elapsed_sec": 0.0, "stopped_early": False, "note": ""}
+    kind = task.get("task")
+    if kind not in _SUPERVISED and kind not in _CLUSTERING:
+        result["note"] = f"No CPU baseline for task '{kind}'"
+        return result
+    try:
+        import sklearn  # noqa: F401
+    except ImportError:
+        result["metrics"] = {m: "unavailable (scikit-learn not installed)" for m in metrics}
+        result["note"] = "scikit-learn not installed"
+        return result
+
+    start = time.perf_counter()
+    deadline = start + time_budget_sec
+    n_jobs = n_jobs or os.cpu_count() or 1
+    model_key = "model" if "model" in pipeline else "clustering"
+    try:
+        df = _load_frame(data, max_sample)
+        X, y, preprocessor = _design(df, task, pipeline)
+    except Exception as e:
+        result["note"] = f"Could not prepare data: {e}"
+        return result
+    supervised = kind in _SUPERVISED
+    if supervised and y is None:
+        result["note"] = f"Target column '{task.get('target')}' not found"
+        return result
+    if kind == "anomaly_detection" and y is not None and y.nunique() > 2:
+        result["note"] = "Anomaly target is not binary"
+        return result
+
+    from sklearn.base import clone
+    from sklearn.pipeline import make_pipeline
+
+    candidates = _baselines(task, pipeline.get(model_key))
+    primary = next((m for m in metrics if m in _SCORERS or m in _CLUSTER_METRICS), None)
+    n_total = len(X)
+    size = min(max(min_sample, n_folds * 10), n_total)
+    cost_model = cost_model or get_cost_model()
+    # Folds run in parallel, each with its share of the cores; a clustering fit gets them all
+    fit_cores = max(1, n_jobs // min(n_jobs, n_folds)) if supervised else n_jobs
+    best = None
+    while candidates:
+        # Time-ordered data keeps its order (TimeSeriesSplit); everything else is sampled at random
+        if kind == "time_series_forecasting":
+            Xs, ys = X.iloc[:size], y.iloc[:size]
+        else:
+            Xs = X.sample(n=size, random_state=seed) if size < n_total else X
+            ys = y.loc[Xs.index] if y is not None else None
+        rung = {"sample_size": size, "candidates": {}}
+        rung_start = time.perf_counter()
+        for name, factory in candidates:
+            if result["rungs"] and time.perf_counter() > deadline:
+                result["stopped_early"] = True
+                break
+            estimator = make_pipeline(clone(preprocessor), factory())
+            candidate_start = time.perf_counter()
+            try:
+                if supervised:
+                    scores, fit_sec = _score_supervised(estimator, Xs, ys, metrics, task, n_jobs, n_folds)
+                else:
+                    scores, fit_sec = _score_clustering(estimator, Xs, metrics)
+            except Exception as e:
+                rung["candidates"][name] = {"error": f"{type(e).__name__}: {e}"}
+                continue
+            rung["candidates"][name] = {"scores": scores, "fit_sec": round(fit_sec, 4),
+                                        "elapsed_sec": round(time.perf_counter() - candidate_start, 4)}
+            n_train = size * (n_folds - 1) // n_folds if supervised else size
+            try:
+                _observe_fit(cost_model, name, estimator, Xs, ys, fit_sec, n_train, fit_cores)
+            except Exception as e:
+                print(f"[WARN] Cost calibration from {name} skipped: {e}")
+        rung["elapsed_sec"] = round(time.perf_counter() - rung_start, 4)
+        result["rungs"].append(rung)
+
+        scored = [(name, c["scores"]) for name, c in rung["candidates"].items() if "scores" in c]
+        if scored:
+            scored.sort(key=lambda nc: _rank_key(nc[1], primary))
+            best = (scored[0][0], scored[0][1], size)
+            keep = {name for name, _ in scored[:max(1, math.ceil(len(scored) / 2))]}
+            candidates = [(n, f) for n, f in candidates if n in keep]
+        else:
+            candidates = []
+        if size >= n_total or size >= max_sample:
+            break
+        next_size = min(size * halving_factor, n_total, max_sample)
+        # Survivors' cost grows roughly linearly with the sample
+        predicted = sum(rung["candidates"][n]["elapsed_sec"] for n, _ in candidates) * next_size / size
+        if time.perf_counter() + predicted > deadline:
+            result["stopped_early"] = True
+            break
+        size = next_size
+
+    result["elapsed_sec"] = round(time.perf_counter() - start, 3)
+    if best is None:
+        result["note"] = "No candidate could be evaluated"
+        return result
+    name, scores, size = best
+    result["model"] = name
+    result["sample_size"] = size
+    result["metrics"] = {m: round(scores[m], 4) if m in scores else "not supported by quick evaluation"
+                         for m in metrics}
+    return result
+
+
+def evaluate_model(model, data, metrics, task=None, time_budget_sec=60, **kwargs):
+    """
+    Quick baseline metrics for a suggested pipeline (or a bare model name) on data.
+    Without a task, the task and target are inferred from the data like in analyze().
+    Returns {metric: value}; see evaluate_pipeline for the full result.
+    """
+    pipeline = model if isinstance(model, dict) else {"model": model, "metrics": metrics}
+    if task is None:
+        from zero_shot_theory_generator.core.dataset_loader import analyze_tabular_data, detect_dataset
+        from zero_shot_theory_generator.core.task_inference import infer_task
+        if isinstance(data, str):
+            meta = detect_dataset(data)
+        else:
+            meta = analyze_tabular_data(_load_frame(data, None).head(100))
+        task = infer_task(meta)
+    return evaluate_pipeline(pipeline, data, task, metrics=metrics, time_budget_sec=time_budget_sec,
+                             **kwargs)["metrics"]
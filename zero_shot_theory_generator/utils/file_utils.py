@@ -2,11 +2,14 @@
 
 import os
 import re
+import threading
 import requests
 import pandas as pd
 from typing import Optional
 from datasets import load_dataset as hf_load_dataset
 import kagglehub
+from zero_shot_theory_generator.utils.dataset_store import get_dataset_store
+from zero_shot_theory_generator.core.file_ranking import pick_dataset_file
 
 
 def extract_kaggle_slug(path_or_url: str) -> Optional[str]:
@@ -28,7 +31,7 @@ def save_dataframe(df, out_dir, fname="data.csv"):
     return os.path.abspath(out_path)
 
 
-def load_dataset_path(path_or_url: str) -> str:
+def load_dataset_path(path_or_url: str, session: Optional[requests.Session] = None, profiler=None) -> str:
     """
     Detect and normalize dataset input into a local usable file/folder:
       - Local path
@@ -36,6 +39,10 @@ def load_dataset_path(path_or_url: str) -> str:
       - Kaggle datasets
       - Direct file URL
     Returns local filesystem path (CSV, TXT, JSON, folder).
+    Remote files are kept in the shared dataset store (see utils/dataset_store.py), so repeated
+    runs use the local copy. An optional requests session is reused for direct downloads (keep-alive).
+    A profiler (core.file_profile.StreamingFileProfile) is fed every downloaded chunk of a direct
+    URL as it is written, and finished when the download completes.
     """
 
     # 1. Local file/folder
@@ -54,11 +61,10 @@ def load_dataset_path(path_or_url: str) -> str:
 
     if hf_match:
         repo_id, config = (hf_match.split(":", 1) + [None])[:2]
-        print(f"[INFO] Loading Hugging Face dataset → {repo_id}, config={config}")
-        try:
+
+        def export_hf(local_dir):
+            print(f"[INFO] Loading Hugging Face dataset → {repo_id}, config={config}")
             ds = hf_load_dataset(repo_id, config) if config else hf_load_dataset(repo_id)
-            local_dir = os.path.join("downloads", "huggingface", repo_id.replace("/", "_"))
-            os.makedirs(local_dir, exist_ok=True)
 
             # Handle split
             data = ds[list(ds.keys())[0]] if isinstance(ds, dict) else ds
@@ -72,70 +78,81 @@ def load_dataset_path(path_or_url: str) -> str:
                 data.to_parquet(save_path)
                 return os.path.abspath(save_path)
 
+        try:
+            return get_dataset_store().fetch(f"hf:{hf_match}", export_hf)
         except Exception as e:
             raise RuntimeError(f"Failed to load Hugging Face dataset: {e}")
 
     # 3. Kaggle datasets
     kaggle_slug = extract_kaggle_slug(path_or_url)
     if kaggle_slug:
-        print(f"[INFO] Downloading Kaggle dataset: {kaggle_slug}")
+        # Downloaded into the store's scratch dir and the chosen file moved into the store, so
+        # later runs skip kagglehub (and its version check) and the size cap covers Kaggle data
         try:
-            dataset_path = kagglehub.dataset_download(kaggle_slug)
-            # If it's a directory, try to pick the "best" file for ML
-            if os.path.isdir(dataset_path):
-                # Collect all usable files (support all common ML file types)
-                usable_files = []
-                supported_exts = (
-                    '.csv', '.xlsx', '.xls', '.json', '.txt', '.parquet',
-                    '.tsv', '.npz', '.npy', '.jpg', '.jpeg', '.png', '.bmp', '.gif', '.zip'
-                )
-                for root, dirs, files in os.walk(dataset_path):
-                    for file in files:
-                        if file.lower().endswith(supported_exts):
-                            usable_files.append(os.path.join(root, file))
-                # If only one file, return it
-                if len(usable_files) == 1:
-                    return os.path.abspath(usable_files[0])
-                # If multiple files, prefer the largest CSV, then largest file, then a folder for images/zips
-                if usable_files:
-                    # Prefer CSV, then Parquet, then Excel, then JSON, then TXT, then NPZ/NPY, then ZIP, then images
-                    ext_priority = [
-                        '.csv', '.parquet', '.xlsx', '.xls', '.json', '.txt', '.tsv', '.npz', '.npy', '.zip',
-                        '.jpg', '.jpeg', '.png', '.bmp', '.gif'
-                    ]
-                    for ext in ext_priority:
-                        files_of_type = [f for f in usable_files if f.lower().endswith(ext)]
-                        if files_of_type:
-                            best_file = max(files_of_type, key=lambda f: os.path.getsize(f))
-                            return os.path.abspath(best_file)
-                    # Fallback: largest file of any supported type
-                    best_file = max(usable_files, key=lambda f: os.path.getsize(f))
-                    return os.path.abspath(best_file)
-                # If no usable files, return the directory (for image datasets, etc.)
-                return os.path.abspath(dataset_path)
-            return os.path.abspath(dataset_path)
+            return get_dataset_store().fetch(f"kaggle:{kaggle_slug}",
+                                             lambda local_dir: _kaggle_download(kaggle_slug, local_dir))
         except Exception as e:
             raise RuntimeError(f"Failed to load Kaggle dataset: {e}")
 
     # 4. Direct file URLs
     if path_or_url.startswith("http"):
-        local_dir = os.path.join("downloads", "raw")
-        os.makedirs(local_dir, exist_ok=True)
         fname = os.path.basename(path_or_url).split("?")[0] or "dataset_download"
-        local_path = os.path.join(local_dir, fname)
-        print(f"[INFO] Downloading dataset file → {path_or_url}")
-        try:
-            r = requests.get(path_or_url, stream=True, timeout=30)
+
+        def download(local_dir):
+            local_path = os.path.join(local_dir, fname)
+            print(f"[INFO] Downloading dataset file → {path_or_url}")
+            r = (session or requests).get(path_or_url, stream=True, timeout=30)
             r.raise_for_status()
+            if profiler is not None and r.headers.get("Content-Length", "").isdigit():
+                profiler.total_bytes = int(r.headers["Content-Length"])
             with open(local_path, "wb") as f:
                 for chunk in r.iter_content(8192):
                     if chunk:
                         f.write(chunk)
+                        if profiler is not None:
+                            profiler.feed(chunk)
             if os.path.getsize(local_path) == 0:
                 raise RuntimeError("Downloaded file is empty")
-            return os.path.abspath(local_path)
+            if profiler is not None:
+                profiler.finish()
+            return local_path
+
+        try:
+            return get_dataset_store().fetch(path_or_url, download)
         except Exception as e:
             raise RuntimeError(f"Failed to download dataset file: {e}")
 
     # 5. Unsupported
     raise FileNotFoundError(f"Unsupported dataset path or URL: {path_or_url}")
+
+
+# kagglehub reads its cache location from the environment, which is process-wide
+_kaggle_lock = threading.Lock()
+
+
+def _kaggle_download(kaggle_slug, local_dir):
+    """
+    Download a Kaggle dataset with kagglehub into local_dir and return its main file (or the folder).
+    kagglehub's own cache is never evicted, so it is pointed at local_dir for the download.
+    """
+    print(f"[INFO] Downloading Kaggle dataset: {kaggle_slug}")
+    with _kaggle_lock:
+        previous = os.environ.get("KAGGLEHUB_CACHE")
+        os.environ["KAGGLEHUB_CACHE"] = local_dir
+        try:
+            dataset_path = kagglehub.dataset_download(kaggle_slug)
+        finally:
+            if previous is None:
+                os.environ.pop("KAGGLEHUB_CACHE", None)
+            else:
+                os.environ["KAGGLEHUB_CACHE"] = previous
+    if os.path.isdir(dataset_path):
+        # Rank the files by a quick profile instead of taking the largest CSV
+        path = pick_dataset_file(dataset_path)
+        if os.path.isdir(path):
+            # Stored under the dataset's name rather than kagglehub's version folder
+            named = os.path.join(local_dir, kaggle_slug.split("/")[-1])
+            os.replace(path, named)
+            return named
+        return path
+    return os.path.abspath(dataset_path)
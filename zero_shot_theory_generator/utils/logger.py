@@ -1,13 +1,19 @@
-import os, json, time
+import os
 from zero_shot_theory_generator.config.settings import OUTPUT_DIR
+from zero_shot_theory_generator.utils.report_store import get_report_store
 
-def log_output(report):
-    reports_dir = os.path.join(OUTPUT_DIR, "reports")
-    os.makedirs(reports_dir, exist_ok=True)
-    filename = os.path.join(reports_dir, f"report_{int(time.time())}.json")
+def log_output(report, reports_dir=None, dataset_fp=None):
+    """
+    Append the report to the report store in reports_dir and return its id (None on failure).
+    The row is committed before returning: the engine also runs in pool workers, whose exit
+    skips the store's background flush.
+    """
+    if reports_dir is None:
+        reports_dir = os.path.join(OUTPUT_DIR, "reports")
     try:
-        with open(filename, "w") as f:
-            json.dump(report, f, indent=4)
-        print(f"Report saved: {filename}")
+        report_id = get_report_store(os.path.join(reports_dir, "reports.db")).append(report, dataset_fp, durable=True)
+        print(f"Report saved: {report_id}")
+        return report_id
     except Exception as e:
         print(f"Failed to save report: {e}")
+        return None
@@ -0,0 +1,271 @@
+import argparse
+import atexit
+import glob
+import json
+import os
+import sqlite3
+import struct
+import threading
+import time
+import uuid
+import zlib
+from zero_shot_theory_generator.config.settings import OUTPUT_DIR
+from zero_shot_theory_generator.core.stage_graph import fingerprint
+from zero_shot_theory_generator.core.tabular_meta import TabularMetadata, json_default
+
+DEFAULT_DB = os.path.join(OUTPUT_DIR, "reports", "reports.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    dataset_fingerprint TEXT,
+    task TEXT,
+    body BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reports_fingerprint ON reports (dataset_fingerprint, created_at);
+CREATE INDEX IF NOT EXISTS idx_reports_task ON reports (task, created_at);
+CREATE INDEX IF NOT EXISTS idx_reports_created ON reports (created_at);
+"""
+
+
+def dataset_fingerprint(report):
+    """Content hash of a report's dataset metadata."""
+    return fingerprint(report.get("metadata", {}))
+
+
+# Bodies of reports with columnar metadata: magic, length of the compressed JSON part,
+# the JSON part (report without metadata), then TabularMetadata.to_bytes()
+_COLUMNAR_MAGIC = b"ZRB1"
+
+
+def encode_report(report):
+    meta = report.get("metadata")
+    if isinstance(meta, TabularMetadata):
+        rest = {k: v for k, v in report.items() if k != "metadata"}
+        body = zlib.compress(json.dumps(rest, separators=(",", ":"), default=json_default).encode("utf-8"))
+        return _COLUMNAR_MAGIC + struct.pack("<Q", len(body)) + body + meta.to_bytes()
+    return zlib.compress(json.dumps(report, separators=(",", ":"), default=json_default).encode("utf-8"))
+
+
+def decode_report(blob):
+    """Inverse of encode_report; columnar metadata comes back as TabularMetadata."""
+    blob = bytes(blob)
+    if blob.startswith(_COLUMNAR_MAGIC):
+        (n,) = struct.unpack_from("<Q", blob, len(_COLUMNAR_MAGIC))
+        start = len(_COLUMNAR_MAGIC) + 8
+        report = {"metadata": TabularMetadata.from_bytes(blob[start + n:])}
+        report.update(json.loads(zlib.decompress(blob[start:start + n])))
+        return report
+    return json.loads(zlib.decompress(blob))
+
+
+class ReportStore:
+    """
+    Append-only SQLite report store (WAL mode, safe for several writer processes).
+    Reports get a unique id up front and are buffered; the buffer is written in one
+    transaction once batch_size reports are pending, after flush_interval seconds,
+    on flush()/close(), and at interpreter exit. Pool workers leave through os._exit,
+    which skips the exit hook, so callers there must append with durable=True.
+    """
+
+    def __init__(self, path=DEFAULT_DB, batch_size=32, flush_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _flush_loop(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def append(self, report, dataset_fp=None, durable=False):
+        """Queue a report and return its id (readable by get() once flushed; committed on return with durable)."""
+        return self.append_many([report], [dataset_fp], durable=durable)[0]
+
+    def append_many(self, reports, dataset_fps=None, durable=False):
+        dataset_fps = dataset_fps or [None] * len(reports)
+        now = time.time()
+        rows, ids = [], []
+        for report, fp in zip(reports, dataset_fps):
+            # Time-ordered prefix keeps ids sortable; the random suffix makes them unique
+            report_id = f"{time.time_ns():x}-{uuid.uuid4().hex[:8]}"
+            task = report.get("task", {})
+            rows.append((
+                report_id,
+                now,
+                fp or dataset_fingerprint(report),
+                task.get("task") if isinstance(task, dict) else str(task),
+                encode_report(report)
+            ))
+            ids.append(report_id)
+        with self._lock:
+            self._pending.extend(rows)
+            should_flush = durable or len(self._pending) >= self.batch_size
+        if should_flush:
+            self.flush()
+        return ids
+
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return 0
+            rows, self._pending = self._pending, []
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO reports (id, created_at, dataset_fingerprint, task, body) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+        return len(rows)
+
+    def get(self, report_id):
+        self.flush()
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM reports WHERE id = ?", (report_id,)).fetchone()
+        return decode_report(row[0]) if row else None
+
+    def find(self, dataset_fp=None, task=None, since=None, until=None, limit=100, newest_first=True):
+        """Indexed lookup; returns a list of {"id", "created_at", "dataset_fingerprint", "task", "report"}."""
+        self.flush()
+        clauses, params = [], []
+        if dataset_fp is not None:
+            clauses.append("dataset_fingerprint = ?")
+            params.append(dataset_fp)
+        if task is not None:
+            clauses.append("task = ?")
+            params.append(task)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        order = "DESC" if newest_first else "ASC"
+        sql = (f"SELECT id, created_at, dataset_fingerprint, task, body FROM reports {where} "
+               f"ORDER BY created_at {order} LIMIT ?")
+        with self._lock:
+            rows = self._conn.execute(sql, params + [limit]).fetchall()
+        return [
+            {"id": r[0], "created_at": r[1], "dataset_fingerprint": r[2], "task": r[3], "report": decode_report(r[4])}
+            for r in rows
+        ]
+
+    def count(self):
+        self.flush()
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+    def compact(self, keep_per_fingerprint=None, older_than=None):
+        """
+        Drop superseded reports and reclaim space.
+          keep_per_fingerprint: keep only the newest N reports per dataset fingerprint
+          older_than:           delete reports created before this unix timestamp
+        Returns the number of deleted reports.
+        """
+        self.flush()
+        deleted = 0
+        with self._lock:
+            with self._conn:
+                if older_than is not None:
+                    deleted += self._conn.execute("DELETE FROM reports WHERE created_at < ?",
+                                                  (older_than,)).rowcount
+                if keep_per_fingerprint is not None:
+                    deleted += self._conn.execute(
+                        "DELETE FROM reports WHERE id IN ("
+                        "  SELECT id FROM ("
+                        "    SELECT id, ROW_NUMBER() OVER ("
+                        "      PARTITION BY dataset_fingerprint ORDER BY created_at DESC) AS rn"
+                        "    FROM reports) WHERE rn > ?)",
+                        (keep_per_fingerprint,)
+                    ).rowcount
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.execute("VACUUM")
+        return deleted
+
+    def import_json_dir(self, reports_dir):
+        """Migrate legacy report_<ts>.json files, keeping their file timestamps."""
+        rows = []
+        for path in sorted(glob.glob(os.path.join(reports_dir, "report_*.json"))):
+            try:
+                with open(path) as f:
+                    report = json.load(f)
+            except Exception as e:
+                print(f"[WARN] Skipping unreadable report {path}: {e}")
+                continue
+            task = report.get("task", {})
+            rows.append((
+                f"{int(os.path.getmtime(path) * 1e9):x}-{uuid.uuid4().hex[:8]}",
+                os.path.getmtime(path),
+                dataset_fingerprint(report),
+                task.get("task") if isinstance(task, dict) else str(task),
+                encode_report(report)
+            ))
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO reports (id, created_at, dataset_fingerprint, task, body) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+        return len(rows)
+
+    def close(self):
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_report_store(path=DEFAULT_DB):
+    """One shared store per database file in this process."""
+    path = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = ReportStore(path)
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query and maintain the report store")
+    parser.add_argument("--db", default=DEFAULT_DB)
+    parser.add_argument("--fingerprint", help="Dataset fingerprint to look up")
+    parser.add_argument("--task", help="Task type, e.g. regression")
+    parser.add_argument("--since", type=float, help="Unix timestamp lower bound")
+    parser.add_argument("--until", type=float, help="Unix timestamp upper bound")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--import-json", metavar="DIR", help="Import legacy report_*.json files from DIR")
+    parser.add_argument("--compact", action="store_true", help="Delete superseded reports and VACUUM")
+    parser.add_argument("--keep", type=int, default=None, help="With --compact: reports kept per fingerprint")
+    parser.add_argument("--older-than-days", type=float, default=None, help="With --compact: drop older reports")
+    args = parser.parse_args()
+
+    store = ReportStore(args.db)
+    if args.import_json:
+        print(f"Imported {store.import_json_dir(args.import_json)} reports")
+    if args.compact:
+        cutoff = time.time() - args.older_than_days * 86400 if args.older_than_days is not None else None
+        print(f"Deleted {store.compact(keep_per_fingerprint=args.keep, older_than=cutoff)} reports")
+    for row in store.find(args.fingerprint, args.task, args.since, args.until, args.limit):
+        print(json.dumps({k: v for k, v in row.items() if k != "report"}))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Mergeable streaming sketches for profiling data that does not fit in memory.
+
+Hashes are blake2b (strings) or splitmix64 (integer codes) based rather than hash(),
+so sketches built in different processes (and different runs) can be merged.
+"""
+import hashlib
+import numpy as np
+
+
+def hash64(value):
+    """Stable 64-bit hash of a str or bytes value."""
+    if isinstance(value, str):
+        value = value.encode("utf-8", "surrogatepass")
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "little")
+
+
+def hash_many(values):
+    """uint64 array of hash64 over an iterable of str/bytes values."""
+    return np.fromiter((hash64(v) for v in values), dtype=np.uint64)
+
+
+def mix64(codes):
+    """Vectorized splitmix64 finalizer: well mixed uint64 hashes of integer codes."""
+    z = np.asarray(codes).astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct counter (Flajolet et al.) with 2**p one-byte registers;
+    the relative standard error is about 1.04 / sqrt(2**p) (0.8% at the default p=14).
+    """
+
+    def __init__(self, p=14, registers=None):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8) if registers is None else registers
+
+    def add_hashes(self, hashes):
+        """Add a uint64 array of (well mixed) hashes."""
+        if not len(hashes):
+            return
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        idx = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        # Rank = position of the first set bit in the next 32 bits (33 if all are zero)
+        rest = ((hashes << np.uint64(self.p)) >> np.uint64(32)).astype(np.float64)
+        _, exponent = np.frexp(rest)
+        rank = np.where(rest > 0, 33 - exponent, 33).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def add(self, values):
+        self.add_hashes(hash_many(values))
+
+    def merge(self, other):
+        if other.p != self.p:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Small range: linear counting is more accurate
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self):
+        return bytes([self.p]) + self.registers.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls(data[0], np.frombuffer(data[1:], dtype=np.uint8).copy())
@@ -0,0 +1,177 @@
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _peak_rss_kb():
+    """Process high-water RSS in KB (ru_maxrss is KB on Linux, bytes on macOS)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _bytes_read():
+    """Bytes read by this process so far (Linux /proc only; covers files and sockets)."""
+    try:
+        with open("/proc/self/io", "rb") as f:
+            for line in f:
+                if line.startswith(b"rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+class _NullSpan:
+    """Shared no-op span so disabled tracing costs one attribute lookup per stage."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.record = {"name": name, **attrs}
+
+    def set(self, **attrs):
+        self.record.update(attrs)
+
+    def __enter__(self):
+        if self.tracer.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        self._rss = _peak_rss_kb()
+        self._read = _bytes_read()
+        self._cpu = time.process_time()
+        self._start = time.perf_counter()
+        self.record["start"] = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._start
+        cpu = time.process_time() - self._cpu
+        rss = _peak_rss_kb()
+        read = _bytes_read()
+        self.record.update({
+            "wall_sec": round(wall, 6),
+            "cpu_sec": round(cpu, 6),
+            "peak_rss_kb": rss,
+            "rss_growth_kb": rss - self._rss if rss is not None and self._rss is not None else None,
+            "bytes_read": read - self._read if read is not None and self._read is not None else None,
+            "thread": threading.get_ident()
+        })
+        if self.tracer.trace_memory:
+            self.record["tracemalloc_peak_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        if exc_type is not None:
+            self.record["error"] = exc_type.__name__
+        self.tracer.spans.append(self.record)
+        return False
+
+
+class Tracer:
+    """
+    Collects one record per pipeline stage: wall time, CPU time, peak RSS, bytes read
+    and (optionally) the tracemalloc peak. Disabled tracers hand out NULL_SPAN.
+    tracemalloc slows allocation-heavy code noticeably, so it is opt-in via trace_memory.
+    """
+
+    def __init__(self, enabled=True, trace_memory=False):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.spans = []
+
+    def span(self, name, **attrs):
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name, attrs)
+
+
+DISABLED_TRACER = Tracer(enabled=False)
+
+
+def to_chrome_trace(spans):
+    """Convert span records to the Chrome trace event format (chrome://tracing, Perfetto)."""
+    events = []
+    pid = os.getpid()
+    for s in spans:
+        args = {k: v for k, v in s.items() if k not in ("name", "start", "wall_sec", "thread")}
+        events.append({
+            "name": s["name"],
+            "ph": "X",
+            "ts": int(s["start"] * 1e6),
+            "dur": int(s["wall_sec"] * 1e6),
+            "pid": pid,
+            "tid": s.get("thread", 0),
+            "args": args
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(spans, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(to_chrome_trace(spans), f)
+    return path
+
+
+class StageMetrics:
+    """Cumulative per-stage counters across runs, rendered in Prometheus text format."""
+
+    def __init__(self, prefix="zstg"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def observe(self, spans):
+        with self._lock:
+            for s in spans or []:
+                m = self._stages.setdefault(s["name"], {
+                    "runs": 0, "errors": 0, "wall": 0.0, "cpu": 0.0, "bytes_read": 0, "peak_rss_kb": 0
+                })
+                m["runs"] += 1
+                m["errors"] += 1 if "error" in s else 0
+                m["wall"] += s.get("wall_sec") or 0.0
+                m["cpu"] += s.get("cpu_sec") or 0.0
+                m["bytes_read"] += s.get("bytes_read") or 0
+                m["peak_rss_kb"] = max(m["peak_rss_kb"], s.get("peak_rss_kb") or 0)
+
+    def to_prometheus(self):
+        p = self.prefix
+        metrics = [
+            ("stage_runs_total", "counter", "Stage executions", lambda m: m["runs"]),
+            ("stage_errors_total", "counter", "Stage executions that raised", lambda m: m["errors"]),
+            ("stage_wall_seconds_total", "counter", "Wall-clock seconds spent in stage", lambda m: m["wall"]),
+            ("stage_cpu_seconds_total", "counter", "CPU seconds spent in stage", lambda m: m["cpu"]),
+            ("stage_read_bytes_total", "counter", "Bytes read while the stage ran", lambda m: m["bytes_read"]),
+            ("stage_peak_rss_bytes", "gauge", "Highest process RSS observed at stage end",
+             lambda m: m["peak_rss_kb"] * 1024),
+        ]
+        with self._lock:
+            stages = {k: dict(v) for k, v in self._stages.items()}
+        lines = []
+        for name, kind, help_text, value in metrics:
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+            for stage, m in sorted(stages.items()):
+                lines.append(f'{p}_{name}{{stage="{stage}"}} {value(m)}')
+        return "\n".join(lines) + "\n"